@@ -421,7 +421,7 @@ class ResultRoller(Roller):
     year = CalculatedField(lambda d: d['start_date'].year)
 
     excluded_fields = {
-        'result': ['candidate_slug', 'contest_slug', 'raw_result',],
+        'result': ['candidate_slug', 'contest_slug', 'raw_result', 'slug',],
         'candidate': [
             'contest',
             'contest_slug',
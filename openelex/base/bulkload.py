@@ -0,0 +1,85 @@
+"""
+Bulk loading mode for the load process.
+
+Loading a large state spends much of its time maintaining the secondary
+indexes on the ``RawResult`` collection and waiting for each batch of
+inserts to be acknowledged.  While a ``BulkLoad`` is active:
+
+* Every index on the collection except the one on ``_id`` is dropped.
+* ``RawResult`` documents inserted in batches are inserted unordered, so
+  the server can apply a batch without stopping at the first error, and
+  with a relaxed write concern.
+
+When the bulk load ends, the indexes that were dropped are rebuilt once,
+with the same keys, names and options.
+
+"""
+from __future__ import print_function
+from builtins import object
+
+from openelex.models import RawResult
+
+
+DEFAULT_WRITE_CONCERN = {'w': 0}
+"""Don't wait for the server to acknowledge inserts"""
+
+
+class BulkLoad(object):
+    """
+    Context manager that puts a document class into bulk loading mode.
+
+    Usage:
+
+        with BulkLoad():
+            for mapping in mappings:
+                loader.run(mapping)
+
+    """
+
+    def __init__(self, doc_cls=RawResult, write_concern=None, verbose=True):
+        self.doc_cls = doc_cls
+        if write_concern is None:
+            write_concern = DEFAULT_WRITE_CONCERN
+        self.write_concern = write_concern
+        self.verbose = verbose
+        # Specifications of the dropped indexes, as returned by
+        # Collection.index_information(), by index name
+        self.dropped_indexes = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Rebuild the indexes even if the load failed part way through
+        self.finish()
+
+    def _log(self, msg):
+        if self.verbose:
+            print(msg)
+
+    def start(self):
+        collection = self.doc_cls._get_collection()
+        self.dropped_indexes = dict(
+            (name, spec) for name, spec in collection.index_information().items()
+            if name != '_id_')
+        for name in self.dropped_indexes:
+            collection.drop_index(name)
+        if self.dropped_indexes:
+            self._log("Dropped indexes on {}: {}".format(collection.name,
+                ", ".join(sorted(self.dropped_indexes))))
+
+        self.doc_cls.bulk_write_concern = dict(self.write_concern)
+
+    def finish(self):
+        self.doc_cls.bulk_write_concern = None
+        if not self.dropped_indexes:
+            return
+
+        collection = self.doc_cls._get_collection()
+        self._log("Rebuilding indexes on {}".format(collection.name))
+        for name, spec in sorted(self.dropped_indexes.items()):
+            options = dict((k, v) for k, v in spec.items()
+                           if k not in ('key', 'v', 'ns'))
+            collection.create_index(list(spec['key']), name=name, **options)
+        self.dropped_indexes = {}
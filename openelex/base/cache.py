@@ -21,6 +21,16 @@ class StateCache(object):
     def abspath(self):
         return os.path.abspath(self.path)
 
+    @property
+    def rows_path(self):
+        """Directory of parsed rows.  See ``openelex.base.rowcache``."""
+        return os.path.join(self.abspath, 'parsed_rows')
+
+    @property
+    def names_path(self):
+        """File of parsed names.  See ``openelex.base.namecache``."""
+        return os.path.join(self.abspath, 'parsed_names.pickle')
+
     def list_dir(self, datefilter='', full_path=False):
         if full_path:
             filtered = [os.path.join(PROJECT_ROOT, self.path, f)
@@ -0,0 +1,212 @@
+"""
+Checkpoints for resuming interrupted loads.
+
+When resuming is enabled with ``enable_resume()``, ``BaseLoader.run()``
+keeps a ``LoadCheckpoint`` record for each data file it loads.  The
+checkpoint is marked complete once the file's ``load()`` method returns, so
+files that were completely loaded are skipped when a load is resumed.
+Checkpoints record the size and modification time of the data file, and
+are ignored once the file changes.  Loads without resuming don't read or
+write checkpoints at all, so a resumed load after an interrupted load
+without resuming can skip files that the latter only partly reloaded.
+Delete the files' ``LoadCheckpoint`` records first in that case.
+
+Loaders that insert RawResults in batches can also resume part way through
+a file.  They read rows through ``BaseLoader._resume_rows()`` and insert
+results with the buffer returned by ``BaseLoader._insert_buffer()``.  Batches
+only end between rows, so all of the records built from a row are inserted
+together.  Before each batch is inserted, the checkpoint records the row
+offset reached in the file and the IDs of the records in the batch.  When a
+load is resumed, a batch that was only partly inserted is deleted, and the
+rows up to the offset of the last complete batch are skipped without
+building any records.
+
+"""
+from builtins import object
+from datetime import datetime
+from itertools import islice
+import os
+
+from openelex.lib.insertbuffer import BulkInsertBuffer
+from openelex.models import LoadCheckpoint, RawResult, assign_ids
+
+
+class Checkpoint(object):
+    """Tracks how much of a data file has been loaded"""
+
+    def __init__(self, record):
+        self.record = record
+        # Number of rows of the file that have been read so far
+        self.position = record.rows
+
+    @classmethod
+    def start(cls, source, election_id, fingerprint=None, resume=False):
+        """
+        Returns a ``Checkpoint`` for loading the data file ``source``.
+
+        If ``resume`` is True and the file was loaded before, and hasn't
+        changed since, according to ``fingerprint`` (see
+        ``file_fingerprint()``), the existing checkpoint is used, after
+        cleaning up a batch whose insert may have been interrupted.
+        Otherwise, a checkpoint for a new load from the beginning of the
+        file is created and it's up to the caller to delete previously
+        loaded records.
+
+        """
+        record = LoadCheckpoint.objects(source=source).first()
+        if (resume and record is not None and
+                record.fingerprint == fingerprint and
+                (record.complete or record.rows or record.pending_ids)):
+            checkpoint = cls(record)
+            checkpoint.recover()
+            return checkpoint
+
+        cls.discard(source)
+        record = LoadCheckpoint(source=source, election_id=election_id,
+            fingerprint=fingerprint)
+        record.save()
+        return cls(record)
+
+    @classmethod
+    def discard(cls, source):
+        """
+        Delete the checkpoint of a data file, so that a later resumed load
+        doesn't skip records that were deleted.
+        """
+        LoadCheckpoint.objects(source=source).delete()
+
+    @property
+    def complete(self):
+        return self.record.complete
+
+    @property
+    def rows(self):
+        """Number of rows of the file whose results are in the database"""
+        return self.record.rows
+
+    def recover(self):
+        """
+        Finish or roll back a batch that was being inserted when a load was
+        interrupted.
+        """
+        pending_ids = self.record.pending_ids
+        if not pending_ids:
+            return
+
+        found = RawResult.objects(id__in=pending_ids).count()
+        if found == len(pending_ids):
+            self._commit_pending()
+        else:
+            RawResult.objects(id__in=pending_ids).delete()
+            self.record.pending_ids = []
+            self.record.pending_rows = 0
+        self.position = self.record.rows
+        self._save()
+
+    def resume_rows(self, rows):
+        """
+        Iterate through rows, skipping the ones that were loaded before and
+        keeping track of the position in the file.
+        """
+        self.position = self.record.rows
+        for row in islice(rows, self.position, None):
+            yield row
+            # All of the row's records have been built once the next row is
+            # requested
+            self.position += 1
+
+    def begin_batch(self, docs):
+        """
+        Record a batch of documents that is about to be inserted.
+
+        This also commits the previous batch, since batches are inserted
+        one at a time.
+
+        """
+        assign_ids(docs)
+        self._commit_pending()
+        self.record.pending_ids = [doc.id for doc in docs]
+        self.record.pending_rows = self.position
+        self._save()
+
+    def finish(self):
+        """Mark the file as completely loaded"""
+        self._commit_pending()
+        self.record.complete = True
+        self._save()
+
+    def _commit_pending(self):
+        if self.record.pending_ids:
+            self.record.rows = self.record.pending_rows
+            self.record.inserted += len(self.record.pending_ids)
+        self.record.pending_ids = []
+        self.record.pending_rows = 0
+
+    def _save(self):
+        self.record.updated = datetime.now()
+        self.record.save()
+
+
+class CheckpointInsertBuffer(BulkInsertBuffer):
+    """
+    ``BulkInsertBuffer`` that updates a ``Checkpoint`` before each batch of
+    documents is inserted.
+
+    A full buffer isn't flushed until the first document of the next row is
+    appended, so a row whose documents don't fit in the buffer isn't split
+    across batches.  The buffer can grow past ``maxsize`` by the documents
+    of one row.
+    """
+
+    def __init__(self, checkpoint, doc_cls=RawResult, maxsize=1000):
+        super(CheckpointInsertBuffer, self).__init__(doc_cls, maxsize)
+        self._checkpoint = checkpoint
+        # Position of the checkpoint when the last document was appended
+        self._position = checkpoint.position
+
+    def append(self, obj):
+        if (self._checkpoint.position != self._position and
+                len(self._items) >= self._maxsize):
+            self.flush()
+        self._position = self._checkpoint.position
+        self._items.append(obj)
+        self._count += 1
+
+    def flush(self):
+        if len(self._items):
+            writer = getattr(self._doc_cls, 'insert_writer', None)
+            if writer is not None:
+                # Only checkpoint batches that are in the database
+                writer.join()
+            self._checkpoint.begin_batch(self._items)
+        super(CheckpointInsertBuffer, self).flush()
+
+
+def file_fingerprint(path):
+    """
+    Returns a string that changes when a data file changes, based on its
+    size and modification time, or None if the file doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return "{}:{!r}".format(stat.st_size, stat.st_mtime)
+
+
+_resume = False
+
+
+def enable_resume():
+    """Resume interrupted loads instead of reloading files from the start"""
+    global _resume
+    _resume = True
+
+
+def disable_resume():
+    global _resume
+    _resume = False
+
+
+def resume_enabled():
+    return _resume
@@ -0,0 +1,338 @@
+"""
+Fast reading of large delimited (CSV/TSV) results files.
+
+Statewide precinct-level files can have millions of rows, most of which are
+for offices we don't load.  Reading them with ``csv.DictReader`` builds a
+dictionary for every row before a loader can decide to skip it.
+
+If pandas is installed, ``read_rows()`` parses the file in batches of
+columns instead.  Rows for unwanted offices are dropped and vote columns
+are cleaned for the whole batch at once, and dictionaries are only built
+for the rows that are left.  Without pandas, the same filtering and
+cleaning is done one row at a time with the ``csv`` module, checking the
+office before a row's dictionary is built.
+
+Both readers return rows the way ``csv.DictReader`` does: fields missing
+from short rows are None, and the extra fields of long rows are a list
+keyed by None, unless ``columns`` is specified.
+
+Loaders that only use some of a file's columns can pass ``columns`` so the
+other columns aren't parsed (with pandas) or copied into each row's
+dictionary.
+
+"""
+from builtins import object
+import csv
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def clean_votes(val):
+    """
+    Returns cleaned version of votes or 0 if it's a non-numeric value.
+    """
+    if isinstance(val, int):
+        return val
+
+    if val is None or val.strip() == '':
+        return 0
+
+    try:
+        return int(float(val))
+    except ValueError:
+        # Can't convert value from string
+        return 0
+
+
+class NullStrippingFile(object):
+    """
+    Wrap a file object, removing NULL bytes from everything that's read.
+
+    Some results files contain stray NULL bytes, which the csv module
+    refuses to parse.
+
+    """
+
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, size=-1):
+        return self._f.read(size).replace('\0', '')
+
+    def readline(self, size=-1):
+        return self._f.readline(size).replace('\0', '')
+
+    def __iter__(self):
+        for line in self._f:
+            yield line.replace('\0', '')
+
+
+def read_rows(f, delimiter=',', fieldnames=None, office_field=None,
+        keep_office=None, vote_fields=(), columns=None,
+        chunksize=DEFAULT_CHUNKSIZE, on_chunk=None):
+    """
+    Read rows from a delimited file, dropping rows for unwanted offices.
+
+    Args:
+        f: File-like object opened in text mode.
+        delimiter: Field delimiter.  Default is ','.
+        fieldnames: Column names to use if the file doesn't have a header
+            row.
+        office_field: Name of the column containing the office name.
+        keep_office: Function that takes an office name and returns True
+            if rows for that office should be kept.  It's only called once
+            for each distinct office name.
+        vote_fields: Names of columns whose values should be converted to
+            integers with ``clean_votes()``.  Columns that aren't in the
+            file are ignored.
+        columns: Names of the columns to include in each row.  Columns
+            that aren't in the file are ignored.  Default is all columns.
+        chunksize: Number of rows to parse at once when using pandas.
+        on_chunk: Optional function that is called with the number of rows
+            read and the number of rows skipped as each batch of rows is
+            parsed.
+
+    Yields:
+        A dictionary for each row that wasn't filtered out, keyed by column
+        name.  Values are strings, except for the vote fields.
+
+    """
+    keep = _memoize(keep_office) if keep_office is not None else None
+    if pandas is not None:
+        return _read_rows_pandas(f, delimiter, fieldnames, office_field, keep,
+            vote_fields, columns, chunksize, on_chunk)
+
+    return _read_rows_csv(f, delimiter, fieldnames, office_field, keep,
+        vote_fields, columns, on_chunk)
+
+
+def _memoize(keep_office):
+    office_matches = {}
+
+    def keep(office):
+        try:
+            return office_matches[office]
+        except KeyError:
+            match = bool(keep_office(office))
+            office_matches[office] = match
+            return match
+
+    return keep
+
+
+class _ExtraFields(str):
+    """
+    The last field of a row that has more fields than the header.  pandas
+    drops the extra fields, so they're carried along on it.
+    """
+
+
+def _read_rows_pandas(f, delimiter, fieldnames, office_field, keep,
+        vote_fields, columns, chunksize, on_chunk):
+    if fieldnames is None:
+        # Parse the header like the csv module does, so the number of
+        # fields is known before pandas sees any ragged rows
+        for fieldnames in csv.reader(f, delimiter=delimiter):
+            if fieldnames:
+                break
+        else:
+            return
+    num_fields = len(fieldnames)
+
+    def bad_line(fields):
+        # Rows with more fields than the header.  Rows with fewer get None
+        # for the missing fields, like the csv reader.
+        if columns is not None:
+            return fields[:num_fields]
+        last = _ExtraFields(fields[num_fields - 1])
+        last.extra = fields[num_fields:]
+        return fields[:num_fields - 1] + [last]
+
+    kwargs = {
+        'sep': delimiter,
+        'header': None,
+        'names': fieldnames,
+        'dtype': object,
+        # Keep empty values as empty strings instead of NaN
+        'keep_default_na': False,
+        'na_values': [],
+        # Only the Python parser can hand ragged rows to bad_line
+        'engine': 'python',
+        'on_bad_lines': bad_line,
+        'chunksize': chunksize,
+    }
+    if columns is not None:
+        # The office is needed for filtering even if it isn't wanted
+        usecols = set(columns)
+        if office_field is not None:
+            usecols.add(office_field)
+        kwargs['usecols'] = lambda c: c in usecols
+
+    last_field = fieldnames[-1]
+    for chunk in pandas.read_csv(f, **kwargs):
+        read = len(chunk)
+        if office_field is not None and keep is not None:
+            offices = chunk[office_field]
+            chunk = chunk[offices.isin([o for o in offices.unique() if keep(o)])]
+
+        if on_chunk is not None:
+            on_chunk(read, read - len(chunk))
+
+        extras = None
+        if columns is None:
+            extras = [getattr(v, 'extra', None) for v in chunk[last_field]]
+
+        votes = {}
+        for field in vote_fields:
+            if field in chunk.columns:
+                votes[field] = pandas.to_numeric(chunk[field].str.strip(),
+                    errors='coerce').fillna(0).astype(int)
+        if votes:
+            chunk = chunk.assign(**votes)
+        if (columns is not None and office_field is not None and
+                office_field not in columns):
+            chunk = chunk.drop(columns=[office_field])
+
+        for i, row in enumerate(chunk.to_dict('records')):
+            if extras is not None and extras[i] is not None:
+                if isinstance(row[last_field], _ExtraFields):
+                    row[last_field] = str(row[last_field])
+                row[None] = extras[i]
+            yield row
+
+
+def filter_rows(rows, office_field=None, keep_office=None, vote_fields=(),
+        on_chunk=None):
+    """
+    Drop rows for unwanted offices and clean vote values, like
+    ``read_rows()``, for rows that have already been parsed into
+    dictionaries.
+    """
+    keep = _memoize(keep_office) if keep_office is not None else None
+    return _filter_rows(rows, office_field, keep, vote_fields, on_chunk)
+
+
+def dict_rows(rows, fieldnames=None):
+    """
+    Convert rows that are lists of values into dictionaries, the way
+    ``csv.DictReader`` does.
+
+    If ``fieldnames`` isn't specified, the first row is used as the header.
+
+    """
+    rows = iter(rows)
+    if fieldnames is None:
+        for fieldnames in rows:
+            if fieldnames:
+                break
+        else:
+            return
+
+    num_fields = len(fieldnames)
+    for values in rows:
+        if not values:
+            # DictReader skips blank lines
+            continue
+        row = dict(zip(fieldnames, values))
+        if len(values) > num_fields:
+            row[None] = values[num_fields:]
+        elif len(values) < num_fields:
+            for field in fieldnames[len(values):]:
+                row[field] = None
+        yield row
+
+
+def read_list_rows(rows, fieldnames=None, office_field=None,
+        keep_office=None, vote_fields=(), columns=None, on_chunk=None):
+    """
+    Filter and clean rows that are lists of values, like ``read_rows()``
+    does for a file, returning dictionaries for the rows that are kept.
+
+    Unlike ``filter_rows(dict_rows(rows))``, rows for unwanted offices are
+    dropped before a dictionary is built for them.  If ``fieldnames`` isn't
+    specified, the first row is used as the header.
+
+    """
+    keep = _memoize(keep_office) if keep_office is not None else None
+    return _read_list_rows(rows, fieldnames, office_field, keep, vote_fields,
+        columns, on_chunk)
+
+
+def _read_rows_csv(f, delimiter, fieldnames, office_field, keep,
+        vote_fields, columns, on_chunk):
+    rows = csv.reader(f, delimiter=delimiter)
+    return _read_list_rows(rows, fieldnames, office_field, keep, vote_fields,
+        columns, on_chunk)
+
+
+def _read_list_rows(rows, fieldnames, office_field, keep, vote_fields,
+        columns, on_chunk):
+    rows = iter(rows)
+    if fieldnames is None:
+        for fieldnames in rows:
+            if fieldnames:
+                break
+        else:
+            return
+
+    num_fields = len(fieldnames)
+    if columns is None:
+        fields = list(enumerate(fieldnames))
+    else:
+        fields = [(i, f) for i, f in enumerate(fieldnames) if f in columns]
+    office_index = None
+    if office_field is not None and keep is not None:
+        office_index = fieldnames.index(office_field)
+    vote_fields = [f for i, f in fields if f in vote_fields]
+
+    for values in rows:
+        if not values:
+            # DictReader skips blank lines
+            continue
+
+        if office_index is not None:
+            office = values[office_index] if office_index < len(values) else None
+            if not keep(office):
+                if on_chunk is not None:
+                    on_chunk(1, 1)
+                continue
+
+        if on_chunk is not None:
+            on_chunk(1, 0)
+
+        if len(values) == num_fields:
+            row = dict((f, values[i]) for i, f in fields)
+        else:
+            row = dict((f, values[i] if i < len(values) else None)
+                       for i, f in fields)
+            if columns is None and len(values) > num_fields:
+                row[None] = values[num_fields:]
+
+        for field in vote_fields:
+            row[field] = clean_votes(row[field])
+
+        yield row
+
+
+def _filter_rows(rows, office_field, keep, vote_fields, on_chunk):
+    for row in rows:
+        if office_field is not None and keep is not None:
+            if not keep(row[office_field]):
+                if on_chunk is not None:
+                    on_chunk(1, 1)
+                continue
+
+        if on_chunk is not None:
+            on_chunk(1, 0)
+
+        for field in vote_fields:
+            if field in row:
+                row[field] = clean_votes(row[field])
+
+        yield row
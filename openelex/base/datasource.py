@@ -2,13 +2,13 @@ from future import standard_library
 standard_library.install_aliases()
 from builtins import next
 from os.path import join, splitext
-import re
 import urllib.parse
 
 import csv
 
 from openelex.api import elections as elec_api
 from openelex.lib.text import election_slug, slugify
+from .jurisdictions import JurisdictionIndex
 from .state import StateBase
 
 
@@ -236,6 +236,26 @@ class BaseDatasource(StateBase):
 
             return self._cached_jurisdiction_mappings
 
+    def jurisdiction_index(self):
+        """
+        Retrieve an index of the jurisdictional mappings.
+
+        The index is built once, and can be used to look up mappings by
+        OCD ID, FIPS code, name or any other column without scanning every
+        mapping.
+
+        Returns:
+            A ``JurisdictionIndex`` of the mappings returned by
+            ``jurisdiction_mappings()``.
+
+        """
+        try:
+            return self._cached_jurisdiction_index
+        except AttributeError:
+            self._cached_jurisdiction_index = JurisdictionIndex(
+                self.jurisdiction_mappings())
+            return self._cached_jurisdiction_index
+
     def place_mappings(self, filename=None):
         try:
             return self._cached_place_mappings
@@ -258,14 +278,7 @@ class BaseDatasource(StateBase):
             returned by ``jurisdictional_mappings()``.
 
         """
-        try:
-            return self._cached_counties
-        except AttributeError:
-            county_ocd_re = re.compile(r'ocd-division/country:us/state:' +
-                    self.state.lower() + r'/county:[^/]+$')
-            self._cached_counties = [m for m in self.jurisdiction_mappings()
-                if county_ocd_re.match(m['ocd_id'])]
-            return self._cached_counties
+        return self.jurisdiction_index().counties(self.state)
 
     def _election_slug(self, election):
         """
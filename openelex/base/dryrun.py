@@ -0,0 +1,178 @@
+"""
+Dry runs of the load process.
+
+While a ``DryRun`` is active, ``BaseLoader.run()`` parses data files and
+builds RawResult records as usual, but nothing is written to the database:
+previously loaded results aren't deleted, no checkpoints are recorded and
+batches of RawResults that loaders insert are counted and thrown away.
+No database connection is needed.
+
+A dry run can also stop loading each file after a sample of ``sample``
+RawResults has been built.  Since loaders often insert all of a file's
+results at once, at the end, a sample is never inserted.
+
+For each file, the number of RawResults built and the time taken are
+recorded, so loader changes can be checked against large files quickly.
+
+"""
+from __future__ import division, print_function
+from builtins import object
+import time
+
+from mongoengine import signals
+
+from openelex.models import RawResult
+from .profiling import format_table
+
+
+class SampleLimitReached(BaseException):
+    """
+    Raised when a loader starts to build a record past the end of a sample.
+
+    Like ``KeyboardInterrupt``, this isn't an ``Exception``, so loaders that
+    catch ``Exception`` to skip bad rows don't catch it too.
+    """
+
+
+class FileDryRunStats(object):
+    fields = [
+        'filename',
+        'rows_emitted',
+        'rows_inserted',
+        'sampled',
+        'seconds',
+        'rows_per_second',
+    ]
+
+    def __init__(self, filename):
+        self.filename = filename
+        # RawResults built by the loader
+        self.rows_emitted = 0
+        # RawResults the loader tried to insert
+        self.rows_inserted = 0
+        self.sampled = False
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        if not self.seconds:
+            return 0.0
+        return self.rows_emitted / self.seconds
+
+    def to_dict(self):
+        return dict((f, getattr(self, f)) for f in self.fields)
+
+
+class DryRun(object):
+    """
+    Context manager that makes ``BaseLoader.run()`` load files without
+    writing to the database.
+
+    Usage:
+
+        with DryRun(sample=1000) as dry_run:
+            for mapping in mappings:
+                loader.run(mapping)
+        print(dry_run.table())
+
+    """
+
+    offline = True
+    """Loaders don't need a database connection during a dry run"""
+
+    def __init__(self, sample=None):
+        self.sample = sample
+        self.files = []
+        self.current = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish()
+
+    def start(self):
+        global _dry_run
+        _dry_run = self
+        signals.pre_init.connect(self._pre_init, sender=RawResult)
+        signals.post_init.connect(self._post_init, sender=RawResult)
+        RawResult.insert_writer = self
+
+    def finish(self):
+        global _dry_run
+        if RawResult.insert_writer is self:
+            RawResult.insert_writer = None
+        signals.pre_init.disconnect(self._pre_init, sender=RawResult)
+        signals.post_init.disconnect(self._post_init, sender=RawResult)
+        if _dry_run is self:
+            _dry_run = None
+
+    def run(self, loader):
+        """Run a loader's ``load()`` method for the current data file"""
+        self.current = FileDryRunStats(loader.source)
+        self.files.append(self.current)
+        print("LOAD: %s (dry run)" % loader.source)
+        start = time.time()
+        try:
+            loader._run_load()
+        except SampleLimitReached:
+            self.current.sampled = True
+        finally:
+            self.current.seconds = time.time() - start
+            self.current = None
+
+    # Insert writer interface.  See ``openelex.base.pipeline``.
+
+    def put(self, raw):
+        if self.current is not None:
+            self.current.rows_inserted += len(raw)
+
+    def join(self):
+        pass
+
+    def _pre_init(self, sender, **kwargs):
+        # Stop before building a record past the sample, so a sample of N
+        # is N records
+        if (self.current is not None and self.sample and
+                self.current.rows_emitted >= self.sample):
+            raise SampleLimitReached()
+
+    def _post_init(self, sender, **kwargs):
+        if self.current is not None:
+            self.current.rows_emitted += 1
+
+    def totals(self):
+        """Returns a ``FileDryRunStats`` with the totals for all files"""
+        totals = FileDryRunStats('total')
+        for s in self.files:
+            totals.rows_emitted += s.rows_emitted
+            totals.rows_inserted += s.rows_inserted
+            totals.seconds += s.seconds
+        return totals
+
+    def table(self):
+        """Returns the collected stats formatted as a text table"""
+        headers = ['filename', 'emitted', 'inserted', 'seconds', 'rows/s']
+        rows = []
+        for s in self.files + [self.totals()]:
+            filename = s.filename
+            if s.sampled:
+                filename += ' (sample)'
+            rows.append([
+                filename,
+                str(s.rows_emitted),
+                str(s.rows_inserted),
+                "%.2f" % s.seconds,
+                "%.0f" % s.rows_per_second,
+            ])
+
+        return format_table(headers, rows)
+
+
+_dry_run = None
+
+
+def get_dry_run():
+    """Returns the active ``DryRun`` or None"""
+    return _dry_run
@@ -0,0 +1,190 @@
+"""
+Fast lookups of jurisdiction mappings.
+
+Loaders often need to find the OCD ID for a county or other jurisdiction
+named in a results file.  Scanning the list of jurisdiction mappings for
+every row gets slow for large files, so ``JurisdictionIndex`` indexes the
+mappings by OCD ID and builds a dictionary for any other column the first
+time it's used to look up a mapping.
+
+"""
+from builtins import object
+from builtins import str
+import re
+
+
+def normalize_key(value):
+    """
+    Normalize a value for use as a key in a ``JurisdictionIndex``.
+
+    Comparisons ignore case and whitespace, and numbers are compared
+    without leading zeros, so '05143', '5143' and 5143 are the same FIPS
+    code.
+
+    """
+    key = re.sub(r'\s+', '', str(value)).upper()
+    if key.isdigit():
+        key = str(int(key))
+    return key
+
+
+def parent_ocd_id(ocd_id):
+    """
+    Returns the OCD ID of the division that contains ``ocd_id``, or None
+    for a country.
+    """
+    bits = ocd_id.split('/')
+    if len(bits) <= 2:
+        return None
+    return '/'.join(bits[:-1])
+
+
+class JurisdictionIndex(object):
+    """
+    Index of jurisdiction mappings, as returned by
+    ``BaseDatasource.jurisdiction_mappings()``.
+
+    Usage:
+
+        index = JurisdictionIndex(datasource.jurisdiction_mappings())
+        index.ocd_id('county', 'Prince George\'s')
+        index.get('fips', '24033')
+        index.children('ocd-division/country:us/state:md')
+
+    """
+
+    name_fields = ('name', 'county', 'jurisdiction', 'results_name')
+    """Columns that contain a jurisdiction's name, in order of preference"""
+
+    def __init__(self, mappings):
+        self.mappings = list(mappings)
+        self._by_ocd_id = {}
+        self._children = {}
+        self._by_field = {}
+
+        for mapping in self.mappings:
+            ocd_id = mapping.get('ocd_id')
+            if not ocd_id:
+                continue
+
+            self._by_ocd_id.setdefault(ocd_id, mapping)
+            parent = parent_ocd_id(ocd_id)
+            if parent is not None:
+                self._children.setdefault(parent, []).append(mapping)
+
+    def __len__(self):
+        return len(self.mappings)
+
+    def _field_index(self, field):
+        try:
+            return self._by_field[field]
+        except KeyError:
+            pass
+
+        index = {}
+        for mapping in self.mappings:
+            value = mapping.get(field)
+            if value is None or value == '':
+                continue
+            # Keep the first mapping for a value, like a linear scan would
+            index.setdefault(normalize_key(value), mapping)
+
+        self._by_field[field] = index
+        return index
+
+    def get(self, field, value):
+        """
+        Returns the first mapping whose ``field`` column matches ``value``.
+
+        Raises:
+            KeyError if there is no matching mapping.
+
+        """
+        try:
+            return self._field_index(field)[normalize_key(value)]
+        except KeyError:
+            raise KeyError("No jurisdiction with {} '{}' found".format(field,
+                value))
+
+    def ocd_id(self, field, value):
+        """Returns the OCD ID of the mapping whose ``field`` matches ``value``"""
+        return self.get(field, value)['ocd_id']
+
+    def by_ocd_id(self, ocd_id):
+        try:
+            return self._by_ocd_id[ocd_id]
+        except KeyError:
+            raise KeyError("No jurisdiction with OCD ID '{}' found".format(
+                ocd_id))
+
+    def by_fips(self, fips):
+        return self.get('fips', fips)
+
+    def by_name(self, name):
+        """
+        Returns the mapping for a jurisdiction name, checking each of the
+        ``name_fields`` columns in turn.
+        """
+        for field in self.name_fields:
+            try:
+                return self.get(field, name)
+            except KeyError:
+                continue
+
+        raise KeyError("No jurisdiction named '{}' found".format(name))
+
+    def children(self, ocd_id):
+        """Returns the mappings for divisions directly under ``ocd_id``"""
+        return list(self._children.get(ocd_id, []))
+
+    def parent(self, ocd_id):
+        """
+        Returns the mapping of the division containing ``ocd_id``.
+
+        Raises:
+            KeyError if the parent division isn't in the mappings.
+
+        """
+        return self.by_ocd_id(parent_ocd_id(ocd_id))
+
+    def counties(self, state):
+        """Returns the mappings for a state's counties"""
+        cache_key = ('county_mappings', state.lower())
+        try:
+            return self._by_field[cache_key]
+        except KeyError:
+            pass
+
+        state_ocd_id = 'ocd-division/country:us/state:' + state.lower()
+        counties = [m for m in self.children(state_ocd_id)
+                    if m['ocd_id'].split('/')[-1].startswith('county:')]
+        self._by_field[cache_key] = counties
+        return counties
+
+    def county_ocd_id(self, state, name):
+        """
+        Returns the OCD ID of the county named ``name``.
+
+        Raises:
+            KeyError if there's no county with that name.
+
+        """
+        try:
+            return self._counties_by_name(state)[normalize_key(name)]['ocd_id']
+        except KeyError:
+            raise KeyError("No county matching '{}' found".format(name))
+
+    def _counties_by_name(self, state):
+        cache_key = ('counties', state.lower())
+        try:
+            return self._by_field[cache_key]
+        except KeyError:
+            pass
+
+        counties = {}
+        for mapping in self.counties(state):
+            for field in self.name_fields:
+                if mapping.get(field):
+                    counties.setdefault(normalize_key(mapping[field]), mapping)
+        self._by_field[cache_key] = counties
+        return counties
@@ -1,16 +1,87 @@
 from __future__ import print_function
+from builtins import object
+import csv
 import datetime
 import json
 from os.path import join
 import re
 import io
+import time
 
 import unicodecsv
 
+from openelex.lib.insertbuffer import BulkInsertBuffer
 from openelex.models import RawResult
+from .checkpoint import (Checkpoint, CheckpointInsertBuffer, file_fingerprint,
+    resume_enabled)
+from .columnar import NullStrippingFile, read_list_rows, read_rows
+from .dryrun import get_dry_run
+from .profiling import get_profiler
+from .rowcache import RowCache, row_cache_enabled
+from .sink import get_sink
+from .spreadsheet import StreamingWorkbook
 from .state import StateBase
 
 
+class LoadContext(object):
+    """
+    Election metadata shared by all the RawResults loaded from a data file.
+
+    ``BaseLoader`` builds one of these the first time its ``context``
+    attribute is used during a call to ``run()``, so the election metadata
+    is looked up and the dates are parsed once per file, rather than for
+    every row.
+
+    """
+
+    def __init__(self, loader):
+        self.source = loader.source
+        self.election_id = loader.election_id
+        self.state = loader.state.upper()
+        self.timestamp = loader.timestamp
+
+        date = self.election_id[3:13]
+        year = re.search(r'\d{4}', self.election_id).group()
+        elecs = loader.datasource.elections(date)[year]
+        # Get election metadata by matching on election slug
+        self.election = [e for e in elecs if e['slug'] == self.election_id][0]
+        self.start_date = datetime.datetime.strptime(
+            self.election['start_date'], "%Y-%m-%d")
+        self.end_date = datetime.datetime.strptime(
+            self.election['end_date'], "%Y-%m-%d")
+
+        self.state_ocd_id = 'ocd-division/country:us/state:{}'.format(
+            loader.state.lower())
+        """OCD ID of the state"""
+        mapping = getattr(loader, 'mapping', None) or {}
+        self.ocd_id = mapping.get('ocd_id') or self.state_ocd_id
+        """
+        OCD ID of the jurisdiction covered by the data file, to use as a
+        prefix for the OCD IDs of the jurisdictions in the file
+        """
+
+        self._election_kwargs = {
+            'created': self.timestamp,
+            'updated': self.timestamp,
+            'source': self.source,
+            'election_id': self.election_id,
+            'state': self.state,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'election_type': self.election['race_type'],
+            'primary_type': self.election['primary_type'],
+            'result_type': self.election['result_type'],
+            'special': self.election['special'],
+        }
+
+    def election_kwargs(self):
+        """
+        Returns a new dictionary of fields derived from the OpenElex API
+        and common to all RawResults.
+        """
+        return self._election_kwargs.copy()
+
+
 class BaseLoader(StateBase):
     """
     Base class for loading results data into MongoDB
@@ -28,6 +99,11 @@ class BaseLoader(StateBase):
 
     """
 
+    checkpoint = None
+    """``Checkpoint`` for the data file being loaded by ``run()``"""
+
+    _context = None
+
     def __init__(self):
         super(BaseLoader, self).__init__()
 
@@ -42,6 +118,17 @@ class BaseLoader(StateBase):
         call ``load()`` to create the RawResult model instances in the
         data store.
 
+        If resuming is enabled (see
+        ``openelex.base.checkpoint.enable_resume()``), progress is recorded
+        in a ``LoadCheckpoint``, files that were completely loaded before,
+        and haven't changed since, are skipped and interrupted loads
+        continue from their last checkpoint.
+
+        During a dry run (see ``openelex.base.dryrun``), the file is parsed
+        but nothing is written to the database.  While a ``SpoolSink`` is
+        active (see ``openelex.base.sink``), results are written to a file
+        instead of the database.
+
         Arguments:
 
           mapping (dict): A mapping, as returned by Datasource.mappings() that
@@ -54,9 +141,63 @@ class BaseLoader(StateBase):
         self.source = mapping['generated_filename']
         self.timestamp = datetime.datetime.now()
         self.election_id = mapping['election']
+        self._context = None
+        self.checkpoint = None
+
+        # Dry runs and spooled loads don't touch the database
+        runner = get_dry_run() or get_sink()
+        if runner is not None:
+            runner.run(self)
+            return
 
-        self.delete_previously_loaded()
-        self.load()
+        if resume_enabled():
+            fingerprint = file_fingerprint(join(self.cache.abspath,
+                self.source))
+            self.checkpoint = Checkpoint.start(self.source, self.election_id,
+                fingerprint=fingerprint, resume=True)
+
+        if self.checkpoint is not None and self.checkpoint.complete:
+            print("LOAD: %s" % self.source)
+            print("\tAlready loaded, skipping")
+            return
+
+        if self.checkpoint is not None and self.checkpoint.rows:
+            print("LOAD: %s" % self.source)
+            print("\tResuming after row %d" % self.checkpoint.rows)
+        else:
+            self.delete_previously_loaded()
+
+        if RawResult.insert_writer is not None:
+            # Keep this file's batches, and insert errors, apart from the
+            # files that other threads are loading
+            RawResult.insert_writer.begin_file()
+        self._run_load()
+        if RawResult.insert_writer is not None:
+            # Make sure all of the file's results have been inserted before
+            # marking it as loaded
+            RawResult.insert_writer.join()
+        if self.checkpoint is not None:
+            self.checkpoint.finish()
+
+    def _run_load(self):
+        profiler = get_profiler()
+        if profiler is None:
+            self.load()
+            return
+
+        profiler.start_file(self.source)
+        wrap_skip_row = hasattr(self, '_skip_row')
+        if wrap_skip_row:
+            self._skip_row = profiler.wrap_skip_row(self._skip_row)
+        start = time.time()
+        try:
+            self.load()
+            if RawResult.insert_writer is not None:
+                profiler.join_writer(RawResult.insert_writer)
+        finally:
+            profiler.end_file(time.time() - start)
+            if wrap_skip_row:
+                del self._skip_row
 
     def delete_previously_loaded(self):
         """
@@ -106,6 +247,135 @@ class BaseLoader(StateBase):
     def _xls_file_path(self):
         return join(self.cache.abspath, self.source)
 
+    def _open_workbook(self):
+        """
+        Open the data file as a ``StreamingWorkbook``.
+
+        Worksheets are only parsed when their rows are read, so this should
+        be preferred over calling ``xlrd.open_workbook()`` directly.
+        """
+        return StreamingWorkbook(self._xls_file_path,
+            row_cache=self._row_cache())
+
+    def _row_cache(self):
+        """Returns the state's ``RowCache`` if the row cache is enabled"""
+        if not row_cache_enabled():
+            return None
+
+        return RowCache(self.cache.rows_path)
+
+    def _read_rows(self, delimiter=',', fieldnames=None, office_field=None,
+            keep_office=None, vote_fields=(), columns=None,
+            strip_nulls=False):
+        """
+        Iterate through the rows of a delimited data file.
+
+        Rows for offices that ``keep_office`` rejects are dropped, and the
+        ``vote_fields`` columns are converted to integers, before a
+        dictionary with the ``columns`` the loader uses is built for the
+        row.  See ``openelex.base.columnar.read_rows()`` for details of the
+        arguments.
+
+        This uses pandas to parse the file in batches if it's installed,
+        which is much faster for large files.
+
+        Set ``strip_nulls`` to remove NULL bytes from the file before
+        parsing.
+
+        If the row cache is enabled, parsed rows are read from, or saved
+        to, the cache and then filtered.
+
+        """
+        profiler = get_profiler()
+        on_chunk = profiler.record_rows if profiler is not None else None
+
+        row_cache = self._row_cache()
+        if row_cache is not None:
+            rows = self._cached_delimited_rows(row_cache, delimiter,
+                strip_nulls)
+            for row in read_list_rows(rows, fieldnames,
+                    office_field=office_field, keep_office=keep_office,
+                    vote_fields=vote_fields, columns=columns,
+                    on_chunk=on_chunk):
+                yield row
+            return
+
+        with self._file_handle as f:
+            if strip_nulls:
+                f = NullStrippingFile(f)
+
+            for row in read_rows(f, delimiter=delimiter, fieldnames=fieldnames,
+                    office_field=office_field, keep_office=keep_office,
+                    vote_fields=vote_fields, columns=columns,
+                    on_chunk=on_chunk):
+                yield row
+
+    def _cached_delimited_rows(self, row_cache, delimiter, strip_nulls):
+        """
+        Iterate through the rows of a delimited data file, as lists of
+        values, from the row cache, parsing and caching them first if
+        needed.
+        """
+        path = join(self.cache.abspath, self.source)
+        parser = "csv-{}{}".format(ord(delimiter),
+            '-nonulls' if strip_nulls else '')
+        rows = row_cache.iter_rows(path, parser)
+        if rows is not None:
+            for row in rows:
+                yield row
+            return
+
+        # Rows are yielded as they're parsed, but have to be kept until the
+        # whole file has been read to be cached
+        rows = []
+        with self._file_handle as f:
+            if strip_nulls:
+                f = NullStrippingFile(f)
+            for row in csv.reader(f, delimiter=delimiter):
+                rows.append(row)
+                yield row
+        row_cache.put(path, parser, rows)
+
+    def _resume_rows(self, rows):
+        """
+        Iterate through a data file's rows, skipping rows that were loaded
+        by an interrupted load that is being resumed.
+
+        Use this with ``_insert_buffer()`` so the position in the file is
+        checkpointed as results are inserted.  Rows must be read in the
+        same order each time the file is loaded.  When profiling, the rows
+        are counted as rows read.
+
+        """
+        if self.checkpoint is not None:
+            rows = self.checkpoint.resume_rows(rows)
+
+        profiler = get_profiler()
+        if profiler is not None:
+            return profiler.count_rows(rows)
+        return iter(rows)
+
+    def _insert_buffer(self, maxsize=1000):
+        """
+        Returns a ``BulkInsertBuffer`` for RawResults that checkpoints the
+        rows returned by ``_resume_rows()`` as each batch is inserted.
+        """
+        if self.checkpoint is None:
+            return BulkInsertBuffer(RawResult, maxsize=maxsize)
+
+        return CheckpointInsertBuffer(self.checkpoint, RawResult,
+            maxsize=maxsize)
+
+    @property
+    def context(self):
+        """``LoadContext`` for the data file being loaded"""
+        context = self._context
+        if (context is None or context.source != self.source or
+                context.election_id != self.election_id):
+            # Loaders can be pointed at another file without calling run()
+            self._context = LoadContext(self)
+        return self._context
+
     def _build_common_election_kwargs(self):
         """
         Returns a dictionary of fields derived from the OpenElex API
@@ -114,22 +384,7 @@ class BaseLoader(StateBase):
         This dictionary can be used to specify some of the keyword
         arguments when constructing new RawResult records in a
         load implementation.
+
+        This is the same as ``self.context.election_kwargs()``.
         """
-        date = self.election_id[3:13]
-        year = re.search(r'\d{4}', self.election_id).group()
-        elecs = self.datasource.elections(date)[year]
-        # Get election metadata by matching on election slug
-        elec_meta = [e for e in elecs if e['slug'] == self.election_id][0]
-        return {
-            'created': self.timestamp,
-            'updated': self.timestamp,
-            'source': self.source,
-            'election_id': self.election_id,
-            'state': self.state.upper(),
-            'start_date': datetime.datetime.strptime(elec_meta['start_date'], "%Y-%m-%d"),
-            'end_date': datetime.datetime.strptime(elec_meta['end_date'], "%Y-%m-%d"),
-            'election_type': elec_meta['race_type'],
-            'primary_type': elec_meta['primary_type'],
-            'result_type': elec_meta['result_type'],
-            'special': elec_meta['special'],
-        }
+        return self.context.election_kwargs()
@@ -0,0 +1,185 @@
+"""
+Cache of parsed candidate names.
+
+Transforms split each candidate's full name into given, middle and family
+names and a suffix with ``nameparser.HumanName``, which is slow compared to
+the rest of the work of building a Candidate.  The same names come up again
+and again, in every county's results and in every transform that builds
+candidates, so ``parse_name()`` looks them up in a process-wide LRU cache,
+``NameCache``, before parsing them.
+
+Parsed names are returned as ``ParsedName`` tuples, rather than
+``HumanName`` instances, so that a cached name can't be changed by one
+caller and seen by the next.
+
+The cache can be saved to a file, by default ``parsed_names.pickle`` in the
+state's cache directory, with ``save_name_cache()`` and loaded again with
+``load_name_cache()``, so that later runs start with the names parsed by
+earlier ones.  Saved entries include the nameparser version and
+``NAME_CACHE_VERSION`` and are ignored once either changes.
+
+"""
+from builtins import object
+from collections import OrderedDict, namedtuple
+import os
+import pickle
+import threading
+
+import nameparser
+from nameparser import HumanName
+
+
+NAME_CACHE_VERSION = 1
+"""Increment this to invalidate saved name caches"""
+
+DEFAULT_MAXSIZE = 100000
+
+
+ParsedName = namedtuple('ParsedName',
+    ['title', 'first', 'middle', 'last', 'suffix', 'nickname'])
+
+
+def _cache_version():
+    return (NAME_CACHE_VERSION, getattr(nameparser, '__version__', None))
+
+
+class NameCache(object):
+    """
+    Bounded LRU cache of parsed names.
+
+    Usage:
+
+        cache = NameCache(maxsize=10000)
+        name = cache.parse("Martin J. O'Malley")
+        name.first, name.last
+
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def parse(self, full_name):
+        """
+        Returns a ``ParsedName`` for a full name.
+
+        Raises the same exceptions as ``HumanName``, e.g. ``TypeError`` if
+        ``full_name`` isn't a string.
+
+        """
+        with self._lock:
+            try:
+                name = self._names.pop(full_name)
+            except KeyError:
+                pass
+            else:
+                # Move the name to the most recently used end
+                self._names[full_name] = name
+                self.hits += 1
+                return name
+
+        human_name = HumanName(full_name)
+        name = ParsedName(human_name.title, human_name.first,
+            human_name.middle, human_name.last, human_name.suffix,
+            human_name.nickname)
+
+        with self._lock:
+            self.misses += 1
+            self._names[full_name] = name
+            while len(self._names) > self.maxsize:
+                self._names.popitem(last=False)
+        return name
+
+    def clear(self):
+        with self._lock:
+            self._names.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Returns a dictionary of the cache's size, hits and misses"""
+        return {
+            'size': len(self._names),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def load(self, path):
+        """
+        Add the names saved in a file to the cache.
+
+        Returns the number of names loaded.  Missing files and files saved
+        by other versions of the cache or of nameparser are ignored.
+
+        """
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return 0
+
+        if data.get('version') != _cache_version():
+            return 0
+
+        names = data['names'][-self.maxsize:]
+        with self._lock:
+            for full_name, fields in names:
+                if full_name not in self._names:
+                    self._names[full_name] = ParsedName(*fields)
+            while len(self._names) > self.maxsize:
+                self._names.popitem(last=False)
+        return len(names)
+
+    def save(self, path):
+        """Save the cached names to a file, least recently used first"""
+        with self._lock:
+            names = [(full_name, tuple(name))
+                     for full_name, name in self._names.items()]
+
+        directory = os.path.dirname(path)
+        if directory:
+            try:
+                os.makedirs(directory)
+            except OSError:
+                pass
+
+        data = {
+            'version': _cache_version(),
+            'names': names,
+        }
+        # Write to a temporary file first so a partly written cache is never
+        # read
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, 2)
+        os.rename(tmp_path, path)
+
+
+_cache = NameCache()
+
+
+def get_name_cache():
+    """Returns the process-wide ``NameCache``"""
+    return _cache
+
+
+def parse_name(full_name):
+    """Parse a full name, using the process-wide ``NameCache``"""
+    return _cache.parse(full_name)
+
+
+def load_name_cache(path):
+    """Add the names saved in a file to the process-wide ``NameCache``"""
+    return _cache.load(path)
+
+
+def save_name_cache(path):
+    """Save the process-wide ``NameCache`` to a file"""
+    _cache.save(path)
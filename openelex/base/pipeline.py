@@ -0,0 +1,453 @@
+"""
+Pipelined loading.
+
+Normally a loader parses rows and inserts RawResults on the same thread, so
+parsing stops while each batch of records is being inserted and the
+database sits idle while rows are parsed.  This module overlaps the two:
+
+* ``InsertWriterPool`` runs a pool of writer threads.  While it's active,
+  batches of RawResults that loaders insert are put on a bounded queue and
+  inserted by the writer threads, so the loader can go back to parsing
+  right away.  When the queue is full, the loader waits for the writers to
+  catch up, so memory use stays bounded.
+* ``run_pipelined()`` loads data files in a pool of worker processes, each
+  with its own ``InsertWriterPool``, so files are parsed in parallel.
+* ``run_by_election()`` loads the files of one election at a time, with the
+  files of each election, usually one per county, loaded concurrently by a
+  pool of worker processes or threads.  Progress is reported as each
+  county's file finishes.
+
+Loaders don't need to change to take advantage of this, as long as they
+insert RawResults in batches, with ``RawResult.objects.insert()`` or a
+``BulkInsertBuffer``.  Batches that are checkpointed (see
+``openelex.base.checkpoint``) wait for the previous batch to be written
+before they are queued, so only one of them is in flight at a time.
+
+"""
+from __future__ import print_function
+from builtins import object
+from builtins import range
+from collections import OrderedDict
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+import multiprocessing.util
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+from openelex.models import RawResult
+from .checkpoint import enable_resume
+from .profiling import enable_profiling, get_profiler
+from .rowcache import enable_row_cache
+
+
+DEFAULT_WRITERS = 2
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_BATCH_SIZE = 1000
+
+
+class InsertWriterPool(object):
+    """
+    Insert batches of documents on background threads.
+
+    Usage:
+
+        with InsertWriterPool(writers=2, queue_size=4) as writer:
+            loader.run(mapping)
+
+    Several threads can load files through the same pool.  Batches, and
+    the errors inserting them, are tracked per file: ``BaseLoader.run()``
+    calls ``begin_file()`` before a file is loaded, and ``put()`` and
+    ``join()`` only wait for, and raise the errors of, the batches of the
+    file that the calling thread is loading.  Once a batch of a file fails,
+    the file's later batches, including the ones that were already queued,
+    are thrown away until its loader calls ``join()``, but other files'
+    batches are still inserted.
+
+    """
+
+    _stop = object()
+
+    queued = True
+    """Documents are inserted by the writer threads, not by ``put()``"""
+
+    def __init__(self, doc_cls=RawResult, writers=DEFAULT_WRITERS,
+            queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        self.doc_cls = doc_cls
+        self.writers = writers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._queue = None
+        self._threads = []
+        self._local = threading.local()
+        self._files = itertools.count(1)
+        self._cond = threading.Condition()
+        # Number of queued batches, and first insert error, by file
+        self._pending = {}
+        self._errors = {}
+        # Files with a failed batch, whose queued batches are thrown away
+        # until their loader calls join()
+        self._failed = set()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(wait=exc_type is None)
+
+    def start(self):
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._pending = {}
+        self._errors = {}
+        self._failed = set()
+        self._threads = []
+        for i in range(self.writers):
+            thread = threading.Thread(target=self._write,
+                name='insert-writer-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+        self.doc_cls.insert_writer = self
+
+    def begin_file(self):
+        """
+        Start tracking the batches put by the calling thread as a new file's.
+        """
+        with self._cond:
+            self._local.file = next(self._files)
+
+    def _file(self):
+        return getattr(self._local, 'file', None)
+
+    def put(self, raw):
+        """
+        Queue documents, already converted with ``to_mongo()``, to be
+        inserted.  Blocks while the queue is full.
+
+        Lists longer than ``batch_size`` are split into batches, so loaders
+        that insert a whole file's results at once still get them inserted
+        by several writers.
+
+        Raises the first error inserting an earlier batch of the file.
+
+        """
+        f = self._file()
+        profiler = get_profiler()
+        # Insert times are added to the stats of the file being profiled
+        stats = profiler.current if profiler is not None else None
+        for i in range(0, len(raw), self.batch_size):
+            self._raise_error(f)
+            with self._cond:
+                self._pending[f] = self._pending.get(f, 0) + 1
+            self._queue.put((f, stats, raw[i:i + self.batch_size]))
+
+    def join(self):
+        """
+        Wait until the queued batches of the calling thread's file have been
+        inserted.
+
+        Raises the first error inserting one of them.
+
+        """
+        f = self._file()
+        with self._cond:
+            while self._pending.get(f):
+                self._cond.wait()
+            error = self._errors.pop(f, None)
+            self._failed.discard(f)
+        if error is not None:
+            raise error
+
+    def close(self, wait=True):
+        """
+        Stop the writer threads.
+
+        If ``wait`` is True, the queued batches are inserted first, and the
+        first error inserting a batch that wasn't raised to its file's
+        loader is raised.
+
+        """
+        if self.doc_cls.insert_writer is self:
+            self.doc_cls.insert_writer = None
+
+        if not wait:
+            # Throw away batches that haven't been written
+            try:
+                while True:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+            except queue.Empty:
+                pass
+
+        for thread in self._threads:
+            self._queue.put(self._stop)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        if wait:
+            with self._cond:
+                errors = list(self._errors.values())
+                self._errors = {}
+            if errors:
+                raise errors[0]
+
+    def _write(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._stop:
+                    return
+                f, stats, raw = item
+                start = time.time()
+                try:
+                    if f not in self._failed:
+                        self.doc_cls.objects.insert_raw(raw)
+                except Exception as e:
+                    with self._cond:
+                        self._errors.setdefault(f, e)
+                        self._failed.add(f)
+                finally:
+                    with self._cond:
+                        if stats is not None:
+                            stats.insert_seconds += time.time() - start
+                        self._pending[f] -= 1
+                        if not self._pending[f]:
+                            del self._pending[f]
+                        self._cond.notify_all()
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self, f):
+        # The file stays failed, so batches that are still queued aren't
+        # inserted after the error is raised
+        with self._cond:
+            error = self._errors.pop(f, None)
+        if error is not None:
+            raise error
+
+
+def _new_loader(state):
+    load_mod = __import__('openelex.us.%s' % state.lower(), fromlist=['load'])
+    return load_mod.load.LoadResults()
+
+
+# Worker processes
+
+_worker = {}
+
+
+def _init_worker(state, writers, queue_size, bulk_write_concern, resume,
+        row_cache, profile):
+    # Connections can't be shared with the parent process
+    from mongoengine.connection import disconnect
+    from openelex.db import init_db
+    disconnect()
+    init_db()
+
+    RawResult.bulk_write_concern = bulk_write_concern
+    if resume:
+        enable_resume()
+    if row_cache:
+        enable_row_cache()
+    if profile:
+        enable_profiling()
+
+    _worker['loader'] = _new_loader(state)
+    _worker['writer'] = InsertWriterPool(writers=writers,
+        queue_size=queue_size)
+    _worker['writer'].start()
+    # Worker processes exit without running atexit handlers, so stop the
+    # writer threads with a multiprocessing finalizer
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    from mongoengine.connection import disconnect
+    writer = _worker.pop('writer', None)
+    if writer is not None:
+        writer.close()
+    disconnect()
+
+
+def _load_file(mapping):
+    writer = _worker['writer']
+    profiler = get_profiler()
+    if profiler is not None:
+        profiler.files = []
+
+    _worker['loader'].run(mapping)
+    # Don't report the file as loaded until its records are inserted
+    writer.join()
+
+    if profiler is not None:
+        return profiler.files
+    return []
+
+
+def _load_county(mapping):
+    start = time.time()
+    file_stats = _load_file(mapping)
+    return mapping, time.time() - start, file_stats
+
+
+# Worker threads
+
+_thread_state = threading.local()
+
+
+def _load_county_thread(args):
+    state, mapping = args
+    loader = getattr(_thread_state, 'loader', None)
+    if loader is None:
+        # Loaders keep the state of the file they're loading, so each thread
+        # needs its own
+        loader = _thread_state.loader = _new_loader(state)
+
+    start = time.time()
+    loader.run(mapping)
+    return mapping, time.time() - start, []
+
+
+def run_pipelined(state, mappings, processes, writers=DEFAULT_WRITERS,
+        queue_size=DEFAULT_QUEUE_SIZE, resume=False, row_cache=False):
+    """
+    Load data files in parallel worker processes.
+
+    Args:
+        state: State abbreviation.
+        mappings: Mappings, as returned by ``Datasource.mappings()``, of
+            the files to load.
+        processes: Number of worker processes.
+        writers: Number of writer threads in each worker process.
+        queue_size: Number of batches of records each worker process can
+            queue for its writers before parsing waits for them.
+        resume: Resume interrupted loads.  See
+            ``openelex.base.checkpoint``.
+        row_cache: Cache parsed rows.  See ``openelex.base.rowcache``.
+
+    Profiling stats from the worker processes are added to the active
+    ``LoadProfiler``, if there is one.
+
+    """
+    profiler = get_profiler()
+    initargs = (state, writers, queue_size, RawResult.bulk_write_concern,
+        resume, row_cache, profiler is not None)
+    pool = multiprocessing.Pool(processes, initializer=_init_worker,
+        initargs=initargs)
+    try:
+        for file_stats in pool.imap_unordered(_load_file, list(mappings)):
+            if profiler is not None:
+                profiler.files.extend(file_stats)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def group_by_election(mappings):
+    """
+    Returns a list of ``(election_id, mappings)`` tuples, with the
+    elections in the order they first appear in ``mappings``.
+    """
+    groups = OrderedDict()
+    for mapping in mappings:
+        groups.setdefault(mapping['election'], []).append(mapping)
+    return list(groups.items())
+
+
+def county_label(mapping):
+    """
+    Returns the name used to report progress loading a data file.
+
+    Mappings for per-county files have the county's name.  Others fall back
+    to the file name.
+    """
+    return mapping.get('name') or mapping['generated_filename']
+
+
+def run_by_election(state, mappings, workers, threads=False,
+        writers=DEFAULT_WRITERS, queue_size=DEFAULT_QUEUE_SIZE, resume=False,
+        row_cache=False):
+    """
+    Load data files one election at a time, loading each election's files
+    concurrently.
+
+    States like MD, IA and WA publish precinct results in a file per county,
+    so a statewide load spends most of its time going through dozens of
+    county files one after another.  Loading them concurrently means an
+    election takes about as long as its largest few files.
+
+    Args:
+        state: State abbreviation.
+        mappings: Mappings, as returned by ``Datasource.mappings()``, of
+            the files to load.
+        workers: Number of files of an election to load at the same time.
+        threads: Load files in threads of this process instead of worker
+            processes.  Threads share the active ``InsertWriterPool`` and
+            ``BulkLoad``, if there are any, but since parsing holds the GIL,
+            they mostly help when inserts are the bottleneck.
+        writers: Number of writer threads in each worker process.  Ignored
+            when ``threads`` is True.
+        queue_size: Number of batches of records each worker process can
+            queue for its writers before parsing waits for them.  Ignored
+            when ``threads`` is True.
+        resume: Resume interrupted loads.  See
+            ``openelex.base.checkpoint``.
+        row_cache: Cache parsed rows.  See ``openelex.base.rowcache``.
+
+    Profiling isn't supported with threads, since the profiler records one
+    file at a time.  With worker processes, profiling stats are added to
+    the active ``LoadProfiler``, if there is one.
+
+    """
+    profiler = get_profiler()
+    if threads:
+        if profiler is not None:
+            raise ValueError("Profiling isn't supported when loading files "
+                "in threads")
+        pool = ThreadPool(workers)
+        load = _load_county_thread
+    else:
+        initargs = (state, writers, queue_size, RawResult.bulk_write_concern,
+            resume, row_cache, profiler is not None)
+        pool = multiprocessing.Pool(workers, initializer=_init_worker,
+            initargs=initargs)
+        load = _load_county
+
+    try:
+        for election_id, election_mappings in group_by_election(mappings):
+            print("ELECTION: %s (%d files)" % (election_id,
+                len(election_mappings)))
+            start = time.time()
+            if threads:
+                args = [(state, m) for m in election_mappings]
+            else:
+                args = election_mappings
+            results = pool.imap_unordered(load, args)
+            for i, result in enumerate(results, 1):
+                mapping, seconds, file_stats = result
+                print("\t%d/%d %s (%.1fs)" % (i, len(election_mappings),
+                    county_label(mapping), seconds))
+                if profiler is not None:
+                    profiler.files.extend(file_stats)
+
+            # Each file's results were inserted before its loader returned,
+            # see BaseLoader.run()
+            print("\tLoaded %s in %.1fs" % (election_id, time.time() - start))
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
@@ -0,0 +1,289 @@
+"""
+Profiling for the load process.
+
+When profiling is enabled with ``enable_profiling()``, ``BaseLoader.run()``
+records, for each data file:
+
+* The number of rows read, skipped and inserted
+* Time spent parsing the file (everything in ``load()`` that isn't one of
+  the following)
+* Time spent constructing ``RawResult`` documents
+* Time spent inserting ``RawResult`` documents into the database, or, during
+  a dry run or spooled load, counting them or writing them to spool files
+* Time the loader spent queuing documents for an ``InsertWriterPool`` and
+  waiting for the queue to drain
+* Peak resident set size of the process when the file finished loading.
+  This is the peak for the whole process so far, not just for the file.
+
+Rows read are counted as ``BaseLoader._read_rows()`` and
+``BaseLoader._resume_rows()`` yield them, and are left blank for loaders that
+read rows some other way.  Rows skipped are counted by ``_read_rows()`` and
+from a loader's ``_skip_row()`` method.
+Document construction and inserts are timed with MongoEngine signals, so
+they're measured no matter how a loader creates and saves its records.
+When an ``InsertWriterPool`` is active, inserts are timed by its writer
+threads instead, and overlap with the loader's parsing.
+
+"""
+from __future__ import division
+from builtins import object
+import json
+import sys
+import time
+
+from mongoengine import signals
+
+from openelex.models import RawResult
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process, in megabytes, or
+    None if it can't be determined.
+    """
+    if resource is None:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # Reported in bytes on OS X and kilobytes on Linux
+        return maxrss / (1024 * 1024)
+
+    return maxrss / 1024
+
+
+def format_table(headers, rows):
+    """
+    Format rows of strings as a text table.  The first column is left
+    aligned and the others are right aligned.
+    """
+    widths = [max([len(h)] + [len(r[i]) for r in rows])
+              for i, h in enumerate(headers)]
+    lines = []
+    for row in [headers] + rows:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(c.rjust(w) for c, w in zip(row[1:], widths[1:]))
+        lines.append("  ".join(cells))
+    lines.insert(1, "  ".join('-' * w for w in widths))
+    return "\n".join(lines)
+
+
+class FileLoadStats(object):
+    """Profiling numbers for loading a single data file"""
+
+    fields = [
+        'filename',
+        'rows_read',
+        'rows_skipped',
+        'rows_inserted',
+        'parse_seconds',
+        'build_seconds',
+        'insert_seconds',
+        'queue_seconds',
+        'process_peak_rss_mb',
+    ]
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Rows yielded by BaseLoader._read_rows() or _resume_rows(), or None
+        # if the loader doesn't use them
+        self.rows_read = None
+        # Rows dropped by BaseLoader._read_rows()
+        self.reader_rows_skipped = 0
+        # Rows that _skip_row() returned True for
+        self.skip_row_skipped = 0
+        self.rows_inserted = 0
+        self.load_seconds = 0.0
+        self.build_seconds = 0.0
+        self.insert_seconds = 0.0
+        self.queue_seconds = 0.0
+        # Whether the records were inserted by an InsertWriterPool's threads
+        # rather than the loader
+        self.queued = False
+        # Peak resident set size of the process, which includes the files
+        # loaded before this one
+        self.process_peak_rss_mb = None
+
+    @property
+    def rows_skipped(self):
+        return self.reader_rows_skipped + self.skip_row_skipped
+
+    @property
+    def parse_seconds(self):
+        seconds = self.load_seconds - self.build_seconds - self.queue_seconds
+        if not self.queued:
+            seconds -= self.insert_seconds
+        return max(seconds, 0.0)
+
+    def to_dict(self):
+        return dict((f, getattr(self, f)) for f in self.fields)
+
+
+class LoadProfiler(object):
+    """Collects a ``FileLoadStats`` for each file that is loaded"""
+
+    def __init__(self):
+        self.files = []
+        self.current = None
+        self._init_started = None
+        self._insert_started = None
+
+    def connect(self):
+        """Start listening for document construction and insert signals"""
+        signals.pre_init.connect(self._pre_init, sender=RawResult)
+        signals.post_init.connect(self._post_init, sender=RawResult)
+        signals.pre_bulk_insert.connect(self._pre_insert, sender=RawResult)
+        signals.post_bulk_insert.connect(self._post_bulk_insert,
+            sender=RawResult)
+        signals.pre_save.connect(self._pre_insert, sender=RawResult)
+        signals.post_save.connect(self._post_save, sender=RawResult)
+
+    def disconnect(self):
+        signals.pre_init.disconnect(self._pre_init, sender=RawResult)
+        signals.post_init.disconnect(self._post_init, sender=RawResult)
+        signals.pre_bulk_insert.disconnect(self._pre_insert, sender=RawResult)
+        signals.post_bulk_insert.disconnect(self._post_bulk_insert,
+            sender=RawResult)
+        signals.pre_save.disconnect(self._pre_insert, sender=RawResult)
+        signals.post_save.disconnect(self._post_save, sender=RawResult)
+
+    def start_file(self, filename):
+        self.current = FileLoadStats(filename)
+        self.files.append(self.current)
+        return self.current
+
+    def end_file(self, load_seconds):
+        self.current.load_seconds = load_seconds
+        self.current.process_peak_rss_mb = peak_rss_mb()
+        self.current = None
+        self._init_started = None
+        self._insert_started = None
+
+    def record_rows(self, read, skipped):
+        """Record rows read, and skipped, by ``BaseLoader._read_rows()``"""
+        if self.current is not None:
+            self.current.rows_read = (self.current.rows_read or 0) + read
+            self.current.reader_rows_skipped += skipped
+
+    def count_rows(self, rows):
+        """Iterate through rows, counting each one as a row read"""
+        stats = self.current
+        if stats is None:
+            for row in rows:
+                yield row
+            return
+
+        if stats.rows_read is None:
+            stats.rows_read = 0
+        for row in rows:
+            stats.rows_read += 1
+            yield row
+
+    def wrap_skip_row(self, skip_row):
+        """
+        Wrap a loader's ``_skip_row()`` method to count the rows it skips.
+        Calls aren't counted as rows read, since some loaders call it more
+        than once for a row, or for things other than rows.
+        """
+        def wrapped(*args, **kwargs):
+            skip = skip_row(*args, **kwargs)
+            if skip and self.current is not None:
+                self.current.skip_row_skipped += 1
+            return skip
+
+        return wrapped
+
+    def _pre_init(self, sender, **kwargs):
+        self._init_started = time.time()
+
+    def _post_init(self, sender, **kwargs):
+        if self.current is not None and self._init_started is not None:
+            self.current.build_seconds += time.time() - self._init_started
+        self._init_started = None
+
+    def _pre_insert(self, sender, **kwargs):
+        self._insert_started = time.time()
+
+    def _end_insert(self, count):
+        if self.current is not None and self._insert_started is not None:
+            seconds = time.time() - self._insert_started
+            if getattr(RawResult.insert_writer, 'queued', False):
+                # The writer's threads time the inserts themselves
+                self.current.queued = True
+                self.current.queue_seconds += seconds
+            else:
+                self.current.insert_seconds += seconds
+            self.current.rows_inserted += count
+        self._insert_started = None
+
+    def join_writer(self, writer):
+        """
+        Wait for an insert writer to insert the current file's records,
+        counting the wait as time spent queuing them.
+        """
+        start = time.time()
+        try:
+            writer.join()
+        finally:
+            if self.current is not None:
+                self.current.queue_seconds += time.time() - start
+
+    def _post_bulk_insert(self, sender, documents, **kwargs):
+        self._end_insert(len(documents))
+
+    def _post_save(self, sender, **kwargs):
+        self._end_insert(1)
+
+    def to_json(self):
+        return json.dumps([s.to_dict() for s in self.files], indent=2)
+
+    def table(self):
+        """Returns the collected stats formatted as a text table"""
+        headers = ['filename', 'read', 'skipped', 'inserted', 'parse s',
+            'build s', 'insert s', 'queue s', 'process peak MB']
+        rows = []
+        for s in self.files:
+            rows.append([
+                s.filename,
+                str(s.rows_read) if s.rows_read is not None else '',
+                str(s.rows_skipped),
+                str(s.rows_inserted),
+                "%.2f" % s.parse_seconds,
+                "%.2f" % s.build_seconds,
+                "%.2f" % s.insert_seconds,
+                "%.2f" % s.queue_seconds,
+                ("%.1f" % s.process_peak_rss_mb
+                 if s.process_peak_rss_mb is not None else ''),
+            ])
+
+        return format_table(headers, rows)
+
+
+_profiler = None
+
+
+def enable_profiling():
+    """Start profiling loads.  Returns the ``LoadProfiler``."""
+    global _profiler
+    if _profiler is None:
+        _profiler = LoadProfiler()
+        _profiler.connect()
+    return _profiler
+
+
+def disable_profiling():
+    global _profiler
+    if _profiler is not None:
+        _profiler.disconnect()
+        _profiler = None
+
+
+def get_profiler():
+    """Returns the active ``LoadProfiler`` or None if profiling is off"""
+    return _profiler
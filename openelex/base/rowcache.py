@@ -0,0 +1,214 @@
+"""
+Cache of parsed rows from data files.
+
+Parsing Excel workbooks, and to a lesser extent large delimited files, is
+often most of the time it takes to load a file.  When a loader is being
+fixed, the same files get parsed over and over, even though the files
+themselves haven't changed.
+
+When the row cache is enabled with ``enable_row_cache()``, the rows parsed
+from a file are saved in the ``parsed_rows`` directory of the state's
+cache.  Each entry is keyed by a hash of the file's contents and a
+description of the parser that read it, including ``ROW_CACHE_VERSION``,
+so entries are ignored once a file or the way it's parsed changes.
+
+Rows are stored by column.  Each column's values are dictionary encoded,
+which works well for the many repeated values in results files (county,
+office, party, candidate names) and the result is compressed with zlib.
+A file's rows, or a worksheet's, are held in memory while they're cached.
+Rows of delimited files are read back from the cache one at a time, with
+``RowCache.iter_rows()``.  A worksheet's rows are decoded once and kept by
+the ``StreamingWorkbook`` until it's closed, since loaders look up rows of
+worksheets by index.
+
+"""
+from builtins import object
+from builtins import range
+from builtins import str
+from array import array
+import hashlib
+import os
+import pickle
+import re
+import zlib
+
+
+ROW_CACHE_VERSION = 1
+"""Increment this to invalidate all cached rows"""
+
+
+def encode_rows(rows):
+    """
+    Encode a list of rows, each a list of values, as compact bytes.
+
+    Values must be hashable and picklable.  Rows don't need to have the same
+    length.
+
+    """
+    width = max(len(row) for row in rows) if rows else 0
+    lengths = array('i', (len(row) for row in rows))
+    columns = []
+    for i in range(width):
+        values = []
+        codes = array('i')
+        index = {}
+        for row in rows:
+            value = row[i] if i < len(row) else None
+            # Include the type so that 1.0, 1 and True aren't merged
+            key = (type(value), value)
+            try:
+                code = index[key]
+            except KeyError:
+                code = index[key] = len(values)
+                values.append(value)
+            codes.append(code)
+        columns.append((values, codes))
+
+    data = {
+        'lengths': lengths,
+        'columns': columns,
+    }
+    return zlib.compress(pickle.dumps(data, 2))
+
+
+def decode_rows(blob):
+    """Decode rows encoded with ``encode_rows()``"""
+    data = pickle.loads(zlib.decompress(blob))
+    lengths = data['lengths']
+    if not data['columns']:
+        return [[] for n in lengths]
+
+    columns = [[values[code] for code in codes]
+               for values, codes in data['columns']]
+    return [list(row[:n]) for row, n in zip(zip(*columns), lengths)]
+
+
+def iter_decoded_rows(blob):
+    """
+    Iterate through rows encoded with ``encode_rows()``.
+
+    Unlike ``decode_rows()``, rows are built one at a time, so only the
+    encoded columns are held in memory.
+
+    """
+    data = pickle.loads(zlib.decompress(blob))
+    columns = data['columns']
+    for rowx, n in enumerate(data['lengths']):
+        yield [values[codes[rowx]] for values, codes in columns[:n]]
+
+
+def file_hash(path, blocksize=1 << 20):
+    """Returns the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(blocksize)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RowCache(object):
+    """
+    Directory of parsed rows, keyed by data file contents and parser.
+
+    Usage:
+
+        cache = RowCache(state_cache.rows_path)
+        rows = cache.get(path, 'xlrd-1.2.0:sheet-0')
+        if rows is None:
+            rows = list(parse(path))
+            cache.put(path, 'xlrd-1.2.0:sheet-0', rows)
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._hashes = {}
+
+    def _content_hash(self, source_path):
+        stat = os.stat(source_path)
+        key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime)
+        try:
+            return self._hashes[key]
+        except KeyError:
+            digest = file_hash(source_path)
+            self._hashes[key] = digest
+            return digest
+
+    def _prefix(self, source_path, parser):
+        parser_slug = re.sub(r'[^\w.-]+', '_', str(parser))
+        return "{}.{}.v{}.".format(os.path.basename(source_path), parser_slug,
+            ROW_CACHE_VERSION)
+
+    def entry_path(self, source_path, parser):
+        """Returns the path of the cache entry for a file and parser"""
+        return os.path.join(self.path, self._prefix(source_path, parser) +
+            self._content_hash(source_path) + '.rows')
+
+    def get(self, source_path, parser):
+        """
+        Returns the cached rows for a file, or None if the rows haven't
+        been cached.
+
+        Args:
+            source_path: Path of the data file.
+            parser: String describing how the rows were parsed, e.g. the
+                library and its version, the worksheet or the delimiter.
+
+        """
+        try:
+            with open(self.entry_path(source_path, parser), 'rb') as f:
+                return decode_rows(f.read())
+        except (IOError, OSError):
+            return None
+
+    def iter_rows(self, source_path, parser):
+        """
+        Like ``get()``, but returns an iterator that decodes the cached rows
+        one at a time, or None if the rows haven't been cached.
+        """
+        try:
+            with open(self.entry_path(source_path, parser), 'rb') as f:
+                return iter_decoded_rows(f.read())
+        except (IOError, OSError):
+            return None
+
+    def put(self, source_path, parser, rows):
+        """Cache the rows parsed from a file, replacing older entries"""
+        try:
+            os.makedirs(self.path)
+        except OSError:
+            pass
+
+        path = self.entry_path(source_path, parser)
+        prefix = self._prefix(source_path, parser)
+        for filename in os.listdir(self.path):
+            if filename.startswith(prefix):
+                os.remove(os.path.join(self.path, filename))
+
+        # Write to a temporary file first so a partly written entry is never
+        # read
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_rows(rows))
+        os.rename(tmp_path, path)
+
+
+_enabled = False
+
+
+def enable_row_cache():
+    """Cache the rows parsed from data files.  See ``RowCache``."""
+    global _enabled
+    _enabled = True
+
+
+def disable_row_cache():
+    global _enabled
+    _enabled = False
+
+
+def row_cache_enabled():
+    return _enabled
@@ -0,0 +1,190 @@
+"""
+Run transforms concurrently, respecting their dependencies.
+
+``transform.run`` used to run a state's transforms one at a time, in the
+order they were registered.  Many of them don't touch the same data, though,
+so ``TransformScheduler`` starts each transform as soon as the transforms it
+depends on (see ``openelex.base.transform.transform_dependencies()``) have
+finished, running up to ``workers`` of them at once in threads.
+
+Each transform is timed, and ``TransformScheduler.table()`` reports the
+critical path: the chain of dependent transforms that took the longest and
+so bounds how fast the whole run can be.
+
+"""
+from __future__ import division
+from builtins import object
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+from .profiling import format_table
+
+
+class TransformTiming(object):
+    """When a transform ran, relative to the start of the run"""
+
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start
+        self.end = end
+
+    @property
+    def seconds(self):
+        return self.end - self.start
+
+
+class TransformScheduler(object):
+    """
+    Usage:
+
+        dependencies = transform_dependencies(transforms)
+        scheduler = TransformScheduler(transforms, dependencies, workers=4)
+        scheduler.run(run_transform)
+        print(scheduler.table())
+
+    """
+
+    def __init__(self, transforms, dependencies, workers=1):
+        self.transforms = transforms
+        self.dependencies = dependencies
+        self.workers = max(workers, 1)
+        self.timings = {}
+        self.seconds = 0.0
+
+    def run(self, run_transform):
+        """
+        Call ``run_transform`` with each transform.
+
+        Transforms are started in registration order as their dependencies
+        finish.  If a transform raises an exception, no more transforms are
+        started and the exception is raised once the running transforms
+        finish.
+
+        """
+        self.timings = {}
+        self._start = time.time()
+        try:
+            if self.workers == 1:
+                for transform in self._order():
+                    self._run_one(run_transform, transform)
+            else:
+                self._run_concurrently(run_transform)
+        finally:
+            self.seconds = time.time() - self._start
+
+    def _order(self):
+        """Returns the transforms in an order that satisfies dependencies"""
+        ordered = []
+        done = set()
+        pending = list(self.transforms)
+        while pending:
+            transform = next(t for t in pending
+                if all(d in done for d in self.dependencies[t.name]))
+            pending.remove(transform)
+            ordered.append(transform)
+            done.add(transform.name)
+        return ordered
+
+    def _run_one(self, run_transform, transform):
+        start = time.time() - self._start
+        try:
+            run_transform(transform)
+        finally:
+            self.timings[transform.name] = TransformTiming(transform.name,
+                start, time.time() - self._start)
+
+    def _run_concurrently(self, run_transform):
+        finished = queue.Queue()
+        pending = list(self.transforms)
+        done = set()
+        running = 0
+        error = None
+
+        def worker(transform):
+            try:
+                self._run_one(run_transform, transform)
+                finished.put((transform, None))
+            except BaseException as e:
+                finished.put((transform, e))
+
+        while pending or running:
+            if error is None:
+                ready = [t for t in pending
+                         if all(d in done for d in self.dependencies[t.name])]
+                for transform in ready[:self.workers - running]:
+                    pending.remove(transform)
+                    thread = threading.Thread(target=worker, args=(transform,),
+                        name='transform-%s' % transform.name)
+                    thread.daemon = True
+                    thread.start()
+                    running += 1
+
+            if not running:
+                break
+
+            transform, e = finished.get()
+            running -= 1
+            done.add(transform.name)
+            if e is not None and error is None:
+                error = e
+
+        if error is not None:
+            raise error
+
+    def critical_path(self):
+        """
+        Returns the names of the chain of dependent transforms with the
+        longest total run time, in the order they ran.
+        """
+        path_seconds = {}
+        previous = {}
+        for transform in self._order():
+            name = transform.name
+            if name not in self.timings:
+                continue
+            before = [d for d in self.dependencies[name] if d in path_seconds]
+            longest = None
+            if before:
+                longest = max(before, key=lambda d: path_seconds[d])
+            previous[name] = longest
+            path_seconds[name] = self.timings[name].seconds + (
+                path_seconds[longest] if longest is not None else 0.0)
+
+        if not path_seconds:
+            return []
+
+        name = max(path_seconds, key=lambda n: path_seconds[n])
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path))
+
+    def table(self):
+        """
+        Returns the transform timings, with the critical path marked, as a
+        text table.
+        """
+        critical = self.critical_path()
+        headers = ['transform', 'start', 'seconds', 'critical']
+        rows = []
+        for timing in sorted(self.timings.values(), key=lambda t: t.start):
+            rows.append([
+                timing.name,
+                "%.2f" % timing.start,
+                "%.2f" % timing.seconds,
+                '*' if timing.name in critical else '',
+            ])
+
+        critical_seconds = sum(self.timings[n].seconds for n in critical)
+        total_seconds = sum(t.seconds for t in self.timings.values())
+        summary = ("Critical path: %.2fs, wall time: %.2fs, "
+            "total transform time: %.2fs" % (critical_seconds, self.seconds,
+                total_seconds))
+        return format_table(headers, rows) + "\n\n" + summary
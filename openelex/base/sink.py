@@ -0,0 +1,414 @@
+"""
+Write loaded results to files instead of the database.
+
+While a ``SpoolSink`` is active, ``BaseLoader.run()`` parses data files as
+usual, but the RawResult records that loaders insert are written to files
+in a spool directory, one file per data file, instead of to MongoDB.
+Loaders can run this way on machines without a database.  The spooled
+files can then be imported with ``import_spool()``, or handed to other
+systems.
+
+Two formats are supported:
+
+* ``ndjson``: One MongoDB Extended JSON document per line.  Dates and
+  ObjectIds survive the round trip.
+* ``parquet``: Requires pyarrow.  ``_id`` is stored as a string.  Columns
+  that mix types, e.g. vote counts and 'N/A', and columns of dictionaries
+  or lists are stored as Extended JSON and decoded when they're read.
+
+"""
+from __future__ import print_function
+from builtins import object
+import datetime
+import io
+import json
+import os
+
+from bson import ObjectId, json_util
+
+from openelex.models import LoadCheckpoint, RawResult
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS = ('ndjson', 'parquet')
+
+DEFAULT_IMPORT_BATCH_SIZE = 10000
+
+DEFAULT_PARQUET_ROW_GROUP_SIZE = 10000
+
+PARQUET_NATIVE_TYPES = (bool, int, float, str, datetime.datetime)
+"""Types of values that Parquet columns store as they are"""
+
+PARQUET_JSON_COLUMNS_KEY = b'openelex.json_columns'
+"""Schema metadata key listing the columns stored as Extended JSON"""
+
+
+class NDJSONSpoolFile(object):
+    extension = '.ndjson'
+
+    def __init__(self, path):
+        self.path = path
+        self._f = io.open(path, 'w', encoding='utf-8')
+
+    def write(self, docs):
+        for doc in docs:
+            self._f.write(u"{}\n".format(json_util.dumps(doc)))
+
+    def close(self):
+        self._f.close()
+
+    @classmethod
+    def read(cls, path):
+        with io.open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json_util.loads(line)
+
+
+def encode_parquet_column(values):
+    """
+    Returns a column's values as they're stored in a Parquet file, and
+    whether they're stored as MongoDB Extended JSON strings.
+
+    Columns whose values all have the same scalar type are stored as they
+    are.  Columns that mix types, e.g. numbers of votes and 'N/A', and
+    columns of dictionaries or lists, e.g. ``vote_breakdowns``, are stored
+    as Extended JSON, so their values survive the round trip.
+    """
+    types = set(type(v) for v in values if v is not None)
+    if len(types) <= 1 and all(t in PARQUET_NATIVE_TYPES for t in types):
+        return values, False
+    return [None if v is None else json_util.dumps(v) for v in values], True
+
+
+def decode_parquet_column(values, encoded):
+    """Reverses ``encode_parquet_column()``"""
+    if not encoded:
+        return values
+    return [None if v is None else json_util.loads(v) for v in values]
+
+
+def _parquet_json_columns(schema):
+    metadata = schema.metadata or {}
+    return set(json.loads(metadata.get(PARQUET_JSON_COLUMNS_KEY, b'[]')))
+
+
+class ParquetSpoolFile(object):
+    """
+    Writes a Parquet file with a row group for every ``row_group_size``
+    records.
+
+    RawResults are dynamic documents, so a file's columns, and their types,
+    aren't known until all of its records have been seen.  Each row group
+    is written to a part file as it fills up.  When the spool file is
+    closed, the part files are copied into it with a schema that has every
+    part's columns.  Columns whose type differs between parts are stored
+    as Extended JSON.
+
+    """
+    extension = '.parquet'
+
+    def __init__(self, path, row_group_size=DEFAULT_PARQUET_ROW_GROUP_SIZE):
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to write Parquet files")
+
+        self.path = path
+        self.row_group_size = row_group_size
+        self._docs = []
+        self._parts = []
+
+    def write(self, docs):
+        for doc in docs:
+            doc = dict(doc)
+            doc['_id'] = str(doc['_id'])
+            self._docs.append(doc)
+            if len(self._docs) >= self.row_group_size:
+                self._write_part()
+
+    def _write_part(self):
+        names = []
+        for doc in self._docs:
+            for name in doc:
+                if name not in names:
+                    names.append(name)
+
+        arrays = []
+        json_columns = []
+        for name in names:
+            values, encoded = encode_parquet_column(
+                [doc.get(name) for doc in self._docs])
+            if encoded:
+                json_columns.append(name)
+                arrays.append(pyarrow.array(values, type=pyarrow.string()))
+            else:
+                arrays.append(pyarrow.array(values))
+
+        table = pyarrow.Table.from_arrays(arrays, names=names)
+        table = table.replace_schema_metadata(
+            {PARQUET_JSON_COLUMNS_KEY: json.dumps(json_columns)})
+        part_path = "{}.{}".format(self.path, len(self._parts))
+        pyarrow.parquet.write_table(table, part_path)
+        self._parts.append(part_path)
+        self._docs = []
+
+    def close(self):
+        if self._docs or not self._parts:
+            self._write_part()
+
+        try:
+            schemas = [pyarrow.parquet.read_schema(p) for p in self._parts]
+            part_json_columns = [_parquet_json_columns(s) for s in schemas]
+            names = []
+            for schema in schemas:
+                names.extend(n for n in schema.names if n not in names)
+
+            fields = []
+            json_columns = []
+            for name in names:
+                types = set(s.field(name).type
+                            for s, j in zip(schemas, part_json_columns)
+                            if name in s.names and name not in j)
+                types = set(t for t in types if not pyarrow.types.is_null(t))
+                if (len(types) > 1 or
+                        any(name in j for j in part_json_columns)):
+                    fields.append((name, pyarrow.string()))
+                    json_columns.append(name)
+                else:
+                    fields.append((name, types.pop() if types
+                        else pyarrow.null()))
+            schema = pyarrow.schema(fields,
+                metadata={PARQUET_JSON_COLUMNS_KEY: json.dumps(json_columns)})
+
+            with pyarrow.parquet.ParquetWriter(self.path, schema) as writer:
+                for part_path, part_json in zip(self._parts,
+                        part_json_columns):
+                    table = pyarrow.parquet.read_table(part_path)
+                    writer.write_table(self._conform(table, part_json,
+                        schema, json_columns))
+        finally:
+            for part_path in self._parts:
+                os.remove(part_path)
+            self._parts = []
+
+    @staticmethod
+    def _conform(table, part_json, schema, json_columns):
+        """Returns a part's columns with the types of ``schema``"""
+        arrays = []
+        for field in schema:
+            if field.name not in table.column_names:
+                arrays.append(pyarrow.nulls(len(table), type=field.type))
+                continue
+
+            column = table.column(field.name)
+            if (field.name in json_columns and field.name not in part_json
+                    and not pyarrow.types.is_null(column.type)):
+                # Stored as it is in this part, but not in others
+                values = [None if v is None else json_util.dumps(v)
+                          for v in column.to_pylist()]
+                arrays.append(pyarrow.array(values, type=field.type))
+            elif column.type == field.type:
+                arrays.append(column)
+            else:
+                arrays.append(column.cast(field.type))
+        return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+    @classmethod
+    def read(cls, path):
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to read Parquet files")
+
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        json_columns = _parquet_json_columns(parquet_file.schema_arrow)
+        for batch in parquet_file.iter_batches():
+            columns = dict((name, decode_parquet_column(
+                batch.column(name).to_pylist(), name in json_columns))
+                for name in batch.schema.names)
+            for i in range(batch.num_rows):
+                # Records get None for columns that only other records have
+                doc = dict((name, values[i])
+                           for name, values in columns.items()
+                           if values[i] is not None)
+                doc['_id'] = ObjectId(doc['_id'])
+                yield doc
+
+
+SPOOL_FILE_CLASSES = {
+    'ndjson': NDJSONSpoolFile,
+    'parquet': ParquetSpoolFile,
+}
+
+
+class SpoolSink(object):
+    """
+    Context manager that makes ``BaseLoader.run()`` write RawResults to
+    files in a spool directory.
+
+    Usage:
+
+        with SpoolSink('/tmp/spool', format='ndjson'):
+            for mapping in mappings:
+                loader.run(mapping)
+
+    """
+
+    offline = True
+    """Loaders don't need a database connection to write to the spool"""
+
+    def __init__(self, path, format='ndjson'):
+        if format not in FORMATS:
+            raise ValueError("Unknown spool format '{}'".format(format))
+
+        self.path = path
+        self.format = format
+        self.file_class = SPOOL_FILE_CLASSES[format]
+        self.current = None
+        self._source = None
+        self.counts = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.finish()
+
+    def start(self):
+        global _sink
+        try:
+            os.makedirs(self.path)
+        except OSError:
+            pass
+        _sink = self
+        RawResult.insert_writer = self
+
+    def finish(self):
+        global _sink
+        if RawResult.insert_writer is self:
+            RawResult.insert_writer = None
+        if _sink is self:
+            _sink = None
+
+    def spool_path(self, source):
+        """Returns the path of the spool file for a data file"""
+        return os.path.join(self.path, source + self.file_class.extension)
+
+    def run(self, loader):
+        """Run a loader's ``load()`` method, spooling its results"""
+        path = self.spool_path(loader.source)
+        print("LOAD: %s (spooling to %s)" % (loader.source, path))
+        # Write to a temporary file, so a file that fails to load doesn't
+        # leave a partial spool file behind
+        tmp_path = path + '.tmp'
+        self.current = self.file_class(tmp_path)
+        self._source = loader.source
+        self.counts[loader.source] = 0
+        try:
+            loader._run_load()
+            self.current.close()
+            os.rename(tmp_path, path)
+        except BaseException:
+            self.current.close()
+            os.remove(tmp_path)
+            raise
+        finally:
+            self._source = None
+            self.current = None
+
+    # Insert writer interface.  See ``openelex.base.pipeline``.
+
+    def put(self, raw):
+        if self.current is None:
+            raise RuntimeError("RawResults inserted outside of a load")
+
+        self.current.write(raw)
+        self.counts[self._source] += len(raw)
+
+    def join(self):
+        pass
+
+
+_sink = None
+
+
+def get_sink():
+    """Returns the active ``SpoolSink`` or None"""
+    return _sink
+
+
+def spooled_files(path):
+    """Returns the paths of the complete spool files in a directory"""
+    extensions = tuple(c.extension for c in SPOOL_FILE_CLASSES.values())
+    return sorted(os.path.join(path, f) for f in os.listdir(path)
+                  if f.endswith(extensions))
+
+
+def import_spool_file(path, batch_size=DEFAULT_IMPORT_BATCH_SIZE,
+        write_concern=None):
+    """
+    Import the RawResults in a spool file into MongoDB.
+
+    RawResults previously loaded from the same data file are deleted first.
+    Records are inserted in unordered batches of ``batch_size``, with
+    ``write_concern`` if specified.
+
+    Returns the number of records imported.
+
+    """
+    filename = os.path.basename(path)
+    for file_class in SPOOL_FILE_CLASSES.values():
+        if filename.endswith(file_class.extension):
+            break
+    else:
+        raise ValueError("Unknown spool file type: {}".format(path))
+
+    source = filename[:-len(file_class.extension)]
+    RawResult.objects.filter(source=source).delete()
+    # The spooled results replace any partial load of the file
+    LoadCheckpoint.objects.filter(source=source).delete()
+
+    collection = RawResult._get_collection()
+    if write_concern is None:
+        write_concern = {}
+    if write_concern and hasattr(collection, 'with_options'):
+        from pymongo.write_concern import WriteConcern
+        collection = collection.with_options(
+            write_concern=WriteConcern(**write_concern))
+
+    def insert(batch):
+        if hasattr(collection, 'insert_many'):
+            collection.insert_many(batch, ordered=False)
+        else:
+            # PyMongo 2.x
+            collection.insert(batch, continue_on_error=True, **write_concern)
+
+    count = 0
+    batch = []
+    for doc in file_class.read(path):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            insert(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        insert(batch)
+        count += len(batch)
+
+    return count
+
+
+def import_spool(path, batch_size=DEFAULT_IMPORT_BATCH_SIZE,
+        write_concern=None):
+    """Import all the spool files in a directory"""
+    total = 0
+    for spool_file in spooled_files(path):
+        count = import_spool_file(spool_file, batch_size=batch_size,
+            write_concern=write_concern)
+        print("IMPORT: %s (%d raw results)" % (os.path.basename(spool_file),
+            count))
+        total += count
+    return total
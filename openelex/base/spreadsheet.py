@@ -0,0 +1,326 @@
+"""
+Streaming access to Excel result files.
+
+Opening a workbook with ``xlrd.open_workbook()`` parses every worksheet in
+the file before the first row is available.  For large, multi-sheet
+precinct workbooks that means holding all of the sheets in memory at once.
+
+The classes in this module only load what a loader asks for:
+
+* Legacy ``.xls`` files are opened with xlrd's ``on_demand`` option, so a
+  worksheet is parsed only when its rows are requested and is unloaded
+  again once they have all been read.
+* ``.xlsx`` files are read with openpyxl's read-only mode, which streams
+  rows from the underlying XML rather than building the whole sheet.  If
+  openpyxl isn't installed, xlrd is used instead.
+
+Rows are returned as lists of cell values that look like the output of
+xlrd's ``Sheet.row_values()``: empty cells are ``''`` and numbers are
+floats.  This lets existing loaders switch readers without changing how
+they interpret cell values.  Dates and times are Excel serial numbers, as
+xlrd returns them, rather than the ``datetime`` objects openpyxl uses.
+
+A ``StreamingWorkbook`` can also read worksheets from, and save them to, a
+``RowCache`` (see ``openelex.base.rowcache``), so a workbook that is loaded
+again doesn't have to be parsed again.
+
+"""
+from builtins import object
+from builtins import range
+import datetime
+import os
+
+import xlrd
+
+
+class StreamingSheet(object):
+    """
+    Lazy handle on a single worksheet in a ``StreamingWorkbook``.
+
+    The worksheet isn't read until ``rows()`` or ``row_values()`` is called.
+
+    """
+
+    def __init__(self, workbook, index, name):
+        self.workbook = workbook
+        self.index = index
+        self.name = name
+        self._row_cache = {}
+
+    def __repr__(self):
+        return "<StreamingSheet {} ({})>".format(self.index, self.name)
+
+    def rows(self, start=0):
+        """
+        Iterate through the rows of the worksheet.
+
+        Args:
+            start: Index of the first row to yield.  Default is 0.
+
+        Yields:
+            A list of cell values for each row.
+
+        """
+        return self.workbook.iter_rows(self, start)
+
+    def row_values(self, rowx):
+        """
+        Return the cell values of a single row.
+
+        This is intended for reading header rows.  Rows are cached, so
+        repeated lookups of the same row don't rescan the worksheet.
+
+        Raises:
+            IndexError if the worksheet has fewer than ``rowx + 1`` rows.
+
+        """
+        try:
+            return self._row_cache[rowx]
+        except KeyError:
+            pass
+
+        row = self.workbook.row_values(self, rowx)
+        self._row_cache[rowx] = row
+        return row
+
+
+class StreamingWorkbook(object):
+    """
+    Read rows from an Excel workbook without loading every worksheet.
+
+    Usage:
+
+        with StreamingWorkbook(path) as workbook:
+            sheet = workbook.sheet_by_name('Totals')
+            for row in sheet.rows(start=2):
+                ...
+
+    """
+
+    def __init__(self, path, row_cache=None):
+        """
+        Args:
+            path: Path of the workbook file.
+            row_cache: Optional ``openelex.base.rowcache.RowCache``.  If
+                given, the rows of each worksheet are read from the cache
+                if possible, and cached after they're parsed.
+
+        """
+        self.path = path
+        self.extension = os.path.splitext(path)[1].lower()
+        self.row_cache = row_cache
+        # Worksheets' rows read from the row cache, by sheet index
+        self._cached_sheets = {}
+        # Open openpyxl row iterators, by sheet index, as (index of the
+        # next row, iterator) tuples
+        self._row_iters = {}
+        self._book = None
+        self._backend = None
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self):
+        if self.extension == '.xlsx':
+            try:
+                import openpyxl
+            except ImportError:
+                # Older versions of xlrd can read .xlsx files, they just
+                # can't stream them.
+                pass
+            else:
+                self._book = openpyxl.load_workbook(self.path, read_only=True,
+                    data_only=True)
+                self._backend = 'openpyxl'
+                return
+
+        self._book = xlrd.open_workbook(self.path, on_demand=True)
+        self._backend = 'xlrd'
+
+    def close(self):
+        """Release the file handle and any parsed worksheets"""
+        self._cached_sheets = {}
+        self._row_iters = {}
+        if self._book is None:
+            return
+
+        if self._backend == 'openpyxl':
+            self._book.close()
+        else:
+            self._book.release_resources()
+
+        self._book = None
+
+    def sheet_names(self):
+        if self._backend == 'openpyxl':
+            return list(self._book.sheetnames)
+
+        return self._book.sheet_names()
+
+    def sheets(self):
+        """Return lazy handles for all the worksheets in the workbook"""
+        return [StreamingSheet(self, i, name)
+                for i, name in enumerate(self.sheet_names())]
+
+    def sheet_by_index(self, index):
+        return self.sheets()[index]
+
+    def sheet_by_name(self, name):
+        try:
+            index = self.sheet_names().index(name)
+        except ValueError:
+            # Match the exception raised by xlrd
+            raise xlrd.XLRDError("No sheet named <{!r}>".format(name))
+
+        return StreamingSheet(self, index, name)
+
+    def iter_rows(self, sheet, start=0):
+        """
+        Iterate through the rows of a worksheet.
+
+        Args:
+            sheet: ``StreamingSheet`` whose rows should be read.
+            start: Index of the first row to yield.
+
+        Yields:
+            A list of cell values for each row.
+
+        """
+        if self.row_cache is not None:
+            return self._iter_rows_cached(sheet, start)
+
+        return self._iter_rows(sheet, start)
+
+    def _iter_rows(self, sheet, start):
+        if self._backend == 'openpyxl':
+            return self._iter_rows_openpyxl(sheet, start)
+
+        return self._iter_rows_xlrd(sheet, start)
+
+    def row_values(self, sheet, rowx):
+        """
+        Return the cell values of a single row of a worksheet.
+
+        Raises:
+            IndexError if the worksheet has fewer than ``rowx + 1`` rows.
+
+        """
+        if self.row_cache is not None:
+            rows = self._cached_rows(sheet)
+            if rows is None:
+                # Parse and cache the whole worksheet, so that later rows
+                # are looked up in memory
+                for row in self._iter_rows_cached(sheet, 0):
+                    pass
+                rows = self._cached_sheets[sheet.index]
+            if rowx >= len(rows):
+                raise IndexError("Row {} not found in sheet '{}'".format(
+                    rowx, sheet.name))
+            return rows[rowx]
+
+        if self._backend == 'openpyxl':
+            return self._row_values_openpyxl(sheet, rowx)
+
+        # The parsed sheet stays loaded until its rows are iterated.
+        return self._book.sheet_by_index(sheet.index).row_values(rowx)
+
+    def _parser_key(self, sheet):
+        """Describes how a worksheet is parsed, for the row cache"""
+        if self._backend == 'openpyxl':
+            import openpyxl
+            version = openpyxl.__version__
+        else:
+            version = xlrd.__VERSION__
+        return "{}-{}.sheet-{}".format(self._backend, version, sheet.index)
+
+    def _cached_rows(self, sheet):
+        """
+        Returns a worksheet's rows from the row cache, or None if they
+        haven't been cached.  Each worksheet is only decoded once, and its
+        rows are kept until the workbook is closed, so that loaders can
+        read rows one at a time with ``row_values()``.
+        """
+        try:
+            return self._cached_sheets[sheet.index]
+        except KeyError:
+            pass
+
+        rows = self.row_cache.get(self.path, self._parser_key(sheet))
+        if rows is not None:
+            self._cached_sheets[sheet.index] = rows
+        return rows
+
+    def _iter_rows_cached(self, sheet, start):
+        rows = self._cached_rows(sheet)
+        if rows is not None:
+            for row in rows[start:]:
+                yield row
+            return
+
+        # Parse the whole worksheet so it can be cached, but only yield rows
+        # from the requested start
+        rows = []
+        for rowx, row in enumerate(self._iter_rows(sheet, 0)):
+            rows.append(row)
+            if rowx >= start:
+                yield row
+        self.row_cache.put(self.path, self._parser_key(sheet), rows)
+        self._cached_sheets[sheet.index] = rows
+
+    def _iter_rows_xlrd(self, sheet, start):
+        xl_sheet = self._book.sheet_by_index(sheet.index)
+        try:
+            for rowx in range(start, xl_sheet.nrows):
+                yield xl_sheet.row_values(rowx)
+        finally:
+            # Drop the parsed worksheet once its rows have been read
+            self._book.unload_sheet(sheet.index)
+
+    def _row_values_openpyxl(self, sheet, rowx):
+        """
+        Returns a single row read with openpyxl.  openpyxl can only find a
+        row by reading the worksheet from the top, so the iterator is kept
+        and advanced on later calls.  Reading rows in increasing order then
+        only scans the worksheet once.
+        """
+        next_rowx, rows = self._row_iters.get(sheet.index, (None, None))
+        if rows is None or next_rowx > rowx:
+            next_rowx, rows = rowx, self._iter_rows_openpyxl(sheet, rowx)
+
+        for row in rows:
+            if next_rowx == rowx:
+                self._row_iters[sheet.index] = (rowx + 1, rows)
+                return row
+            next_rowx += 1
+
+        self._row_iters.pop(sheet.index, None)
+        raise IndexError("Row {} not found in sheet '{}'".format(rowx,
+            sheet.name))
+
+    def _iter_rows_openpyxl(self, sheet, start):
+        worksheet = self._book.worksheets[sheet.index]
+        for row in worksheet.iter_rows(min_row=start + 1, values_only=True):
+            yield [self._clean_value(v) for v in row]
+
+    def _clean_value(self, value):
+        """Make openpyxl cell values look like xlrd cell values"""
+        if value is None:
+            return ''
+
+        if isinstance(value, bool):
+            return value
+
+        if isinstance(value, int):
+            return float(value)
+
+        if isinstance(value, (datetime.date, datetime.time,
+                datetime.timedelta)):
+            # xlrd returns the serial number stored in the cell
+            from openpyxl.utils.datetime import to_excel
+            return float(to_excel(value, self._book.epoch))
+
+        return value
@@ -1,6 +1,8 @@
 from builtins import object
 from collections import OrderedDict
+import threading
 
+from openelex.models import Candidate, Contest, Office, Party, RawResult
 from .state import StateBase
 
 
@@ -11,9 +13,89 @@ class Transform(object):
     transform.
     """
 
+    inputs = None
+    """
+    Data read by the transform, as a list of resource names.  A resource is
+    a collection, like ``'Result'``, or part of one, like
+    ``'Result:md-2004-11-02-general'``.  See ``resources_conflict()``.
+    """
+
+    outputs = None
+    """Data written by the transform, as a list of resource names"""
+
+    depends_on = None
+    """Names of transforms that must run before this one"""
+
+    supports_scope = False
+    """
+    Set to True if the transform can be limited to the records from one
+    data file or election.  See ``set_scope()``.
+    """
+
+    source = None
+    """Generated filename of the data file the transform is limited to"""
+
+    election_id = None
+    """ID of the election the transform is limited to"""
+
     """Base class that defines API for transforms."""
     def __init__(self):
         self._validators = OrderedDict()
+        self._scope_election_ids = None
+
+    def set_scope(self, source=None, election_id=None):
+        """
+        Limit the transform to the records from one data file, one
+        election, or both.
+
+        Transforms that support this should use ``scope_query()`` to select
+        the records they read, create and delete, in ``get_rawresults()``,
+        ``get_results()`` and ``reverse()``.
+        """
+        self.source = source
+        self.election_id = election_id
+        self._scope_election_ids = None
+
+    @property
+    def scoped(self):
+        return self.source is not None or self.election_id is not None
+
+    def scope_election_ids(self):
+        """
+        Returns the IDs of the elections in scope, or None if the transform
+        isn't scoped.
+        """
+        if not self.scoped:
+            return None
+        if self._scope_election_ids is None:
+            self._scope_election_ids = scope_election_ids(self.source,
+                self.election_id)
+        return self._scope_election_ids
+
+    def scope_query(self, by_election=False):
+        """
+        Returns a raw MongoDB query that selects the records in scope.
+
+        Contests and candidates are shared by the files of an election, so
+        they can't be limited to one file.  With ``by_election``, a data
+        file scope is widened to the elections the file has results for.
+
+        Use it like ``RawResult.objects.filter(__raw__=self.scope_query())``.
+        """
+        if not self.scoped:
+            return {}
+        if by_election:
+            election_ids = self.scope_election_ids()
+            if len(election_ids) == 1:
+                return {'election_id': election_ids[0]}
+            return {'election_id': {'$in': election_ids}}
+
+        query = {}
+        if self.source is not None:
+            query['source'] = self.source
+        if self.election_id is not None:
+            query['election_id'] = self.election_id
+        return query
 
     def add_validation(self, *validators):
         """
@@ -63,12 +145,164 @@ class FunctionWrappingTransform(Transform):
         self._func()
 
     
+class RawResultRow(object):
+    """
+    A RawResult fetched with ``as_pymongo()``, or a row from an aggregation
+    of raw results.
+
+    Provides the attributes of a ``RawResult`` that the transforms use, so
+    rows can be passed to the same helpers, without the cost of building a
+    MongoEngine document for each one.  Fields can also be read like
+    dictionary items.  The ``contest_slug`` and
+    ``candidate_slug`` properties are memoized in ``slugs``, a dictionary
+    shared by all the rows, so each distinct name is only slugified once.
+    """
+
+    __slots__ = ('_doc', '_slugs')
+
+    def __init__(self, doc, slugs):
+        self._doc = doc
+        self._slugs = slugs
+
+    @property
+    def id(self):
+        return self._doc['_id']
+
+    def __repr__(self):
+        return "RawResultRow(%r)" % (self._doc,)
+
+    def __getitem__(self, name):
+        return self._doc[name]
+
+    def get(self, name, default=None):
+        return self._doc.get(name, default)
+
+    def __getattr__(self, name):
+        try:
+            return self._doc[name]
+        except KeyError:
+            pass
+
+        try:
+            field = RawResult._fields[name]
+        except KeyError:
+            raise AttributeError(name)
+        return field.default if not callable(field.default) else None
+
+    @property
+    def contest_slug(self):
+        key = ('contest', self.office, self.district, self.primary_party)
+        try:
+            return self._slugs[key]
+        except KeyError:
+            slug = self._slugs[key] = RawResult.contest_slug.fget(self)
+            return slug
+
+    @property
+    def candidate_slug(self):
+        key = ('candidate', self.full_name, self.given_name,
+            self.additional_name, self.family_name, self.suffix)
+        try:
+            return self._slugs[key]
+        except KeyError:
+            slug = self._slugs[key] = RawResult.candidate_slug.fget(self)
+            return slug
+
+
+class DistinctRawResultsTransform(Transform):
+    """
+    Base class for transforms that create a record, like a Contest or a
+    Candidate, for each distinct combination of raw result fields.
+
+    The raw results are deduplicated by the database, with a ``$group``
+    stage keyed by ``key_fields``.  Only one document per group is sent
+    back, with the key fields and the ``row_fields`` of one of the group's
+    raw results, instead of every raw result, or every group's whole first
+    raw result.
+
+    Subclasses set ``doc_cls``, ``key_fields`` and ``row_fields`` and
+    implement ``match_query()`` and ``make_record()``.  Groups whose keys
+    only differ before they're cleaned, say districts with and without
+    leading zeros, are merged by ``clean_key()``.
+    """
+
+    doc_cls = None
+    """Document class of the created records"""
+
+    key_fields = ()
+    """RawResult fields that identify a record"""
+
+    row_fields = ()
+    """Other RawResult fields that ``make_record()`` needs"""
+
+    def __init__(self):
+        super(DistinctRawResultsTransform, self).__init__()
+        self._slugs = {}
+
+    def match_query(self):
+        """Returns the raw MongoDB query that selects the raw results"""
+        raise NotImplementedError
+
+    def make_record(self, row):
+        """Returns a new, unsaved record for a ``RawResultRow``"""
+        raise NotImplementedError
+
+    def clean_key(self, row):
+        """
+        Returns the key that identifies the record for a row.  Rows with the
+        same key only get one record.
+        """
+        return tuple(row.get(f) for f in self.key_fields)
+
+    def distinct_pipeline(self):
+        group = {'_id': dict((f, '$' + f) for f in self.key_fields)}
+        for field in self.row_fields:
+            if field not in self.key_fields:
+                group[field] = {'$first': '$' + field}
+        return [
+            {'$match': self.match_query()},
+            {'$group': group},
+        ]
+
+    def get_distinct_rows(self):
+        for doc in RawResult.objects.aggregate(*self.distinct_pipeline()):
+            # $first gives null for fields that are missing from a raw
+            # result.  Leave them out, like key fields are left out of the
+            # group's ID, so rows fall back to the fields' defaults.
+            doc = dict((k, v) for k, v in doc.items() if v is not None)
+            doc.update(doc.pop('_id'))
+            yield RawResultRow(doc, self._slugs)
+
+    def __call__(self):
+        records = []
+        seen = set()
+        for row in self.get_distinct_rows():
+            key = self.clean_key(row)
+            if key not in seen:
+                records.append(self.make_record(row))
+                seen.add(key)
+
+        if records:
+            self.doc_cls.objects.insert(records, load_bulk=False)
+        print("Created %d %ss." % (len(records), self.doc_cls.__name__.lower()))
+
+
 class Registry(StateBase):
 
     _registry = {}
     _registry_raw = {}
 
-    def register(self, state, transform, validators=[], raw=False):
+    def register(self, state, transform, validators=[], raw=False,
+            inputs=None, outputs=None, depends_on=None):
+        """
+        Register a transform for a state.
+
+        ``inputs``, ``outputs`` and ``depends_on`` override the values of
+        the transform's attributes of the same names.  They're used to
+        decide which transforms can run at the same time.  See
+        ``transform_dependencies()``.
+
+        """
         registry = self._get_registry(raw)
 
         try:
@@ -86,6 +320,12 @@ class Registry(StateBase):
             transform_obj = FunctionWrappingTransform(transform)
 
         transform_obj.add_validation(*validators)
+        if inputs is not None:
+            transform_obj.inputs = list(inputs)
+        if outputs is not None:
+            transform_obj.outputs = list(outputs)
+        if depends_on is not None:
+            transform_obj.depends_on = list(depends_on)
         state_xforms[transform_obj.name] = transform_obj 
 
     def get(self, state, name, raw=False):
@@ -109,5 +349,327 @@ class Registry(StateBase):
             return self._registry
 
 
+def resources_conflict(a, b):
+    """
+    Returns True if two resource names might refer to the same data.
+
+    A resource is a collection name, optionally followed by a colon and a
+    filter, usually an election ID.  Resources in different collections
+    never conflict.  A whole collection conflicts with any part of it, but
+    parts with different filters are assumed not to overlap.
+
+    """
+    collection_a, _, filter_a = a.partition(':')
+    collection_b, _, filter_b = b.partition(':')
+    if collection_a != collection_b:
+        return False
+    return not filter_a or not filter_b or filter_a == filter_b
+
+
+def _any_conflict(resources_a, resources_b):
+    return any(resources_conflict(a, b)
+               for a in resources_a for b in resources_b)
+
+
+def scope_election_ids(source=None, election_id=None):
+    """
+    Returns the IDs of the elections with results from a data file, or in
+    an election.
+    """
+    if election_id is not None:
+        return [election_id]
+    return sorted(RawResult.objects.filter(source=source)
+                  .distinct('election_id'))
+
+
+def transform_in_scope(transform, election_ids):
+    """
+    Returns False if a transform's declared outputs show that it only
+    writes data for elections other than ``election_ids``.
+
+    Transforms that fix up one election's results don't need to run when
+    other elections are transformed.  Transforms that don't declare their
+    outputs are assumed to be in scope.
+    """
+    if transform.outputs is None:
+        return True
+    scope = ["%s:%s" % (output.partition(':')[0], election_id)
+             for output in transform.outputs for election_id in election_ids]
+    return _any_conflict(transform.outputs, scope)
+
+
+def transform_dependencies(transforms):
+    """
+    Work out which of a list of transforms have to run before the others.
+
+    Args:
+        transforms: Transforms, in the order they were registered.
+
+    Returns:
+        An ``OrderedDict`` mapping each transform's name to a list of the
+        names of the transforms in ``transforms`` that must finish before
+        it starts.
+
+    A transform depends on the transforms named in its ``depends_on`` that
+    are in ``transforms``, and on each earlier transform that:
+
+    * writes data that it reads or writes, or reads data that it writes,
+      based on their declared ``inputs`` and ``outputs``, or
+    * doesn't declare any inputs, outputs or dependencies.
+
+    A transform that doesn't declare any of these depends on every earlier
+    transform, so transforms that don't declare anything run one at a time
+    in the order they were registered.
+
+    """
+    names = set(t.name for t in transforms)
+    dependencies = OrderedDict()
+    for i, transform in enumerate(transforms):
+        declared = _is_declared(transform)
+        deps = []
+        for earlier in transforms[:i]:
+            if (not declared or not _is_declared(earlier) or
+                    _transforms_conflict(earlier, transform)):
+                deps.append(earlier.name)
+        for name in transform.depends_on or []:
+            if name in names and name not in deps:
+                deps.append(name)
+        dependencies[transform.name] = deps
+
+    _check_cycles(dependencies)
+    return dependencies
+
+
+def _is_declared(transform):
+    return (transform.inputs is not None or transform.outputs is not None or
+            transform.depends_on is not None)
+
+
+def _transforms_conflict(earlier, later):
+    earlier_inputs = earlier.inputs or []
+    earlier_outputs = earlier.outputs or []
+    later_inputs = later.inputs or []
+    later_outputs = later.outputs or []
+    return (_any_conflict(earlier_outputs, later_inputs) or
+            _any_conflict(earlier_outputs, later_outputs) or
+            _any_conflict(earlier_inputs, later_outputs))
+
+
+def _check_cycles(dependencies):
+    done = set()
+    visiting = set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError("Transform %s depends on itself" % name)
+        visiting.add(name)
+        for dep in dependencies[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in dependencies:
+        visit(name)
+
+
+class ReferenceResolver(object):
+    """
+    Look up the Offices, Parties, Contests and Candidates that transforms
+    reference without a database query for each one.
+
+    Offices and Parties are loaded once per process, the first time any
+    resolver needs them.  A state's Contests and Candidates, optionally
+    limited to one election, are loaded by each resolver, the first time
+    it looks one up, as dictionaries keyed by their natural keys.  Documents
+    are only built for the records that are looked up, and their references
+    to other records are filled in from memory, so reading them doesn't
+    trigger more queries.
+
+    Lookups that don't match a preloaded record fall back to the query that
+    the resolver replaces, so they still find records created after the
+    resolver loaded, and still raise ``DoesNotExist`` if there's no match.
+
+    Usage:
+
+        resolver = ReferenceResolver('MD')
+        office = resolver.office(state='MD', name='Governor')
+        contest = resolver.contest(contest_fields)
+
+    """
+
+    _lock = threading.Lock()
+    _offices = None
+    _offices_by_id = None
+    _parties = None
+    _parties_by_id = None
+
+    def __init__(self, state, election_id=None):
+        self.state = state
+        self.election_id = election_id
+        self._contests = None
+        self._contests_by_id = {}
+        self._candidates = None
+
+    @classmethod
+    def reset(cls):
+        """
+        Forget the Offices and Parties loaded by this process, e.g. after
+        adding new ones.
+        """
+        with cls._lock:
+            cls._offices = None
+            cls._offices_by_id = None
+            cls._parties = None
+            cls._parties_by_id = None
+
+    @classmethod
+    def _load_offices_and_parties(cls):
+        if cls._offices is not None:
+            return
+
+        with cls._lock:
+            if cls._offices is not None:
+                return
+
+            offices = {}
+            offices_by_id = {}
+            for office in Office.objects.all():
+                offices[(office.state, office.name, office.district)] = office
+                offices_by_id[office.id] = office
+
+            parties = {}
+            parties_by_id = {}
+            for party in Party.objects.all():
+                # Party.objects.get(abbrev=...) would fail if there were more
+                # than one, so it doesn't matter which is kept
+                parties.setdefault(party.abbrev, party)
+                parties_by_id[party.id] = party
+
+            cls._offices_by_id = offices_by_id
+            cls._parties = parties
+            cls._parties_by_id = parties_by_id
+            cls._offices = offices
+
+    def _query(self):
+        query = {'state': self.state}
+        if self.election_id is not None:
+            query['election_id'] = self.election_id
+        return query
+
+    def _load_contests(self):
+        self._contests = {}
+        collection = Contest._get_collection()
+        for son in collection.find(self._query()):
+            # The natural key is only unique for some states.  Keep the first
+            # match, like Contest.objects.filter(...)[0] would.
+            self._contests.setdefault((son['election_id'], son['slug']), son)
+
+    def _load_candidates(self):
+        self._candidates = {}
+        collection = Candidate._get_collection()
+        for son in collection.find(self._query()):
+            key = (son['election_id'], son['contest_slug'], son['slug'])
+            self._candidates[key] = son
+
+    def office(self, state, name, district=None):
+        """Returns the Office matching ``Office.objects.get()`` arguments"""
+        self._load_offices_and_parties()
+        try:
+            return self._offices[(state, name, district)]
+        except KeyError:
+            query = {'state': state, 'name': name}
+            if district is not None:
+                query['district'] = district
+            return Office.objects.get(**query)
+
+    def party(self, abbrev):
+        """Returns the Party with an abbreviation"""
+        self._load_offices_and_parties()
+        try:
+            return self._parties[abbrev]
+        except KeyError:
+            return Party.objects.get(abbrev=abbrev)
+
+    def contest(self, fields):
+        """
+        Returns the Contest matching the ``Contest.objects.get()`` keyword
+        arguments in ``fields``.
+
+        Contests are matched on their natural key, the election ID and the
+        slug built from the office and primary party.
+
+        """
+        if self._contests is None:
+            self._load_contests()
+
+        key = (fields['election_id'], Contest.make_slug(
+            office=fields['office'], primary_party=fields.get('primary_party')))
+        son = self._contests.get(key)
+        if son is None:
+            return Contest.objects.get(**fields)
+        if isinstance(son, Contest):
+            return son
+
+        contest = self._contests[key] = self._build_contest(son)
+        return contest
+
+    def _build_contest(self, son):
+        self._load_offices_and_parties()
+        contest = Contest._from_son(son)
+        office_id = _reference_id(son.get('office'))
+        if office_id in self._offices_by_id:
+            contest.office = self._offices_by_id[office_id]
+        party_id = _reference_id(son.get('primary_party'))
+        if party_id in self._parties_by_id:
+            contest.primary_party = self._parties_by_id[party_id]
+        contest._clear_changed_fields()
+        self._contests_by_id[contest.id] = contest
+        return contest
+
+    def candidate(self, fields):
+        """
+        Returns the Candidate matching the ``Candidate.objects.get()``
+        keyword arguments in ``fields``.
+
+        Candidates are matched on their natural key, the election ID,
+        contest slug and the slug built from their full name.  ``fields``
+        has to include the contest and full name for this to work.
+        Otherwise, the candidate is queried from the database.
+
+        """
+        contest = fields.get('contest')
+        full_name = fields.get('full_name')
+        if contest is None or not full_name:
+            return Candidate.objects.get(**fields)
+
+        if self._candidates is None:
+            self._load_candidates()
+
+        key = (fields['election_id'], contest.slug,
+            Candidate.make_slug(full_name=full_name))
+        son = self._candidates.get(key)
+        if son is None:
+            return Candidate.objects.get(**fields)
+        if isinstance(son, Candidate):
+            return son
+
+        candidate = Candidate._from_son(son)
+        contest_id = _reference_id(son.get('contest'))
+        if contest_id == contest.id:
+            candidate.contest = contest
+        elif contest_id in self._contests_by_id:
+            candidate.contest = self._contests_by_id[contest_id]
+        candidate._clear_changed_fields()
+        self._candidates[key] = candidate
+        return candidate
+
+
+def _reference_id(value):
+    """Returns the ID of a reference stored as an ObjectId or DBRef"""
+    return getattr(value, 'id', value)
+
+
 # Global object for registering transform functions
 registry = Registry()
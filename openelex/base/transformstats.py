@@ -0,0 +1,373 @@
+"""
+Profiling for transforms.
+
+When profiling is enabled with ``enable_transform_profiling()``,
+``transform.run`` times each transform's ``reverse()``, ``__call__()`` and
+validation with ``TransformProfiler.measure()``, and a pymongo command
+listener records, for each transform:
+
+* The number of queries (``find``, ``getMore``, ``aggregate``, ``count``
+  and ``distinct`` commands), inserts, updates and deletes it sent
+* The documents returned by its queries and inserted, modified or upserted
+  and deleted by its writes
+* The approximate size of the replies, in bytes, and the time spent
+  waiting for them
+* Its slowest commands
+
+Commands are attributed to the transform that is being measured on the
+thread that sent them, so stats are kept apart when transforms run
+concurrently.
+
+pymongo only passes commands to listeners that were registered before its
+client was created, so enabling profiling reconnects to the database.
+Command monitoring needs PyMongo 3.1 or later.  With older versions, only
+timings are recorded.
+
+"""
+from __future__ import division
+from builtins import object
+from builtins import str
+from contextlib import contextmanager
+import json
+import threading
+import time
+
+import bson
+
+try:
+    from pymongo import monitoring
+except ImportError:
+    # PyMongo 2.x
+    monitoring = None
+
+from .profiling import format_table
+
+
+SLOWEST_COMMANDS = 5
+"""Number of slowest commands kept for each transform"""
+
+QUERY_COMMANDS = ('find', 'getMore', 'aggregate', 'count', 'distinct')
+
+WRITE_COMMANDS = {
+    # Command name: (command counter, document counter)
+    'insert': ('inserts', 'documents_inserted'),
+    'update': ('updates', 'documents_updated'),
+    'delete': ('deletes', 'documents_deleted'),
+}
+
+
+def command_collection(command_name, command):
+    """Returns the name of the collection that a command acts on, if any"""
+    if command_name == 'getMore':
+        return command.get('collection')
+    collection = command.get(command_name)
+    if isinstance(collection, str):
+        return collection
+    return None
+
+
+def documents_returned(reply):
+    """Returns the number of documents in a query's reply"""
+    cursor = reply.get('cursor')
+    if not isinstance(cursor, dict):
+        return 0
+    return len(cursor.get('firstBatch', cursor.get('nextBatch', [])))
+
+
+def reply_size(reply):
+    """
+    Returns the approximate size of a reply, in bytes.
+
+    Encoding whole batches of documents again would be slow, so the size of
+    a query's reply is estimated from the size of its first document and the
+    number of documents in the batch.  Other replies are small and are
+    encoded.
+    """
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+        if batch:
+            return len(bson.BSON.encode(batch[0])) * len(batch)
+    return len(bson.BSON.encode(reply))
+
+
+def documents_written(command_name, reply):
+    """Returns the number of documents changed by a write command"""
+    if command_name == 'update':
+        return reply.get('nModified', 0) + len(reply.get('upserted', []))
+    return reply.get('n', 0)
+
+
+class TransformStats(object):
+    """Profiling numbers for a single transform"""
+
+    fields = [
+        'transform',
+        'reverse_seconds',
+        'run_seconds',
+        'validate_seconds',
+        'db_seconds',
+        'queries',
+        'inserts',
+        'updates',
+        'deletes',
+        'other_commands',
+        'failed_commands',
+        'documents_returned',
+        'documents_inserted',
+        'documents_updated',
+        'documents_deleted',
+        'bytes_returned',
+        'slowest_commands',
+    ]
+
+    def __init__(self, transform):
+        self.transform = transform
+        self.seconds = {}
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.inserts = 0
+        self.updates = 0
+        self.deletes = 0
+        self.other_commands = 0
+        self.failed_commands = 0
+        self.documents_returned = 0
+        self.documents_inserted = 0
+        self.documents_updated = 0
+        self.documents_deleted = 0
+        self.bytes_returned = 0
+        # (seconds, command name, collection) tuples, slowest first
+        self.slowest = []
+
+    @property
+    def reverse_seconds(self):
+        return self.seconds.get('reverse', 0.0)
+
+    @property
+    def run_seconds(self):
+        return self.seconds.get('run', 0.0)
+
+    @property
+    def validate_seconds(self):
+        return self.seconds.get('validate', 0.0)
+
+    @property
+    def slowest_commands(self):
+        return [{
+            'command': command_name,
+            'collection': collection,
+            'seconds': seconds,
+        } for seconds, command_name, collection in self.slowest]
+
+    def record_command(self, command_name, collection, seconds, reply):
+        self.db_seconds += seconds
+        self.bytes_returned += reply_size(reply)
+        if command_name in QUERY_COMMANDS:
+            self.queries += 1
+            self.documents_returned += documents_returned(reply)
+        elif command_name in WRITE_COMMANDS:
+            counter, documents = WRITE_COMMANDS[command_name]
+            setattr(self, counter, getattr(self, counter) + 1)
+            setattr(self, documents, getattr(self, documents) +
+                documents_written(command_name, reply))
+        else:
+            self.other_commands += 1
+
+        self.slowest.append((seconds, command_name, collection))
+        self.slowest.sort(key=lambda c: c[0], reverse=True)
+        del self.slowest[SLOWEST_COMMANDS:]
+
+    def to_dict(self):
+        return dict((f, getattr(self, f)) for f in self.fields)
+
+
+class TransformProfiler(object):
+    """
+    Collects a ``TransformStats`` for each transform that is run.
+
+    Usage:
+
+        profiler = enable_transform_profiling()
+        with profiler.measure(transform, 'run'):
+            transform()
+        print(profiler.table())
+
+    """
+
+    def __init__(self):
+        self.transforms = []
+        self._stats = {}
+        self._local = threading.local()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get_stats(self, transform):
+        """Returns the ``TransformStats`` for a transform"""
+        name = str(transform)
+        with self._lock:
+            try:
+                return self._stats[name]
+            except KeyError:
+                stats = self._stats[name] = TransformStats(name)
+                self.transforms.append(stats)
+                return stats
+
+    @contextmanager
+    def measure(self, transform, phase):
+        """
+        Time a phase of a transform, e.g. 'reverse' or 'run', and attribute
+        the commands sent from this thread in the meantime to the transform.
+        """
+        stats = self.get_stats(transform)
+        previous = getattr(self._local, 'current', None)
+        self._local.current = stats
+        start = time.time()
+        try:
+            yield stats
+        finally:
+            seconds = time.time() - start
+            stats.seconds[phase] = stats.seconds.get(phase, 0.0) + seconds
+            self._local.current = previous
+
+    # Command listener interface.  See ``pymongo.monitoring``.
+
+    def started(self, event):
+        stats = getattr(self._local, 'current', None)
+        if stats is None:
+            return
+
+        collection = command_collection(event.command_name, event.command)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (stats,
+                collection)
+
+    def succeeded(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id,
+                event.request_id), None)
+        if pending is None:
+            return
+
+        stats, collection = pending
+        stats.record_command(event.command_name, collection,
+            event.duration_micros / 1e6, event.reply)
+
+    def failed(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id,
+                event.request_id), None)
+        if pending is None:
+            return
+
+        stats = pending[0]
+        stats.failed_commands += 1
+        stats.db_seconds += event.duration_micros / 1e6
+
+    def to_json(self):
+        return json.dumps([s.to_dict() for s in self.transforms], indent=2)
+
+    def table(self):
+        """Returns the collected stats formatted as text tables"""
+        headers = ['transform', 'reverse s', 'run s', 'db s', 'queries',
+            'inserts', 'updates', 'deletes', 'docs read', 'docs written',
+            'MB read']
+        rows = []
+        for s in self.transforms:
+            rows.append([
+                s.transform,
+                "%.2f" % s.reverse_seconds,
+                "%.2f" % s.run_seconds,
+                "%.2f" % s.db_seconds,
+                str(s.queries),
+                str(s.inserts),
+                str(s.updates),
+                str(s.deletes),
+                str(s.documents_returned),
+                str(s.documents_inserted + s.documents_updated +
+                    s.documents_deleted),
+                "%.1f" % (s.bytes_returned / (1024 * 1024)),
+            ])
+
+        slowest = sorted(((seconds, s.transform, command_name, collection)
+                          for s in self.transforms
+                          for seconds, command_name, collection in s.slowest),
+                         key=lambda c: c[0], reverse=True)[:SLOWEST_COMMANDS]
+        slowest_rows = [[transform, command_name, collection or '',
+                         "%.3f" % seconds]
+                        for seconds, transform, command_name, collection
+                        in slowest]
+        return (format_table(headers, rows) + "\n\nSlowest commands:\n" +
+            format_table(['transform', 'command', 'collection', 'seconds'],
+                slowest_rows))
+
+
+if monitoring is not None:
+    class _CommandListener(monitoring.CommandListener):
+        """Passes commands on to the active ``TransformProfiler``"""
+
+        def started(self, event):
+            if _profiler is not None:
+                _profiler.started(event)
+
+        def succeeded(self, event):
+            if _profiler is not None:
+                _profiler.succeeded(event)
+
+        def failed(self, event):
+            if _profiler is not None:
+                _profiler.failed(event)
+
+
+_profiler = None
+_listener = None
+
+
+def _register_listener():
+    global _listener
+    if monitoring is None or _listener is not None:
+        return
+
+    # Listeners can't be unregistered, so a single listener is registered
+    # and passes commands on to whichever profiler is active
+    _listener = _CommandListener()
+    monitoring.register(_listener)
+
+    # Only clients created after the listener is registered use it
+    from mongoengine.connection import disconnect
+    from openelex.db import init_db
+    disconnect()
+    init_db()
+
+
+def enable_transform_profiling():
+    """Start profiling transforms.  Returns the ``TransformProfiler``."""
+    global _profiler
+    if _profiler is None:
+        _profiler = TransformProfiler()
+        _register_listener()
+    return _profiler
+
+
+def disable_transform_profiling():
+    global _profiler
+    _profiler = None
+
+
+def get_transform_profiler():
+    """
+    Returns the active ``TransformProfiler`` or None if profiling is off
+    """
+    return _profiler
+
+
+@contextmanager
+def measure_transform(transform, phase):
+    """
+    ``TransformProfiler.measure()`` with the active profiler.  Does nothing
+    if profiling is off.
+    """
+    if _profiler is None:
+        yield None
+    else:
+        with _profiler.measure(transform, phase) as stats:
+            yield stats
@@ -1,4 +1,7 @@
 from builtins import object
+from datetime import datetime
+
+
 class BulkInsertBuffer(object):
     def __init__(self, doc_cls, maxsize=1000):
         """
@@ -28,3 +31,204 @@ class BulkInsertBuffer(object):
 
     def count(self):
         return self._count
+
+
+class BulkWriteBuffer(object):
+    """
+    Buffer of update and delete operations that are sent to the database as
+    unordered bulk writes, instead of saving or deleting documents one at a
+    time.
+
+    Operations use raw MongoDB filters and update documents, so they're
+    usually built from documents fetched with ``as_pymongo()``.  Since the
+    writes are unordered, operations in the same batch shouldn't depend on
+    each other.
+
+    Usage:
+
+        updates = BulkWriteBuffer(Result)
+        for result in Result.objects.filter(state='MD').as_pymongo():
+            updates.update_one({'_id': result['_id']},
+                {'$set': {'votes': 0}})
+        updates.flush()
+
+    """
+
+    def __init__(self, doc_cls, maxsize=1000):
+        """
+        Arguments:
+
+        * doc_cls - MongoEngine Document class
+        * maxsize - Maximum operations in buffer. Default is 1000.
+        """
+        self._doc_cls = doc_cls
+        self._maxsize = maxsize
+        self._ops = []
+        self._count = 0
+        # Documents inserted by upserts and documents changed by updates
+        self.upserted = 0
+        self.modified = 0
+
+    def update_one(self, filter, update, upsert=False):
+        self._append(('update_one', filter, update, upsert))
+
+    def delete_many(self, filter):
+        self._append(('delete_many', filter, None, False))
+
+    def _append(self, op):
+        self._ops.append(op)
+        self._count += 1
+        if len(self._ops) >= self._maxsize:
+            self.flush()
+
+    def flush(self):
+        if not len(self._ops):
+            return
+
+        collection = self._doc_cls._get_collection()
+        if hasattr(collection, 'bulk_write'):
+            from pymongo import DeleteMany, UpdateOne
+            requests = []
+            for kind, filter, update, upsert in self._ops:
+                if kind == 'update_one' and upsert:
+                    requests.append(UpdateOne(filter, update, upsert=True))
+                elif kind == 'update_one':
+                    requests.append(UpdateOne(filter, update))
+                else:
+                    requests.append(DeleteMany(filter))
+            result = collection.bulk_write(requests, ordered=False)
+            if result is not None:
+                self.upserted += result.upserted_count
+                self.modified += result.modified_count
+        else:
+            # PyMongo 2.x
+            bulk = collection.initialize_unordered_bulk_op()
+            for kind, filter, update, upsert in self._ops:
+                if kind == 'update_one':
+                    if upsert:
+                        bulk.find(filter).upsert().update_one(update)
+                    else:
+                        bulk.find(filter).update_one(update)
+                else:
+                    bulk.find(filter).remove()
+            result = bulk.execute()
+            self.upserted += result.get('nUpserted', 0)
+            self.modified += result.get('nModified', 0)
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+    def count(self):
+        return self._count
+
+
+class BulkUpsertBuffer(BulkWriteBuffer):
+    """
+    Buffer of documents that are upserted by a natural key, instead of being
+    inserted.
+
+    When the buffer is flushed, the existing documents with the same values
+    for ``key_fields`` are fetched in one query.  New documents are
+    inserted with an upsert.  The fields of existing documents that
+    changed are set, the model's fields that a document no longer has are
+    unset and ``updated_field`` is set to the current time.  Documents that
+    haven't changed aren't rewritten.  The fields in
+    ``insert_only_fields`` are only set when a document is inserted, so a
+    rerun with the same data doesn't touch the existing documents' IDs or
+    timestamps.
+
+    Usage:
+
+        contests = BulkUpsertBuffer(Contest, ['election_id', 'slug'])
+        contests.append(contest)
+        contests.flush()
+        print("%d new contests, %d changed" % (contests.upserted,
+            contests.modified))
+
+    """
+
+    insert_only_fields = ('_id', 'created', 'updated')
+
+    updated_field = 'updated'
+    """Field set to the current time when an existing document changes"""
+
+    def __init__(self, doc_cls, key_fields, maxsize=1000,
+            insert_only_fields=None):
+        """
+        Arguments:
+
+        * doc_cls - MongoEngine Document class
+        * key_fields - Names of the fields that make up the natural key.
+          There should be a unique index on them.
+        * maxsize - Maximum documents in buffer. Default is 1000.
+        * insert_only_fields - Names of the fields that are only set when a
+          document is inserted. Default is ``insert_only_fields``.
+        """
+        super(BulkUpsertBuffer, self).__init__(doc_cls, maxsize)
+        self._key_fields = key_fields
+        if insert_only_fields is not None:
+            self.insert_only_fields = tuple(insert_only_fields)
+        self._docs = []
+
+    def append(self, doc):
+        self._docs.append(doc.to_mongo().to_dict())
+        self._count += 1
+        if len(self._docs) >= self._maxsize:
+            self.flush()
+
+    def flush(self):
+        if self._docs:
+            existing = self._find_existing()
+            for fields in self._docs:
+                self._add_upsert(fields, existing.get(self._key(fields)))
+            self._docs = []
+        super(BulkUpsertBuffer, self).flush()
+
+    def _key(self, fields):
+        return tuple(fields.get(f) for f in self._key_fields)
+
+    def _find_existing(self):
+        """Returns the existing documents for the buffer, by natural key"""
+        filters = [dict((f, fields[f]) for f in self._key_fields)
+                   for fields in self._docs]
+        collection = self._doc_cls._get_collection()
+        return dict((self._key(doc), doc)
+                    for doc in collection.find({'$or': filters}))
+
+    def _model_fields(self):
+        return [f.db_field for f in self._doc_cls._fields.values()]
+
+    def _add_upsert(self, fields, existing):
+        set_on_insert = {}
+        for field in self.insert_only_fields:
+            value = fields.pop(field, None)
+            if value is not None:
+                set_on_insert[field] = value
+
+        if existing is None:
+            update = {'$set': fields}
+            if set_on_insert:
+                update['$setOnInsert'] = set_on_insert
+            filter = dict((f, fields[f]) for f in self._key_fields)
+            self._ops.append(('update_one', filter, update, True))
+            return
+
+        changed = dict((f, v) for f, v in fields.items()
+                       if f not in existing or existing[f] != v)
+        unset = dict((f, '') for f in self._model_fields()
+                     if f in existing and f not in fields and
+                     f != '_id' and f not in self.insert_only_fields)
+        if not changed and not unset:
+            return
+
+        if self.updated_field:
+            changed[self.updated_field] = datetime.now()
+        update = {'$set': changed}
+        if unset:
+            update['$unset'] = unset
+        self._ops.append(('update_one', {'_id': existing['_id']}, update,
+            False))
+
+    def __len__(self):
+        return len(self._docs) + len(self._ops)
@@ -1,6 +1,8 @@
 from builtins import object
 from datetime import datetime
 
+from bson import ObjectId
+
 from mongoengine import Document, DynamicDocument
 from mongoengine.fields import (
     BooleanField,
@@ -8,10 +10,11 @@ from mongoengine.fields import (
     DictField,
     IntField,
     ListField,
+    ObjectIdField,
     StringField,
     ReferenceField,
 )
-from mongoengine.queryset import CASCADE
+from mongoengine.queryset import CASCADE, QuerySet, QuerySetManager
 from mongoengine import signals
 
 from openelex.lib.text import slugify
@@ -99,6 +102,105 @@ class TimestampMixin(object):
         document.updated = datetime.now()
 
 
+# Query sets
+
+def assign_ids(docs):
+    """
+    Give new documents an ObjectId before they're inserted, so their IDs
+    are known before the insert is done.
+    """
+    for doc in docs:
+        if doc.id is None:
+            doc.id = ObjectId()
+            # MongoEngine treats documents with an ID as already saved, and
+            # won't insert them
+            doc._created = True
+
+
+class BulkLoadQuerySet(QuerySet):
+    """
+    QuerySet whose inserts can be switched to bulk loading mode.
+
+    While a document class's ``bulk_write_concern`` attribute is set, lists
+    of documents are inserted as unordered batches with that write concern,
+    instead of the ordered, acknowledged inserts that MongoEngine does.
+    See ``openelex.base.bulkload.BulkLoad``.
+
+    While its ``insert_writer`` attribute is set, all inserted documents,
+    single documents as well as lists, are handed to the writer to be
+    inserted in the background instead.  See
+    ``openelex.base.pipeline.InsertWriterPool``.
+    """
+
+    def insert(self, doc_or_docs, *args, **kwargs):
+        doc_cls = self._document
+        writer = getattr(doc_cls, 'insert_writer', None)
+        write_concern = getattr(doc_cls, 'bulk_write_concern', None)
+        if writer is None and (write_concern is None or
+                not isinstance(doc_or_docs, list) or not doc_or_docs):
+            return super(BulkLoadQuerySet, self).insert(doc_or_docs, *args,
+                **kwargs)
+
+        # Everything goes to the writer, which may not have a database to
+        # fall back on
+        return_one = isinstance(doc_or_docs, Document)
+        docs = [doc_or_docs] if return_one else list(doc_or_docs)
+        if not docs:
+            return []
+
+        signals.pre_bulk_insert.send(doc_cls, documents=docs)
+        if writer is not None:
+            assign_ids(docs)
+            ids = [doc.id for doc in docs]
+            writer.put([doc.to_mongo() for doc in docs])
+        else:
+            ids = self.insert_raw([doc.to_mongo() for doc in docs])
+        signals.post_bulk_insert.send(doc_cls, documents=ids, loaded=False)
+        return ids[0] if return_one else ids
+
+    def insert_raw(self, raw):
+        """
+        Insert documents that have already been converted with
+        ``to_mongo()``, using the document class's ``bulk_write_concern``
+        if it is set.
+
+        Returns the IDs of the inserted documents.
+
+        """
+        write_concern = getattr(self._document, 'bulk_write_concern', None)
+        collection = self._document._get_collection()
+        if write_concern is None:
+            if hasattr(collection, 'insert_many'):
+                return collection.insert_many(raw).inserted_ids
+            return collection.insert(raw)
+
+        if hasattr(collection, 'insert_many'):
+            from pymongo.write_concern import WriteConcern
+            collection = collection.with_options(
+                write_concern=WriteConcern(**write_concern))
+            return collection.insert_many(raw, ordered=False).inserted_ids
+
+        # PyMongo 2.x
+        return collection.insert(raw, continue_on_error=True, **write_concern)
+
+
+class BulkLoadQuerySetManager(QuerySetManager):
+    """
+    QuerySet manager that doesn't connect to the database while the
+    document class's ``insert_writer`` is an offline writer, one with a
+    true ``offline`` attribute.  This lets loaders "insert" RawResults
+    without a database.  Only ``insert()`` works with these query sets.
+    """
+
+    def __get__(self, instance, owner):
+        writer = getattr(owner, 'insert_writer', None)
+        if instance is None and getattr(writer, 'offline', False):
+            queryset_class = owner._meta.get('queryset_class', self.default)
+            return queryset_class(owner, None)
+
+        return super(BulkLoadQuerySetManager, self).__get__(instance, owner)
+
+
 # Models
 
 class RawResult(TimestampMixin, DynamicDocument):
@@ -155,8 +257,24 @@ class RawResult(TimestampMixin, DynamicDocument):
 
     meta = {
         'indexes': ['election_id', 'end_date', 'primary_type', 'primary_party', 'reporting_level', 'full_name', 'family_name'],
+        'queryset_class': BulkLoadQuerySet,
     }
 
+    bulk_write_concern = None
+    """
+    Write concern for unordered bulk inserts.  Set by
+    ``openelex.base.bulkload.BulkLoad`` while bulk loading.
+    """
+
+    insert_writer = None
+    """
+    Writer that inserts batches of documents in the background, or writes
+    them somewhere else.  Set by ``openelex.base.pipeline.InsertWriterPool``,
+    ``openelex.base.dryrun.DryRun`` and ``openelex.base.sink.SpoolSink``.
+    """
+
+    objects = BulkLoadQuerySetManager()
+
     def __unicode__(self):
         bits = (
             self.election_id,
@@ -204,6 +322,39 @@ class RawResult(TimestampMixin, DynamicDocument):
 signals.pre_save.connect(TimestampMixin.update_timestamp, sender=RawResult)
 
 
+class LoadCheckpoint(Document):
+    """
+    Progress of loading a single data file into RawResult records.
+
+    Loaders that insert RawResults in batches update the checkpoint before
+    each batch is inserted.  This lets ``load.run --resume`` continue an
+    interrupted load from the last batch that was inserted.
+
+    See ``openelex.base.checkpoint``.
+    """
+    source = StringField(required=True, unique=True,
+        help_text="Name of the data file being loaded")
+    election_id = StringField(help_text="OpenElex API ID of the election")
+    fingerprint = StringField(
+        help_text="Size and modification time of the data file when it was "
+        "loaded.  The checkpoint is ignored once they change.")
+    rows = IntField(default=0,
+        help_text="Number of rows of the data file whose results have been "
+        "inserted")
+    inserted = IntField(default=0,
+        help_text="Number of RawResult records inserted so far")
+    pending_ids = ListField(ObjectIdField(),
+        help_text="IDs of the RawResult records in the batch being inserted")
+    pending_rows = IntField(default=0,
+        help_text="Value of rows once the pending batch has been inserted")
+    complete = BooleanField(default=False)
+    updated = DateTimeField(default=datetime.now)
+
+    def __unicode__(self):
+        return u'%s (%s rows%s)' % (self.source, self.rows,
+            ', complete' if self.complete else '')
+
+
 class Office(Document):
     # We use 'US' as a fake state for offices like president
     OFFICE_STATES = STATE_POSTALS + ['US',]
@@ -334,7 +485,16 @@ class Contest(TimestampMixin, DynamicDocument):
     slug = StringField(required=True, help_text="Slugified office name, plus district and party if relevant")
 
     meta = {
-        'indexes': ['election_id',],
+        'indexes': [
+            'election_id',
+            # Natural key.  See ``key``.  Only MD's transforms upsert
+            # contests by natural key, so the key is only unique for MD.
+            # Other states' transforms can create several contests with the
+            # same key.
+            {'fields': ['election_id', 'slug'], 'unique': True,
+             'name': 'md_natural_key',
+             'partialFilterExpression': {'state': 'MD'}},
+        ],
     }
 
     def __unicode__(self):
@@ -406,7 +566,14 @@ class Candidate(TimestampMixin, DynamicDocument):
                           "records that represent special non-person candidates."))
 
     meta = {
-        'indexes': ['election_id',],
+        'indexes': [
+            'election_id',
+            # Natural key, only unique for MD.  See ``key`` and
+            # Contest's indexes.
+            {'fields': ['election_id', 'contest_slug', 'slug'], 'unique': True,
+             'name': 'md_natural_key',
+             'partialFilterExpression': {'state': 'MD'}},
+        ],
     }
 
     def __unicode__(self):
@@ -489,10 +656,15 @@ class Result(TimestampMixin, DynamicDocument):
     write_in = BooleanField()
     notes = StringField(help_text="Human-readable notes to describe confusing or "
         "exceptional situations in the results data.")
+    slug = StringField(help_text="Natural key, from make_slug(), for results that are "
+        "upserted rather than inserted. Not set on other results.")
 
 
     meta = {
-        'indexes': ['election_id',],
+        'indexes': [
+            'election_id',
+            {'fields': ['slug'], 'unique': True, 'sparse': True},
+        ],
     }
 
     def __unicode__(self):
@@ -24,6 +24,7 @@ cli.add_command(datasource.elections)
 cli.add_command(datasource.filename_url_pairs)
 cli.add_command(fetch)
 cli.add_command(load.run)
+cli.add_command(load.import_spooled)
 cli.add_command(load_metadata.run)
 cli.add_command(publish)
 cli.add_command(shell)
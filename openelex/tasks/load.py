@@ -1,14 +1,63 @@
+from __future__ import print_function
 import os.path
 import sys
 
 import click
 
+from openelex.base.bulkload import BulkLoad
+from openelex.base.checkpoint import disable_resume, enable_resume
+from openelex.base.dryrun import DryRun
+from openelex.base.pipeline import (DEFAULT_QUEUE_SIZE, InsertWriterPool,
+    run_by_election, run_pipelined)
+from openelex.base.profiling import disable_profiling, enable_profiling
+from openelex.base.rowcache import disable_row_cache, enable_row_cache
+from openelex.base.sink import (DEFAULT_IMPORT_BATCH_SIZE, FORMATS, SpoolSink,
+    import_spool)
 from .utils import default_state_options, load_module
 
 @click.command(name='load.run', help="Load cached data files into the database")
 @default_state_options
+@click.option('--profile', is_flag=True,
+    help="Report rows, timings and memory use for each file")
+@click.option('--profile-json', type=click.Path(),
+    help="Write the profiling report as JSON to this file. Implies --profile")
+@click.option('--bulk', is_flag=True,
+    help="Drop secondary indexes and use unordered, unacknowledged inserts "
+    "while loading, then rebuild the indexes")
+@click.option('--resume', is_flag=True,
+    help="Skip files that were already loaded and continue interrupted "
+    "loads from their last checkpoint")
+@click.option('--processes', type=int, default=1,
+    help="Number of worker processes that parse files in parallel")
+@click.option('--writers', type=int, default=0,
+    help="Number of threads per process that insert records while parsing "
+    "continues. Defaults to 2 when --processes is more than 1")
+@click.option('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+    help="Number of batches of records that can wait for a writer thread")
+@click.option('--county-workers', type=int, default=0,
+    help="Load elections one at a time, loading this many of an election's "
+    "files, usually one per county, at the same time")
+@click.option('--county-threads', is_flag=True,
+    help="Use threads instead of worker processes for --county-workers")
+@click.option('--dry-run', is_flag=True,
+    help="Parse files without writing anything to the database and report "
+    "row counts and throughput")
+@click.option('--sample', type=int,
+    help="Stop parsing each file after this many records. Implies --dry-run")
+@click.option('--row-cache', is_flag=True,
+    help="Save parsed rows in the state's cache and reuse them when a file "
+    "hasn't changed")
+@click.option('--spool', type=click.Path(file_okay=False),
+    help="Write raw results to files in this directory instead of the "
+    "database. Import them with load.import")
+@click.option('--spool-format', type=click.Choice(FORMATS), default='ndjson',
+    help="Format of spooled raw results")
 @click.argument('filenames', nargs=-1)
-def run(state, datefilter='', filenames=[]):
+def run(state, datefilter='', filenames=[], profile=False, profile_json=None,
+        bulk=False, resume=False, processes=1, writers=0,
+        queue_size=DEFAULT_QUEUE_SIZE, county_workers=0,
+        county_threads=False, dry_run=False, sample=None, row_cache=False,
+        spool=None, spool_format='ndjson'):
     """
     Load cached data files into MongoDB.
 
@@ -30,7 +79,104 @@ def run(state, datefilter='', filenames=[]):
         # Load all files for the specified date filter
         mappings = datasrc.mappings(datefilter)
 
+    if county_threads and (profile or profile_json):
+        raise click.UsageError("--profile can't be used with --county-threads")
+
+    if bulk and (dry_run or sample or spool):
+        raise click.UsageError("--bulk can't be used with --dry-run, --sample "
+            "or --spool")
+
+    # Dry runs load files one at a time, in this process
+    if (dry_run or sample) and (processes > 1 or county_workers > 1 or
+            writers):
+        raise click.UsageError("--processes, --county-workers and --writers "
+            "can't be used with --dry-run or --sample")
+
+    # Spooled loads write files one at a time, in this process
+    if spool and (processes > 1 or county_workers > 1 or writers):
+        raise click.UsageError("--processes, --county-workers and --writers "
+            "can't be used with --spool")
+
+    profiler = None
+    if profile or profile_json:
+        profiler = enable_profiling()
+
+    if resume:
+        enable_resume()
+
+    if row_cache:
+        enable_row_cache()
+
+    def load_mappings():
+        if county_workers > 1 and county_threads:
+            # Threads share a writer pool, if there is one
+            if writers:
+                with InsertWriterPool(writers=writers, queue_size=queue_size):
+                    run_by_election(state, mappings, county_workers,
+                        threads=True)
+            else:
+                run_by_election(state, mappings, county_workers, threads=True)
+        elif county_workers > 1:
+            run_by_election(state, mappings, county_workers,
+                writers=writers or 2, queue_size=queue_size, resume=resume,
+                row_cache=row_cache)
+        elif processes > 1:
+            run_pipelined(state, mappings, processes, writers=writers or 2,
+                queue_size=queue_size, resume=resume, row_cache=row_cache)
+        elif writers:
+            with InsertWriterPool(writers=writers, queue_size=queue_size):
+                for mapping in mappings:
+                    loader.run(mapping)
+        else:
+            for mapping in mappings:
+                loader.run(mapping)
+
     #TODO: Notify user if there's a mismatch between expected files and
     # cache.diff
-    for mapping in mappings:
-        loader.run(mapping)
+    try:
+        if dry_run or sample:
+            with DryRun(sample=sample) as dry_run_stats:
+                for mapping in mappings:
+                    loader.run(mapping)
+            print()
+            print(dry_run_stats.table())
+        elif spool:
+            with SpoolSink(spool, format=spool_format):
+                for mapping in mappings:
+                    loader.run(mapping)
+        elif bulk:
+            with BulkLoad():
+                load_mappings()
+        else:
+            load_mappings()
+    finally:
+        disable_resume()
+        disable_row_cache()
+        if profiler is not None:
+            disable_profiling()
+            print()
+            print(profiler.table())
+            if profile_json:
+                with open(profile_json, 'w') as f:
+                    f.write(profiler.to_json())
+
+
+@click.command(name='load.import',
+    help="Import raw results spooled by load.run --spool into the database")
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.option('--batch-size', type=int, default=DEFAULT_IMPORT_BATCH_SIZE,
+    help="Number of records to insert at once")
+@click.option('--bulk', is_flag=True,
+    help="Drop secondary indexes and use unacknowledged inserts while "
+    "importing, then rebuild the indexes")
+def import_spooled(path, batch_size=DEFAULT_IMPORT_BATCH_SIZE, bulk=False):
+    """
+    Import spooled raw results files into MongoDB.
+    """
+    if bulk:
+        with BulkLoad() as bulk_load:
+            total = import_spool(path, batch_size=batch_size,
+                write_concern=bulk_load.write_concern)
+    else:
+        total = import_spool(path, batch_size=batch_size)
+    print("%d raw results imported" % total)
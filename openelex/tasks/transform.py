@@ -4,6 +4,14 @@ import sys
 
 import click
 
+from openelex.base.cache import StateCache
+from openelex.base.namecache import (get_name_cache, load_name_cache,
+    save_name_cache)
+from openelex.base.scheduler import TransformScheduler
+from openelex.base.transformstats import (disable_transform_profiling,
+    enable_transform_profiling, measure_transform)
+from openelex.base.transform import (scope_election_ids,
+    transform_dependencies, transform_in_scope)
 from .validate import run_validation
 
 from .utils import load_module, split_args
@@ -19,9 +27,13 @@ def list(state, raw=False):
     # Iniitialize transforms for the state in global registry
     state_mod = load_module(state, ['transform'])
     transforms = state_mod.transform.registry.all(state)
+    dependencies = transform_dependencies(transforms)
     print("\n%s transforms, in order of execution:\n" % state.upper())
     for transform in transforms:
         print("* %s" % transform)
+        deps = dependencies[transform.name]
+        if deps:
+            print("    Depends on: %s" % ", ".join(deps))
         validators = transform.validators
 
         if validators:
@@ -69,6 +81,44 @@ def _select_transforms(state, include=None, exclude=None, raw=False):
     return run_transforms
 
 
+def _scope_transforms(transforms, source=None, election=None,
+        reverse=False):
+    """
+    Limit transforms to the records from a data file, an election, or both.
+
+    Transforms that support it are scoped with ``Transform.set_scope()``.
+    Transforms whose declared outputs are for other elections are skipped.
+    The rest run for the whole state, unless they're being reversed, since
+    reversing them would delete their records for every election.
+
+    Returns the transforms to run.
+    """
+    if source is None and election is None:
+        return transforms
+
+    election_ids = scope_election_ids(source, election)
+    if not election_ids:
+        sys.exit("No raw results loaded from %s" % source)
+
+    scoped_transforms = []
+    for transform in transforms:
+        if transform.supports_scope:
+            transform.set_scope(source=source, election_id=election)
+        elif not transform_in_scope(transform, election_ids):
+            print("Skipping %s, which doesn't change the elections in scope"
+                % transform)
+            continue
+        elif reverse:
+            print("Skipping %s, which can't be limited to a file or election "
+                "and would be reversed for the whole state" % transform)
+            continue
+        else:
+            print("%s can't be limited to a file or election and will run "
+                "for the whole state" % transform)
+        scoped_transforms.append(transform)
+    return scoped_transforms
+
+
 @click.command(name='transform.run', help="Run data transformations")
 @click.option('--state', required=True, help="Two-letter state-abbreviation, e.g. NY")
 @click.option('--include', help="Transforms to run (comma-separated list)")
@@ -76,7 +126,21 @@ def _select_transforms(state, include=None, exclude=None, raw=False):
 @click.option('--no-reverse', is_flag=True, help="Don't reverse before running this "
     "transform, even if it is set to auto-reverse")
 @click.option('--raw', is_flag=True, help="Transforms to run are raw transforms")
-def run(state, include=None, exclude=None, no_reverse=False, raw=False):
+@click.option('--workers', type=int, default=1, help="Number of transforms "
+    "that can run at the same time, when they don't depend on each other")
+@click.option('--source', help="Only transform the results loaded from this "
+    "file (generated filename)")
+@click.option('--election', help="Only transform the results of this "
+    "election, e.g. md-2012-11-06-general")
+@click.option('--name-cache', is_flag=True, help="Save parsed candidate "
+    "names in the state's cache and reuse them in later runs")
+@click.option('--profile', is_flag=True, help="Report the time, database "
+    "commands and documents touched by each transform")
+@click.option('--stats', type=click.Path(), help="Write the profiling report "
+    "as JSON to this file. Implies --profile")
+def run(state, include=None, exclude=None, no_reverse=False, raw=False,
+        workers=1, source=None, election=None, name_cache=False,
+        profile=False, stats=None):
     """
     Run transformations on data loaded in MongoDB.
 
@@ -86,26 +150,63 @@ def run(state, include=None, exclude=None, no_reverse=False, raw=False):
         run_transforms = _select_transforms(state, include, exclude, raw)
     except IncludeExcludeError as e:
         sys.exit(e)
+    run_transforms = _scope_transforms(run_transforms, source, election)
 
-    for transform in run_transforms:
+    names_path = StateCache(state).names_path
+    if name_cache:
+        load_name_cache(names_path)
+
+    profiler = None
+    if profile or stats:
+        profiler = enable_transform_profiling()
+
+    def run_transform(transform):
         if not no_reverse and transform.auto_reverse:
             # Reverse the transform if it's been run previously
-            transform.reverse()
+            with measure_transform(transform, 'reverse'):
+                transform.reverse()
 
         print('Executing %s' % transform) 
-        transform()
+        with measure_transform(transform, 'run'):
+            transform()
 
-        validators = list(transform.validators.values())
+        validators = [v for v in transform.validators.values()]
         if validators:
             print("Executing validation")
-            run_validation(state, validators)
+            with measure_transform(transform, 'validate'):
+                run_validation(state, validators)
+
+    scheduler = TransformScheduler(run_transforms,
+        transform_dependencies(run_transforms), workers=workers)
+    try:
+        scheduler.run(run_transform)
+    finally:
+        print()
+        print(scheduler.table())
+        name_stats = get_name_cache().stats()
+        print("Name cache: %d hits, %d misses, %d names" % (
+            name_stats['hits'], name_stats['misses'], name_stats['size']))
+        if name_cache:
+            save_name_cache(names_path)
+        if profiler is not None:
+            disable_transform_profiling()
+            print()
+            print(profiler.table())
+            if stats:
+                with open(stats, 'w') as f:
+                    f.write(profiler.to_json())
 
 @click.command(name='transform.reverse', help="Reverse a previously run transformation")
 @click.option('--state', required=True, help="Two-letter state-abbreviation, e.g. NY")
 @click.option('--include', help="Transforms to reverse (comma-separated list)")
 @click.option('--exclude', help="Transforms to skip (comma-separated list)")
 @click.option('--raw', is_flag=True, help="Transforms to reverse are raw transforms")
-def reverse(state, include=None, exclude=None, raw=False):
+@click.option('--source', help="Only reverse the results loaded from this "
+    "file (generated filename)")
+@click.option('--election', help="Only reverse the results of this election, "
+    "e.g. md-2012-11-06-general")
+def reverse(state, include=None, exclude=None, raw=False, source=None,
+        election=None):
     """
     Reverse a previously run transformation.
 
@@ -115,6 +216,8 @@ def reverse(state, include=None, exclude=None, raw=False):
         run_transforms = _select_transforms(state, include, exclude, raw)
     except IncludeExcludeError as e:
         sys.exit(e)
+    run_transforms = _scope_transforms(run_transforms, source, election,
+        reverse=True)
 
     for transform in run_transforms:
         transform.reverse()
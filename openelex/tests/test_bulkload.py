@@ -0,0 +1,26 @@
+from openelex.base.bulkload import BulkLoad
+from openelex.models import RawResult
+from openelex.tests.mongo_test_case import MongoTestCase
+
+
+class TestBulkLoad(MongoTestCase):
+    def _indexes(self, collection):
+        return dict((name, (list(spec['key']), spec.get('unique', False)))
+                    for name, spec in collection.index_information().items())
+
+    def test_indexes(self):
+        collection = RawResult._get_collection()
+        # An index that isn't defined in the model's meta
+        collection.create_index([('source', 1), ('ocd_id', 1)],
+            name='by_source', unique=True, sparse=True)
+        indexes = self._indexes(collection)
+
+        with BulkLoad(verbose=False):
+            self.assertEqual([name for name in collection.index_information()
+                              if name != '_id_'], [])
+            self.assertEqual(RawResult.bulk_write_concern, {'w': 0})
+
+        # The dropped indexes are rebuilt as they were
+        self.assertEqual(self._indexes(collection), indexes)
+        self.assertTrue(collection.index_information()['by_source']['sparse'])
+        self.assertIsNone(RawResult.bulk_write_concern)
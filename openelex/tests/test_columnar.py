@@ -0,0 +1,139 @@
+import io
+from unittest import TestCase
+
+from openelex.base import columnar
+from openelex.base.columnar import (NullStrippingFile, clean_votes,
+    read_list_rows, read_rows)
+
+
+TSV = (u"Office\tCandidate\tVotes\n"
+       u"Governor\tSmith\t 12 \n"
+       u"Mayor\tJones\t3\n"
+       u"Governor\tBrown\t\n"
+       u"Governor\tWrite-ins\tn/a\n")
+
+
+class TestReadRows(TestCase):
+    def _read_rows(self):
+        offices = []
+
+        def keep_office(office):
+            offices.append(office)
+            return office == 'Governor'
+
+        rows = list(read_rows(io.StringIO(TSV), delimiter='\t',
+            office_field='Office', keep_office=keep_office,
+            vote_fields=('Votes', 'Missing')))
+        return rows, offices
+
+    def _test_read_rows(self):
+        rows, offices = self._read_rows()
+        self.assertEqual([r['Candidate'] for r in rows],
+            ['Smith', 'Brown', 'Write-ins'])
+        self.assertEqual([r['Votes'] for r in rows], [12, 0, 0])
+        # The office filter is only called once for each office
+        self.assertEqual(sorted(offices), ['Governor', 'Mayor'])
+
+    def test_read_rows(self):
+        self._test_read_rows()
+
+    def test_read_rows_without_pandas(self):
+        pandas = columnar.pandas
+        columnar.pandas = None
+        try:
+            self._test_read_rows()
+        finally:
+            columnar.pandas = pandas
+
+    def _test_columns(self):
+        rows = list(read_rows(io.StringIO(TSV), delimiter='\t',
+            office_field='Office', keep_office=lambda o: o == 'Governor',
+            vote_fields=('Votes',), columns=('Candidate', 'Votes', 'Missing')))
+        self.assertEqual(rows[:2], [
+            {'Candidate': 'Smith', 'Votes': 12},
+            {'Candidate': 'Brown', 'Votes': 0},
+        ])
+
+    def test_columns(self):
+        self._test_columns()
+
+    def test_columns_without_pandas(self):
+        pandas = columnar.pandas
+        columnar.pandas = None
+        try:
+            self._test_columns()
+        finally:
+            columnar.pandas = pandas
+
+    def _read_both(self, data, **kwargs):
+        """Returns the rows read with and without pandas"""
+        rows = list(read_rows(io.StringIO(data), **kwargs))
+        pandas = columnar.pandas
+        columnar.pandas = None
+        try:
+            csv_rows = list(read_rows(io.StringIO(data), **kwargs))
+        finally:
+            columnar.pandas = pandas
+        return rows, csv_rows
+
+    def test_ragged(self):
+        data = (u"Office,Candidate,Votes\n"
+                u"Governor,Smith,5\n"
+                u"Governor,Brown\n"
+                u"Governor,Jones,3,extra,fields\n"
+                u"\n"
+                u"Mayor,Green,\"1,000\"\n"
+                u"Governor,,\n")
+        for kwargs in [{}, {'vote_fields': ('Votes',)},
+                {'columns': ('Candidate', 'Votes')},
+                {'office_field': 'Office',
+                 'keep_office': lambda o: o == 'Governor'}]:
+            rows, csv_rows = self._read_both(data, **kwargs)
+            self.assertEqual(rows, csv_rows)
+
+        rows, csv_rows = self._read_both(data)
+        self.assertEqual(rows[1], {'Office': 'Governor',
+            'Candidate': 'Brown', 'Votes': None})
+        self.assertEqual(rows[2][None], ['extra', 'fields'])
+        self.assertIs(type(rows[2]['Votes']), str)
+
+    def test_fieldnames(self):
+        rows = list(read_rows(io.StringIO(u"Governor,Smith,5\n"),
+            fieldnames=['office', 'candidate', 'votes'],
+            vote_fields=('votes',)))
+        self.assertEqual(rows, [
+            {'office': 'Governor', 'candidate': 'Smith', 'votes': 5},
+        ])
+
+    def test_strip_nulls(self):
+        f = NullStrippingFile(io.StringIO(u"a,b\n1\0,2\n"))
+        self.assertEqual(list(read_rows(f)), [{'a': '1', 'b': '2'}])
+
+
+class TestReadListRows(TestCase):
+    def test_read_list_rows(self):
+        rows = [
+            ['Office', 'Candidate', 'Votes'],
+            ['Governor', 'Smith', '5'],
+            [],
+            ['Mayor', 'Jones', '3'],
+            ['Governor', 'Brown'],
+        ]
+        read = []
+        rows = list(read_list_rows(rows, office_field='Office',
+            keep_office=lambda o: o == 'Governor', vote_fields=('Votes',),
+            on_chunk=lambda r, s: read.append((r, s))))
+        self.assertEqual(rows, [
+            {'Office': 'Governor', 'Candidate': 'Smith', 'Votes': 5},
+            {'Office': 'Governor', 'Candidate': 'Brown', 'Votes': 0},
+        ])
+        self.assertEqual(read, [(1, 0), (1, 1), (1, 0)])
+
+
+class TestCleanVotes(TestCase):
+    def test_clean_votes(self):
+        self.assertEqual(clean_votes('10'), 10)
+        self.assertEqual(clean_votes('10.0'), 10)
+        self.assertEqual(clean_votes(' '), 0)
+        self.assertEqual(clean_votes('n/a'), 0)
+        self.assertEqual(clean_votes(7), 7)
@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+from openelex.base.jurisdictions import JurisdictionIndex, normalize_key
+
+
+MAPPINGS = [
+    {
+        'ocd_id': 'ocd-division/country:us/state:md',
+        'fips': '24',
+        'name': 'Maryland',
+    },
+    {
+        'ocd_id': 'ocd-division/country:us/state:md/county:anne_arundel',
+        'fips': '24003',
+        'name': 'Anne Arundel',
+    },
+    {
+        'ocd_id': "ocd-division/country:us/state:md/county:prince_george~s",
+        'fips': '24033',
+        'name': "Prince George's",
+    },
+    {
+        'ocd_id': 'ocd-division/country:us/state:md/place:annapolis',
+        'fips': '2401600',
+        'name': 'Annapolis',
+    },
+    {
+        'ocd_id': 'ocd-division/country:us/state:md/sldl:30a',
+        'fips': '',
+        'name': 'Anne Arundel',
+    },
+]
+
+
+class TestJurisdictionIndex(TestCase):
+    def setUp(self):
+        self.index = JurisdictionIndex(MAPPINGS)
+
+    def test_normalize_key(self):
+        self.assertEqual(normalize_key('Anne  Arundel '), 'ANNEARUNDEL')
+        self.assertEqual(normalize_key('05143'), normalize_key(5143))
+
+    def test_get(self):
+        self.assertEqual(self.index.ocd_id('name', 'anne arundel'),
+            'ocd-division/country:us/state:md/county:anne_arundel')
+        self.assertEqual(self.index.by_fips(24033)['name'], "Prince George's")
+        self.assertRaises(KeyError, self.index.get, 'name', 'Baltimore')
+
+    def test_by_ocd_id(self):
+        self.assertEqual(self.index.by_ocd_id(
+            'ocd-division/country:us/state:md/place:annapolis')['name'],
+            'Annapolis')
+        self.assertRaises(KeyError, self.index.by_ocd_id,
+            'ocd-division/country:us/state:md/county:baltimore')
+
+    def test_hierarchy(self):
+        children = self.index.children('ocd-division/country:us/state:md')
+        self.assertEqual(len(children), 4)
+        self.assertEqual(self.index.parent(
+            'ocd-division/country:us/state:md/place:annapolis')['name'],
+            'Maryland')
+
+    def test_counties(self):
+        counties = self.index.counties('MD')
+        self.assertEqual([c['name'] for c in counties],
+            ['Anne Arundel', "Prince George's"])
+        self.assertEqual(self.index.county_ocd_id('md', "PRINCE GEORGE'S"),
+            "ocd-division/country:us/state:md/county:prince_george~s")
+        self.assertRaises(KeyError, self.index.county_ocd_id, 'md',
+            'Annapolis')
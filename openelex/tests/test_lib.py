@@ -1,6 +1,7 @@
 from unittest import TestCase
 
 from openelex.lib import format_date, standardized_filename 
+from openelex.lib.insertbuffer import BulkUpsertBuffer, BulkWriteBuffer
 from openelex.lib.text import ocd_type_id, election_slug
 
 class TestText(TestCase):
@@ -95,3 +96,142 @@ class TestLib(TestCase):
             self.assertEqual(format_date(input_date), expected)
 
         self.assertRaises(ValueError, format_date, "201011-06")
+
+
+class FakeCollection(object):
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.writes = []
+
+    def find(self, query):
+        return [doc for doc in self.docs
+                if any(all(doc.get(f) == v for f, v in filter.items())
+                       for filter in query['$or'])]
+
+    def bulk_write(self, requests, ordered=True):
+        self.writes.append((requests, ordered))
+
+
+class FakeField(object):
+    def __init__(self, db_field):
+        self.db_field = db_field
+
+
+class FakeDocument(object):
+    collection = None
+    _fields = dict((name, FakeField(name)) for name in ['id', 'created',
+        'updated', 'election_id', 'slug', 'special', 'party'])
+    _fields['id'] = FakeField('_id')
+
+    @classmethod
+    def _get_collection(cls):
+        return cls.collection
+
+
+class TestBulkWriteBuffer(TestCase):
+    def setUp(self):
+        FakeDocument.collection = FakeCollection()
+
+    def test_flush(self):
+        from pymongo import DeleteMany, UpdateOne
+
+        writes = BulkWriteBuffer(FakeDocument)
+        writes.update_one({'_id': 1}, {'$set': {'votes': 10}})
+        writes.delete_many({'_id': {'$in': [2, 3]}})
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(FakeDocument.collection.writes, [])
+
+        writes.flush()
+        self.assertEqual(len(writes), 0)
+        self.assertEqual(writes.count(), 2)
+        requests, ordered = FakeDocument.collection.writes[0]
+        self.assertFalse(ordered)
+        self.assertEqual(requests, [
+            UpdateOne({'_id': 1}, {'$set': {'votes': 10}}),
+            DeleteMany({'_id': {'$in': [2, 3]}}),
+        ])
+
+        # Nothing is written for an empty buffer
+        writes.flush()
+        self.assertEqual(len(FakeDocument.collection.writes), 1)
+
+    def test_maxsize(self):
+        writes = BulkWriteBuffer(FakeDocument, maxsize=2)
+        for i in range(5):
+            writes.update_one({'_id': i}, {'$set': {'votes': i}})
+        self.assertEqual([len(r) for r, o in FakeDocument.collection.writes],
+            [2, 2])
+        self.assertEqual(len(writes), 1)
+        writes.flush()
+        self.assertEqual(writes.count(), 5)
+
+
+class FakeSON(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class FakeContest(object):
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def to_mongo(self):
+        return FakeSON(self.fields)
+
+
+class TestBulkUpsertBuffer(TestCase):
+    def setUp(self):
+        FakeDocument.collection = FakeCollection()
+
+    def test_append(self):
+        from pymongo import UpdateOne
+
+        upserts = BulkUpsertBuffer(FakeDocument, ['election_id', 'slug'])
+        upserts.append(FakeContest(_id=1, election_id='md-2012-11-06-general',
+            slug='president', special=False, created=2, updated=2))
+        upserts.flush()
+        requests, ordered = FakeDocument.collection.writes[0]
+        self.assertEqual(requests, [
+            UpdateOne(
+                {'election_id': 'md-2012-11-06-general', 'slug': 'president'},
+                {
+                    '$set': {
+                        'election_id': 'md-2012-11-06-general',
+                        'slug': 'president',
+                        'special': False,
+                    },
+                    '$setOnInsert': {'_id': 1, 'created': 2, 'updated': 2},
+                },
+                upsert=True),
+        ])
+
+    def test_existing(self):
+        from pymongo import UpdateOne
+
+        FakeDocument.collection = FakeCollection([
+            {'_id': 1, 'election_id': 'md-2012-11-06-general',
+             'slug': 'president', 'special': False, 'created': 1,
+             'updated': 1},
+            {'_id': 2, 'election_id': 'md-2012-11-06-general',
+             'slug': 'us-senate', 'special': False, 'party': 'DEM',
+             'created': 1, 'updated': 1},
+        ])
+        upserts = BulkUpsertBuffer(FakeDocument, ['election_id', 'slug'])
+        # Unchanged
+        upserts.append(FakeContest(_id=1, election_id='md-2012-11-06-general',
+            slug='president', special=False, created=2, updated=2))
+        # Changed, and no longer has a party
+        upserts.append(FakeContest(_id=2, election_id='md-2012-11-06-general',
+            slug='us-senate', special=True, created=2, updated=2))
+        self.assertEqual(len(upserts), 2)
+        upserts.flush()
+        self.assertEqual(upserts.count(), 2)
+
+        requests, ordered = FakeDocument.collection.writes[0]
+        self.assertEqual(len(requests), 1)
+        update = requests[0]._doc
+        self.assertEqual(requests[0], UpdateOne({'_id': 2}, update))
+        self.assertEqual(update['$unset'], {'party': ''})
+        updated = update['$set'].pop('updated')
+        self.assertNotEqual(updated, 2)
+        self.assertEqual(update['$set'], {'special': True})
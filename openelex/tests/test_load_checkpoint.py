@@ -0,0 +1,106 @@
+from openelex.base.checkpoint import Checkpoint, CheckpointInsertBuffer
+from openelex.models import LoadCheckpoint, RawResult
+from openelex.tests.mongo_test_case import MongoTestCase
+
+
+class TestCheckpoint(MongoTestCase):
+    source = '20121106__md__general__precinct.csv'
+    election_id = 'md-2012-11-06-general'
+
+    def _raw_result(self, i):
+        return RawResult(source=self.source, election_id=self.election_id,
+            state='MD', jurisdiction='Precinct %d' % i, votes=i)
+
+    def _load(self, checkpoint, rows, maxsize=2, stop_after=None,
+            per_row=1):
+        results = CheckpointInsertBuffer(checkpoint, maxsize=maxsize)
+        for i in checkpoint.resume_rows(rows):
+            if i == stop_after:
+                return
+            for j in range(per_row):
+                results.append(self._raw_result(i))
+        results.flush()
+        checkpoint.finish()
+
+    def test_start_new(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id)
+        self.assertEqual(checkpoint.rows, 0)
+        self.assertFalse(checkpoint.complete)
+        self.assertEqual(LoadCheckpoint.objects.count(), 1)
+
+    def test_complete(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id)
+        self._load(checkpoint, range(5))
+        record = LoadCheckpoint.objects.get(source=self.source)
+        self.assertTrue(record.complete)
+        self.assertEqual(record.rows, 5)
+        self.assertEqual(record.inserted, 5)
+
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            resume=True)
+        self.assertTrue(checkpoint.complete)
+
+        # Without resuming, a new load is started
+        checkpoint = Checkpoint.start(self.source, self.election_id)
+        self.assertFalse(checkpoint.complete)
+        self.assertEqual(checkpoint.rows, 0)
+
+    def test_resume(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            fingerprint='10:1.0')
+        # Batches of rows 0-1 and 2-3 are inserted before the load stops
+        self._load(checkpoint, range(10), stop_after=5)
+        self.assertEqual(RawResult.objects.count(), 4)
+
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            fingerprint='10:1.0', resume=True)
+        self.assertEqual(checkpoint.rows, 4)
+        self._load(checkpoint, range(10))
+        self.assertEqual(RawResult.objects.count(), 10)
+        self.assertEqual(sorted(r.votes for r in RawResult.objects), list(range(10)))
+
+    def test_resume_file_changed(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            fingerprint='10:1.0')
+        self._load(checkpoint, range(5))
+
+        # The file changed since it was loaded, so it's loaded again
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            fingerprint='12:2.0', resume=True)
+        self.assertFalse(checkpoint.complete)
+        self.assertEqual(checkpoint.rows, 0)
+        self.assertEqual(LoadCheckpoint.objects.count(), 1)
+
+    def test_discard(self):
+        Checkpoint.start(self.source, self.election_id)
+        Checkpoint.discard(self.source)
+        self.assertEqual(LoadCheckpoint.objects.count(), 0)
+
+    def test_resume_partial_batch(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id)
+        self._load(checkpoint, range(10), stop_after=5)
+        # Simulate the last batch being interrupted part way through
+        pending_ids = checkpoint.record.pending_ids
+        RawResult.objects(id=pending_ids[0]).delete()
+
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            resume=True)
+        self.assertEqual(checkpoint.rows, 2)
+        self.assertEqual(RawResult.objects.count(), 2)
+        self._load(checkpoint, range(10))
+        self.assertEqual(sorted(r.votes for r in RawResult.objects), list(range(10)))
+
+    def test_resume_rows_not_split(self):
+        checkpoint = Checkpoint.start(self.source, self.election_id)
+        # Each row has more results than fit in a batch
+        # The batches of rows 0 and 1 are inserted before the load stops
+        self._load(checkpoint, range(6), stop_after=3, per_row=3)
+        self.assertEqual(RawResult.objects.count(), 6)
+
+        checkpoint = Checkpoint.start(self.source, self.election_id,
+            resume=True)
+        self.assertEqual(checkpoint.rows, 2)
+        self.assertEqual(RawResult.objects.count(), 6)
+        self._load(checkpoint, range(6), per_row=3)
+        self.assertEqual(sorted(r.votes for r in RawResult.objects),
+            sorted(list(range(6)) * 3))
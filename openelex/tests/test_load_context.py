@@ -0,0 +1,75 @@
+import datetime
+from unittest import TestCase
+
+from openelex.base.load import LoadContext
+
+
+class FakeDatasource(object):
+    def __init__(self):
+        self.calls = 0
+
+    def elections(self, year=None):
+        self.calls += 1
+        return {
+            '2012': [
+                {
+                    'slug': 'md-2012-04-03-primary',
+                    'start_date': '2012-04-03',
+                    'end_date': '2012-04-03',
+                    'race_type': 'primary',
+                    'primary_type': 'closed',
+                    'result_type': 'certified',
+                    'special': False,
+                },
+                {
+                    'slug': 'md-2012-11-06-general',
+                    'start_date': '2012-11-06',
+                    'end_date': '2012-11-06',
+                    'race_type': 'general',
+                    'primary_type': '',
+                    'result_type': 'certified',
+                    'special': False,
+                },
+            ],
+        }
+
+
+class FakeLoader(object):
+    state = 'md'
+    source = '20121106__md__general__state_legislative.csv'
+    election_id = 'md-2012-11-06-general'
+    timestamp = datetime.datetime(2014, 1, 1)
+    mapping = {
+        'ocd_id': 'ocd-division/country:us/state:md/sldl:all',
+    }
+
+    def __init__(self):
+        self.datasource = FakeDatasource()
+
+
+class TestLoadContext(TestCase):
+    def setUp(self):
+        self.loader = FakeLoader()
+        self.context = LoadContext(self.loader)
+
+    def test_election_kwargs(self):
+        kwargs = self.context.election_kwargs()
+        self.assertEqual(kwargs['election_id'], 'md-2012-11-06-general')
+        self.assertEqual(kwargs['state'], 'MD')
+        self.assertEqual(kwargs['source'], self.loader.source)
+        self.assertEqual(kwargs['start_date'], datetime.datetime(2012, 11, 6))
+        self.assertEqual(kwargs['end_date'], datetime.datetime(2012, 11, 6))
+        self.assertEqual(kwargs['election_type'], 'general')
+        self.assertEqual(kwargs['created'], self.loader.timestamp)
+        self.assertEqual(self.loader.datasource.calls, 1)
+
+    def test_election_kwargs_copy(self):
+        kwargs = self.context.election_kwargs()
+        kwargs['reporting_level'] = 'precinct'
+        self.assertNotIn('reporting_level', self.context.election_kwargs())
+
+    def test_ocd_ids(self):
+        self.assertEqual(self.context.state_ocd_id,
+            'ocd-division/country:us/state:md')
+        self.assertEqual(self.context.ocd_id,
+            'ocd-division/country:us/state:md/sldl:all')
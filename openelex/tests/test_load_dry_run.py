@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+from openelex.base.dryrun import DryRun, get_dry_run
+from openelex.models import RawResult
+
+
+class FakeLoader(object):
+    source = '20121106__md__general__precinct.csv'
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.built = 0
+
+    def _run_load(self):
+        for i in range(self.rows):
+            RawResult(source=self.source, jurisdiction='Precinct %d' % i,
+                votes=i)
+            self.built += 1
+
+
+class TestDryRun(TestCase):
+    def test_active(self):
+        with DryRun() as dry_run:
+            self.assertIs(get_dry_run(), dry_run)
+            self.assertIs(RawResult.insert_writer, dry_run)
+
+        self.assertIsNone(get_dry_run())
+        self.assertIsNone(RawResult.insert_writer)
+
+    def test_run(self):
+        loader = FakeLoader(25)
+        with DryRun() as dry_run:
+            dry_run.run(loader)
+
+        stats = dry_run.files[0]
+        self.assertEqual(stats.filename, loader.source)
+        self.assertEqual(stats.rows_emitted, 25)
+        self.assertFalse(stats.sampled)
+
+    def test_sample(self):
+        loader = FakeLoader(25)
+        with DryRun(sample=10) as dry_run:
+            dry_run.run(loader)
+
+        stats = dry_run.files[0]
+        self.assertEqual(stats.rows_emitted, 10)
+        self.assertEqual(loader.built, 10)
+        self.assertTrue(stats.sampled)
+        self.assertIn('(sample)', dry_run.table())
+
+    def test_sample_whole_file(self):
+        loader = FakeLoader(10)
+        with DryRun(sample=10) as dry_run:
+            dry_run.run(loader)
+
+        self.assertEqual(loader.built, 10)
+        self.assertFalse(dry_run.files[0].sampled)
+
+    def test_sample_caught(self):
+        class CatchingLoader(FakeLoader):
+            def _run_load(self):
+                for i in range(self.rows):
+                    try:
+                        RawResult(source=self.source, votes=i)
+                    except Exception:
+                        continue
+                    self.built += 1
+
+        with DryRun(sample=10) as dry_run:
+            dry_run.run(CatchingLoader(25))
+
+        self.assertEqual(dry_run.files[0].rows_emitted, 10)
+        self.assertTrue(dry_run.files[0].sampled)
+
+    def test_insert(self):
+        class InsertingLoader(FakeLoader):
+            def _run_load(self):
+                RawResult.objects.insert(RawResult(source=self.source))
+                RawResult.objects.insert([RawResult(source=self.source),
+                    RawResult(source=self.source)])
+                RawResult.objects.insert([])
+
+        with DryRun() as dry_run:
+            dry_run.run(InsertingLoader(0))
+
+        self.assertEqual(dry_run.files[0].rows_inserted, 3)
+
+    def test_put(self):
+        class InsertingLoader(FakeLoader):
+            def _run_load(self):
+                RawResult.insert_writer.put([{}, {}])
+
+        with DryRun() as dry_run:
+            dry_run.run(InsertingLoader(0))
+
+        self.assertEqual(dry_run.files[0].rows_inserted, 2)
+        self.assertEqual(dry_run.totals().rows_inserted, 2)
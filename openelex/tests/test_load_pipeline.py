@@ -0,0 +1,177 @@
+from unittest import TestCase
+import threading
+import time
+
+from openelex.base import pipeline
+from openelex.base.pipeline import InsertWriterPool
+
+
+class FakeObjects(object):
+    def __init__(self, fail_on=None, delay=0):
+        self.inserted = []
+        self.fail_on = fail_on
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def insert_raw(self, raw):
+        time.sleep(self.delay)
+        if raw == self.fail_on:
+            raise ValueError("Insert failed")
+        with self._lock:
+            self.inserted.extend(raw)
+        return raw
+
+
+class FakeDocument(object):
+    insert_writer = None
+
+    def __init__(self, objects):
+        self.objects = objects
+
+
+class TestInsertWriterPool(TestCase):
+    def test_insert(self):
+        doc_cls = FakeDocument(FakeObjects())
+        with InsertWriterPool(doc_cls, writers=3, queue_size=2) as writer:
+            self.assertIs(doc_cls.insert_writer, writer)
+            for i in range(10):
+                writer.put([i * 2, i * 2 + 1])
+            writer.join()
+            self.assertEqual(sorted(doc_cls.objects.inserted), list(range(20)))
+
+        self.assertIsNone(doc_cls.insert_writer)
+
+    def test_batch_size(self):
+        doc_cls = FakeDocument(FakeObjects())
+        with InsertWriterPool(doc_cls, writers=2, batch_size=3) as writer:
+            writer.put(list(range(10)))
+        self.assertEqual(sorted(doc_cls.objects.inserted), list(range(10)))
+
+    def test_backpressure(self):
+        doc_cls = FakeDocument(FakeObjects(delay=0.05))
+        with InsertWriterPool(doc_cls, writers=1, queue_size=1) as writer:
+            start = time.time()
+            for i in range(4):
+                writer.put([i])
+            # The last put has to wait for at least two batches to be written
+            self.assertGreaterEqual(time.time() - start, 0.09)
+        self.assertEqual(sorted(doc_cls.objects.inserted), [0, 1, 2, 3])
+
+    def test_error(self):
+        doc_cls = FakeDocument(FakeObjects(fail_on=[1]))
+        writer = InsertWriterPool(doc_cls, writers=1)
+        writer.start()
+        writer.put([0])
+        writer.put([1])
+        self.assertRaises(ValueError, writer.join)
+        writer.close()
+        self.assertEqual(doc_cls.objects.inserted, [0])
+
+    def test_error_drops_queued(self):
+        doc_cls = FakeDocument(FakeObjects(fail_on=[0]))
+        writer = InsertWriterPool(doc_cls, writers=1)
+        writer.start()
+        writer.put([0])
+        while not writer._errors:
+            time.sleep(0.01)
+        self.assertRaises(ValueError, writer.put, [1])
+        # Batches of the failed file are thrown away until its loader
+        # joins, even after the error has been raised
+        writer.put([2])
+        writer.join()
+        writer.put([3])
+        writer.join()
+        writer.close()
+        self.assertEqual(doc_cls.objects.inserted, [3])
+
+    def test_error_per_file(self):
+        doc_cls = FakeDocument(FakeObjects(fail_on=[1]))
+        # A single writer inserts batches in the order they're queued
+        writer = InsertWriterPool(doc_cls, writers=1)
+        writer.start()
+        errors = {}
+        a_queued = threading.Event()
+        b_done = threading.Event()
+
+        def load(name, batches, wait_for, done):
+            writer.begin_file()
+            try:
+                wait_for.wait()
+                for batch in batches:
+                    writer.put(batch)
+                done.set()
+                if name == 'b':
+                    # Give a's failed batch time to be written
+                    time.sleep(0.1)
+                writer.join()
+            except ValueError as e:
+                errors[name] = e
+            finally:
+                done.set()
+
+        started = threading.Event()
+        started.set()
+        a = threading.Thread(target=load,
+            args=('a', [[0], [1], [2]], started, a_queued))
+        b = threading.Thread(target=load,
+            args=('b', [[10], [11], [12]], a_queued, b_done))
+        a.start()
+        b.start()
+        a.join()
+        b.join()
+        writer.close()
+
+        # Only the file whose batch failed sees the error, and only its
+        # later batches are thrown away
+        self.assertEqual(list(errors), ['a'])
+        self.assertEqual(sorted(doc_cls.objects.inserted), [0, 10, 11, 12])
+
+
+class FakeLoader(object):
+    loaded = []
+
+    def run(self, mapping):
+        time.sleep(0.01)
+        self.loaded.append(mapping['generated_filename'])
+
+
+class TestRunByElection(TestCase):
+    mappings = [
+        {'election': 'md-2012-04-03-primary', 'name': 'Allegany',
+         'generated_filename': '20120403__md__primary__allegany.csv'},
+        {'election': 'md-2012-11-06-general', 'name': 'Allegany',
+         'generated_filename': '20121106__md__general__allegany.csv'},
+        {'election': 'md-2012-04-03-primary', 'name': 'Garrett',
+         'generated_filename': '20120403__md__primary__garrett.csv'},
+        {'election': 'md-2012-11-06-general',
+         'generated_filename': '20121106__md__general.csv'},
+    ]
+
+    def test_group_by_election(self):
+        groups = pipeline.group_by_election(self.mappings)
+        self.assertEqual([election_id for election_id, m in groups],
+            ['md-2012-04-03-primary', 'md-2012-11-06-general'])
+        self.assertEqual(groups[0][1],
+            [self.mappings[0], self.mappings[2]])
+
+    def test_county_label(self):
+        self.assertEqual(pipeline.county_label(self.mappings[0]), 'Allegany')
+        self.assertEqual(pipeline.county_label(self.mappings[3]),
+            '20121106__md__general.csv')
+
+    def test_threads(self):
+        FakeLoader.loaded = []
+        new_loader = pipeline._new_loader
+        pipeline._new_loader = lambda state: FakeLoader()
+        try:
+            pipeline.run_by_election('md', self.mappings, 2, threads=True)
+        finally:
+            pipeline._new_loader = new_loader
+
+        # Elections are loaded one after another
+        self.assertEqual(sorted(FakeLoader.loaded[:2]),
+            ['20120403__md__primary__allegany.csv',
+             '20120403__md__primary__garrett.csv'])
+        self.assertEqual(sorted(FakeLoader.loaded[2:]),
+            ['20121106__md__general.csv',
+             '20121106__md__general__allegany.csv'])
@@ -0,0 +1,104 @@
+import json
+import time
+from unittest import TestCase
+
+from mongoengine import signals
+
+from openelex.base.profiling import LoadProfiler
+from openelex.models import RawResult
+
+
+class TestLoadProfiler(TestCase):
+    def setUp(self):
+        self.profiler = LoadProfiler()
+        self.profiler.connect()
+
+    def tearDown(self):
+        self.profiler.disconnect()
+
+    def test_counts(self):
+        profiler = self.profiler
+        profiler.start_file('20121106__md__general__precinct.csv')
+        skip_row = profiler.wrap_skip_row(lambda row: row == 'skip')
+        results = []
+        for row in profiler.count_rows(['keep', 'skip', 'keep']):
+            # Checking a row twice doesn't count it twice
+            if not skip_row(row) and not skip_row(row):
+                results.append(RawResult(full_name=row))
+        signals.pre_bulk_insert.send(RawResult, documents=results)
+        signals.post_bulk_insert.send(RawResult, documents=results,
+            loaded=False)
+        profiler.end_file(1.0)
+
+        stats = profiler.files[0]
+        self.assertEqual(stats.rows_read, 3)
+        self.assertEqual(stats.rows_skipped, 1)
+        self.assertEqual(stats.rows_inserted, 2)
+        self.assertTrue(stats.build_seconds > 0)
+        self.assertEqual(stats.parse_seconds,
+            1.0 - stats.build_seconds - stats.insert_seconds)
+
+        report = json.loads(profiler.to_json())
+        self.assertEqual(report[0]['filename'],
+            '20121106__md__general__precinct.csv')
+        self.assertEqual(report[0]['rows_inserted'], 2)
+        self.assertIn('process_peak_rss_mb', report[0])
+        self.assertIn('20121106__md__general__precinct.csv', profiler.table())
+        self.assertIn('process peak MB', profiler.table())
+
+    def test_rows_not_counted(self):
+        profiler = self.profiler
+        profiler.start_file('results.xml')
+        # Calls to _skip_row() aren't rows read
+        skip_row = profiler.wrap_skip_row(lambda race: race == 'Mayor')
+        for race in ['Governor', 'Mayor']:
+            skip_row(race)
+        profiler.end_file(0.5)
+
+        stats = profiler.files[0]
+        self.assertIsNone(stats.rows_read)
+        self.assertEqual(stats.rows_skipped, 1)
+
+    def test_reader_counts(self):
+        profiler = self.profiler
+        profiler.start_file('results.csv')
+        profiler.record_rows(10, 4)
+        # Rows returned by the reader are also passed to _skip_row()
+        skip_row = profiler.wrap_skip_row(lambda row: row == 'skip')
+        for row in ['keep'] * 5 + ['skip']:
+            skip_row(row)
+        profiler.end_file(0.5)
+
+        stats = profiler.files[0]
+        self.assertEqual(stats.rows_read, 10)
+        self.assertEqual(stats.rows_skipped, 5)
+
+    def test_queued(self):
+        class FakeWriter(object):
+            queued = True
+
+            def join(self):
+                time.sleep(0.01)
+
+        profiler = self.profiler
+        profiler.start_file('results.csv')
+        RawResult.insert_writer = writer = FakeWriter()
+        try:
+            results = [RawResult(full_name='keep')]
+            signals.pre_bulk_insert.send(RawResult, documents=results)
+            signals.post_bulk_insert.send(RawResult, documents=results,
+                loaded=False)
+            # Writer threads time the inserts themselves
+            profiler.current.insert_seconds += 2.0
+            profiler.join_writer(writer)
+        finally:
+            RawResult.insert_writer = None
+        profiler.end_file(1.0)
+
+        stats = profiler.files[0]
+        self.assertTrue(stats.queued)
+        self.assertTrue(stats.queue_seconds >= 0.01)
+        self.assertEqual(stats.insert_seconds, 2.0)
+        self.assertEqual(stats.parse_seconds,
+            1.0 - stats.build_seconds - stats.queue_seconds)
+        self.assertIn('queue s', profiler.table())
@@ -0,0 +1,161 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+from bson import ObjectId
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from openelex.base.sink import (NDJSONSpoolFile, ParquetSpoolFile,
+    SpoolSink, decode_parquet_column, encode_parquet_column, get_sink,
+    spooled_files)
+from openelex.models import RawResult
+
+
+class FakeLoader(object):
+    source = '20121106__md__general__precinct.csv'
+
+    def __init__(self, rows, fail=False, single=False):
+        self.rows = rows
+        self.fail = fail
+        self.single = single
+
+    def _run_load(self):
+        results = [RawResult(source=self.source,
+            election_id='md-2012-11-06-general', state='MD', start_date=datetime.datetime(2012, 11, 6),
+            jurisdiction='Precinct %d' % i, votes=i)
+            for i in range(self.rows)]
+        if self.single:
+            for result in results:
+                RawResult.objects.insert(result)
+        else:
+            RawResult.objects.insert(results)
+        RawResult.objects.insert([])
+        if self.fail:
+            raise ValueError("Bad row")
+
+
+class TestSpoolSink(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_active(self):
+        with SpoolSink(self.path) as sink:
+            self.assertIs(get_sink(), sink)
+            self.assertIs(RawResult.insert_writer, sink)
+
+        self.assertIsNone(get_sink())
+        self.assertIsNone(RawResult.insert_writer)
+
+    def test_run(self):
+        loader = FakeLoader(25)
+        with SpoolSink(self.path) as sink:
+            sink.run(loader)
+
+        spool_path = sink.spool_path(loader.source)
+        self.assertEqual(spooled_files(self.path), [spool_path])
+        self.assertEqual(sink.counts[loader.source], 25)
+
+        docs = list(NDJSONSpoolFile.read(spool_path))
+        self.assertEqual(len(docs), 25)
+        self.assertIsInstance(docs[0]['_id'], ObjectId)
+        self.assertEqual(docs[0]['start_date'], datetime.datetime(2012, 11, 6))
+        self.assertEqual(docs[3]['jurisdiction'], 'Precinct 3')
+        self.assertEqual(docs[3]['votes'], 3)
+
+    def test_run_single(self):
+        loader = FakeLoader(3, single=True)
+        with SpoolSink(self.path) as sink:
+            sink.run(loader)
+
+        self.assertEqual(sink.counts[loader.source], 3)
+        docs = list(NDJSONSpoolFile.read(sink.spool_path(loader.source)))
+        self.assertEqual([d['votes'] for d in docs], [0, 1, 2])
+
+    def test_run_failed(self):
+        loader = FakeLoader(5, fail=True)
+        with SpoolSink(self.path) as sink:
+            self.assertRaises(ValueError, sink.run, loader)
+
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, SpoolSink, self.path, format='csv')
+
+
+class TestParquetColumns(TestCase):
+    def assertRoundTrip(self, values, encoded):
+        stored, is_encoded = encode_parquet_column(values)
+        self.assertEqual(is_encoded, encoded)
+        decoded = decode_parquet_column(stored, is_encoded)
+        self.assertEqual(decoded, values)
+        self.assertEqual([type(v) for v in decoded],
+            [type(v) for v in values])
+
+    def test_native(self):
+        self.assertRoundTrip([10, None, 3], False)
+        self.assertRoundTrip(['Clark', 'Elko'], False)
+        self.assertRoundTrip([datetime.datetime(2012, 11, 6)], False)
+        self.assertRoundTrip([None, None], False)
+
+    def test_mixed(self):
+        self.assertRoundTrip([10, 'N/A', None], True)
+        self.assertRoundTrip([10, 2.5], True)
+        self.assertRoundTrip([True, 1], True)
+
+    def test_nested(self):
+        self.assertRoundTrip([{'election_day': 8}, {'absentee': 2}, None],
+            True)
+        self.assertRoundTrip([['a', 1]], True)
+        self.assertRoundTrip([ObjectId()], True)
+
+
+@skipUnless(pyarrow is not None, "pyarrow is required to write Parquet files")
+class TestParquetSpoolFile(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'results.parquet')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip(self):
+        spool_file = ParquetSpoolFile(self.path, row_group_size=2)
+        spool_file.write([
+            {'_id': ObjectId(), 'jurisdiction': 'Clark', 'votes': 10},
+            {'_id': ObjectId(), 'jurisdiction': 'Elko', 'votes': 'N/A'},
+            {'_id': ObjectId(), 'jurisdiction': 'Lyon', 'votes': 3},
+            {'_id': ObjectId(), 'jurisdiction': 'Nye', 'votes': 4,
+             'total_votes': 5},
+            {'_id': ObjectId(), 'jurisdiction': 'Storey', 'votes': 2.5},
+        ])
+        spool_file.close()
+
+        self.assertEqual(os.listdir(self.tmpdir), ['results.parquet'])
+        self.assertEqual(
+            pyarrow.parquet.ParquetFile(self.path).num_row_groups, 3)
+        docs = list(ParquetSpoolFile.read(self.path))
+        self.assertIsInstance(docs[0]['_id'], ObjectId)
+        self.assertEqual([d['votes'] for d in docs], [10, 'N/A', 3, 4, 2.5])
+        self.assertEqual([d.get('total_votes') for d in docs],
+            [None, None, None, 5, None])
+
+    def test_round_trip_records(self):
+        docs = [
+            {'_id': ObjectId(), 'start_date': datetime.datetime(2012, 11, 6),
+             'votes': 10, 'vote_breakdowns': {'election_day': 8}},
+            {'_id': ObjectId(), 'start_date': datetime.datetime(2012, 11, 6),
+             'votes': 2, 'vote_breakdowns': {'absentee': 2}},
+        ]
+        spool_file = ParquetSpoolFile(self.path, row_group_size=1)
+        spool_file.write(docs)
+        spool_file.close()
+        self.assertEqual(list(ParquetSpoolFile.read(self.path)), docs)
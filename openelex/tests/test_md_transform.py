@@ -0,0 +1,64 @@
+from collections import namedtuple
+from unittest import TestCase
+
+from openelex.models import RawResult
+from openelex.us.md.transform import (RawResultRow,
+    CreateContestsCandidatesResultsTransform)
+
+
+class TestRawResultRow(TestCase):
+    def test_attributes(self):
+        row = RawResultRow({
+            '_id': 1,
+            'office': 'Governor',
+            'full_name': 'Martin O\'Malley',
+            'votes': 12,
+        }, {})
+        self.assertEqual(row.id, 1)
+        self.assertEqual(row.office, 'Governor')
+        self.assertEqual(row.votes, 12)
+        # Missing fields get the RawResult field's default
+        self.assertIsNone(row.district)
+        self.assertFalse(row.special)
+        self.assertRaises(AttributeError, getattr, row, 'not_a_field')
+
+    def test_slugs(self):
+        fields = {
+            'office': 'Representative in Congress',
+            'district': '08',
+            'primary_party': 'Democratic',
+            'given_name': 'Chris',
+            'family_name': 'Van Hollen',
+        }
+        slugs = {}
+        row = RawResultRow(dict(fields), slugs)
+        raw_result = RawResult(**fields)
+        self.assertEqual(row.contest_slug, raw_result.contest_slug)
+        self.assertEqual(row.candidate_slug, raw_result.candidate_slug)
+
+        # Slugs are shared between rows
+        self.assertEqual(len(slugs), 2)
+        RawResultRow(dict(fields), slugs).contest_slug
+        self.assertEqual(len(slugs), 2)
+
+
+class TestCreateContestsCandidatesResultsTransform(TestCase):
+    def test_make_result_slug(self):
+        FakeResult = namedtuple('FakeResult', ['election_id', 'contest_slug',
+            'candidate_slug', 'reporting_level', 'jurisdiction'])
+        result = FakeResult('md-2008-02-12-primary', 'president-d',
+            'uncommitted-to-any-presidential-candidate', 'state_legislative',
+            '1A')
+        transform = CreateContestsCandidatesResultsTransform()
+        seen = {}
+        slug = transform.make_result_slug(result, seen)
+        self.assertEqual(slug, 'md-2008-02-12-primary-president-d-'
+            'uncommitted-to-any-presidential-candidate-state_legislative-1a')
+        # Results that share a natural key get a suffix
+        self.assertEqual(transform.make_result_slug(result, seen),
+            slug + '--2')
+        self.assertEqual(transform.make_result_slug(result, seen),
+            slug + '--3')
+        other = result._replace(jurisdiction='1B')
+        self.assertEqual(transform.make_result_slug(other, seen),
+            slug[:-1] + 'b')
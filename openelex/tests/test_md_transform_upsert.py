@@ -0,0 +1,58 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+
+from openelex.models import (Candidate, Contest, Office, Party, RawResult,
+    Result)
+from openelex.tests.mongo_test_case import MongoTestCase
+from openelex.us.md.transform import CreateContestsCandidatesResultsTransform
+
+
+class TestCreateContestsCandidatesResultsTransformRun(MongoTestCase):
+    def setUp(self):
+        super(TestCreateContestsCandidatesResultsTransformRun, self).setUp()
+        Office(state='MD', name='Governor').save()
+        Party(state='US', abbrev='D', name='Democratic').save()
+        Party(state='US', abbrev='R', name='Republican').save()
+        for jurisdiction in ['Allegany', 'Anne Arundel']:
+            for full_name, party, votes in [("Martin O'Malley", 'DEM', 10),
+                    ("Robert Ehrlich", 'REP', 20),
+                    # Rows that share a natural key
+                    ("Other Write-Ins", None, 1),
+                    ("Other Write-Ins", None, 2)]:
+                RawResult(source='20101102__md__general__county.csv',
+                    election_id='md-2010-11-02-general', state='MD',
+                    start_date=datetime(2010, 11, 2),
+                    end_date=datetime(2010, 11, 2),
+                    election_type='general', result_type='certified',
+                    office='Governor', full_name=full_name, party=party,
+                    reporting_level='county', jurisdiction=jurisdiction,
+                    ocd_id='ocd-division/country:us/state:md/county:'
+                        + jurisdiction.lower().replace(' ', '_'),
+                    votes=votes).save()
+
+    def _run(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            CreateContestsCandidatesResultsTransform()()
+        ids = [sorted(d['_id'] for d in
+                      doc_cls.objects.only('id').as_pymongo())
+               for doc_cls in (Contest, Candidate, Result)]
+        return ids, out.getvalue()
+
+    def test_rerun(self):
+        self.assertFalse(CreateContestsCandidatesResultsTransform.auto_reverse)
+
+        ids, out = self._run()
+        self.assertEqual([len(i) for i in ids], [1, 3, 8])
+        votes = self._votes()
+
+        rerun_ids, out = self._run()
+        self.assertEqual(rerun_ids, ids)
+        for label in ('contests', 'candidates', 'results'):
+            self.assertIn("%s: 0 new, 0 changed." % label, out)
+        self.assertEqual(self._votes(), votes)
+
+    def _votes(self):
+        return dict((r['slug'], r['votes'])
+                    for r in Result.objects.only('slug', 'votes').as_pymongo())
@@ -0,0 +1,73 @@
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase
+
+from openelex.base import namecache
+from openelex.base.namecache import NameCache
+
+
+class TestNameCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'parsed_names.pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_parse(self):
+        cache = NameCache()
+        name = cache.parse("Martin J. O'Malley Jr.")
+        self.assertEqual(name.first, "Martin")
+        self.assertEqual(name.middle, "J.")
+        self.assertEqual(name.last, "O'Malley")
+        self.assertEqual(name.suffix, "Jr.")
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        self.assertIs(cache.parse("Martin J. O'Malley Jr."), name)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_parse_error(self):
+        cache = NameCache()
+        self.assertRaises(TypeError, cache.parse, None)
+        self.assertEqual(len(cache), 0)
+
+    def test_lru(self):
+        cache = NameCache(maxsize=2)
+        cache.parse("Anthony Brown")
+        cache.parse("Larry Hogan")
+        # Make "Anthony Brown" the most recently used name
+        cache.parse("Anthony Brown")
+        cache.parse("Shawn Quinn")
+        self.assertEqual(len(cache), 2)
+
+        cache.parse("Anthony Brown")
+        self.assertEqual(cache.hits, 2)
+        cache.parse("Larry Hogan")
+        self.assertEqual(cache.misses, 4)
+
+    def test_save_load(self):
+        cache = NameCache()
+        name = cache.parse("Anthony Brown")
+        cache.save(self.path)
+
+        loaded = NameCache()
+        self.assertEqual(loaded.load(self.path), 1)
+        self.assertEqual(loaded.parse("Anthony Brown"), name)
+        self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+
+    def test_load_missing(self):
+        self.assertEqual(NameCache().load(self.path), 0)
+
+    def test_load_other_version(self):
+        with open(self.path, 'wb') as f:
+            pickle.dump({
+                'version': (namecache.NAME_CACHE_VERSION - 1, None),
+                'names': [("Anthony Brown",
+                    ('', 'Anthony', '', 'Brown', '', ''))],
+            }, f, 2)
+
+        cache = NameCache()
+        self.assertEqual(cache.load(self.path), 0)
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from mock import patch
+
+from openelex.base.transform import ReferenceResolver
+from openelex.models import Candidate, Contest, Office, Party
+from openelex.tests.mongo_test_case import MongoTestCase
+
+
+class TestReferenceResolver(MongoTestCase):
+    def setUp(self):
+        super(TestReferenceResolver, self).setUp()
+        ReferenceResolver.reset()
+        self.office = Office(state='MD', name='Governor')
+        self.office.save()
+        self.party = Party(state='US', name='Democratic', abbrev='D')
+        self.party.save()
+        date = datetime(2010, 9, 14)
+        self.contest = Contest(source='20100914__md__primary.csv',
+            election_id='md-2010-09-14-primary', state='MD',
+            start_date=date, end_date=date, result_type='certified',
+            office=self.office, primary_party=self.party)
+        self.contest.save()
+        self.candidate = Candidate(source='20100914__md__primary.csv',
+            election_id='md-2010-09-14-primary', state='MD',
+            contest=self.contest, full_name="Martin O'Malley")
+        self.candidate.save()
+
+    def tearDown(self):
+        ReferenceResolver.reset()
+        super(TestReferenceResolver, self).tearDown()
+
+    def test_lookups(self):
+        resolver = ReferenceResolver('MD')
+        office = resolver.office(state='MD', name='Governor')
+        party = resolver.party('D')
+        contest = resolver.contest({
+            'election_id': 'md-2010-09-14-primary',
+            'office': office,
+            'primary_party': party,
+        })
+        candidate = resolver.candidate({
+            'election_id': 'md-2010-09-14-primary',
+            'contest': contest,
+            'full_name': "Martin O'Malley",
+        })
+        self.assertEqual(office.id, self.office.id)
+        self.assertEqual(party.id, self.party.id)
+        self.assertEqual(contest.id, self.contest.id)
+        self.assertEqual(candidate.id, self.candidate.id)
+
+        # Lookups and references are served from memory
+        with patch.object(Contest, 'objects') as contests:
+            with patch.object(Candidate, 'objects') as candidates:
+                self.assertIs(resolver.contest({
+                    'election_id': 'md-2010-09-14-primary',
+                    'office': office,
+                    'primary_party': party,
+                }), contest)
+                self.assertIs(candidate.contest, contest)
+                self.assertIs(contest.office, office)
+        self.assertFalse(contests.get.called)
+        self.assertFalse(candidates.get.called)
+
+    def test_missing(self):
+        resolver = ReferenceResolver('MD')
+        self.assertRaises(Office.DoesNotExist, resolver.office, state='MD',
+            name='Comptroller')
+        self.assertRaises(Party.DoesNotExist, resolver.party, 'GRE')
+
+    def test_election(self):
+        resolver = ReferenceResolver('MD', election_id='md-2012-04-03-primary')
+        # Not preloaded, but still found with a query
+        contest = resolver.contest({
+            'election_id': 'md-2010-09-14-primary',
+            'office': self.office,
+            'primary_party': self.party,
+        })
+        self.assertEqual(contest.id, self.contest.id)
+
+    def test_duplicate_contests(self):
+        office = Office(state='WA', name='Governor')
+        office.save()
+        date = datetime(2012, 11, 6)
+        contests = []
+        for source in ('20121106__wa__general__county.csv',
+                '20121106__wa__general__precinct.csv'):
+            contest = Contest(source=source,
+                election_id='wa-2012-11-06-general', state='WA',
+                start_date=date, end_date=date, result_type='certified',
+                office=office)
+            contest.save()
+            contests.append(contest)
+
+        # The first matching contest is used
+        resolver = ReferenceResolver('WA')
+        contest = resolver.contest({
+            'election_id': 'wa-2012-11-06-general',
+            'office': office,
+        })
+        self.assertEqual(contest.id, contests[0].id)
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from openelex.base.columnar import dict_rows
+from openelex.base.rowcache import (RowCache, decode_rows, encode_rows,
+    iter_decoded_rows)
+from openelex.base.spreadsheet import StreamingWorkbook
+
+
+class TestEncodeRows(TestCase):
+    def test_round_trip(self):
+        rows = [
+            ['County', 'Office', 'Votes'],
+            ['Adams', 'President', 10.0],
+            ['Adams', 'President', 1],
+            ['Allen', '', True],
+            ['Allen'],
+            [],
+        ]
+        decoded = decode_rows(encode_rows(rows))
+        self.assertEqual(decoded, rows)
+        # Values that compare equal keep their types
+        self.assertIsInstance(decoded[1][2], float)
+        self.assertIsInstance(decoded[2][2], int)
+        self.assertIs(decoded[3][2], True)
+
+    def test_empty(self):
+        self.assertEqual(decode_rows(encode_rows([])), [])
+        self.assertEqual(decode_rows(encode_rows([[], []])), [[], []])
+
+    def test_iter_decoded_rows(self):
+        rows = [['County', 'Votes'], ['Adams', 10.0], ['Allen'], []]
+        decoded = iter_decoded_rows(encode_rows(rows))
+        self.assertEqual(next(decoded), rows[0])
+        self.assertEqual(list(decoded), rows[1:])
+
+
+class TestRowCache(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmpdir, 'results.csv')
+        with open(self.source, 'w') as f:
+            f.write("county,votes\nAdams,10\n")
+        self.cache = RowCache(os.path.join(self.tmpdir, 'parsed_rows'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_put(self):
+        rows = [['county', 'votes'], ['Adams', '10']]
+        self.assertIsNone(self.cache.get(self.source, 'csv-44'))
+        self.cache.put(self.source, 'csv-44', rows)
+        self.assertEqual(self.cache.get(self.source, 'csv-44'), rows)
+        # Rows are cached separately for each parser
+        self.assertIsNone(self.cache.get(self.source, 'csv-9'))
+
+    def test_file_changed(self):
+        self.cache.put(self.source, 'csv-44', [['county', 'votes']])
+        with open(self.source, 'w') as f:
+            f.write("county,votes\nAdams,10\nAllen,12\n")
+        # Use a new cache so the file is hashed again
+        cache = RowCache(self.cache.path)
+        self.assertIsNone(cache.get(self.source, 'csv-44'))
+        cache.put(self.source, 'csv-44', [['county', 'votes']])
+        # The stale entry is removed
+        self.assertEqual(len(os.listdir(cache.path)), 1)
+
+
+class TestDictRows(TestCase):
+    def test_header(self):
+        rows = [['a', 'b'], ['1', '2'], [], ['3'], ['4', '5', '6']]
+        self.assertEqual(list(dict_rows(rows)), [
+            {'a': '1', 'b': '2'},
+            {'a': '3', 'b': None},
+            {'a': '4', 'b': '5', None: ['6']},
+        ])
+
+    def test_fieldnames(self):
+        rows = [['1', '2']]
+        self.assertEqual(list(dict_rows(rows, fieldnames=['a', 'b'])),
+            [{'a': '1', 'b': '2'}])
+
+
+@skipUnless(openpyxl is not None, "openpyxl is required to read .xlsx files")
+class TestCachedWorkbook(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'results.xlsx')
+        book = openpyxl.Workbook()
+        sheet = book.active
+        sheet.append(['Precinct', 'Smith', 'Jones'])
+        sheet.append(['Ames 1', 10, None])
+        sheet.append(['Ames 2', 12, 3])
+        book.save(self.path)
+        self.cache = RowCache(os.path.join(self.tmpdir, 'parsed_rows'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_rows(self):
+        with StreamingWorkbook(self.path) as workbook:
+            expected = list(workbook.sheet_by_index(0).rows())
+
+        with StreamingWorkbook(self.path, row_cache=self.cache) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            self.assertEqual(list(sheet.rows(start=1)), expected[1:])
+
+        self.assertEqual(len(os.listdir(self.cache.path)), 1)
+        with StreamingWorkbook(self.path, row_cache=self.cache) as workbook:
+            # Make sure the worksheet isn't parsed again
+            workbook._iter_rows = None
+            sheet = workbook.sheet_by_index(0)
+            self.assertEqual(list(sheet.rows()), expected)
+            self.assertEqual(sheet.row_values(2), expected[2])
+
+    def test_row_values(self):
+        with StreamingWorkbook(self.path, row_cache=self.cache) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            # The first lookup parses and caches the whole worksheet
+            self.assertEqual(sheet.row_values(1), ['Ames 1', 10.0, ''])
+            workbook._iter_rows = None
+            self.assertEqual(workbook.row_values(sheet, 2),
+                ['Ames 2', 12.0, 3.0])
+
+        with StreamingWorkbook(self.path, row_cache=self.cache) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            get = self.cache.get
+            calls = []
+            self.cache.get = lambda *args: calls.append(args) or get(*args)
+            for rowx in range(3):
+                workbook.row_values(sheet, rowx)
+            # The cached worksheet is only decoded once
+            self.assertEqual(len(calls), 1)
+            self.assertRaises(IndexError, workbook.row_values, sheet, 3)
@@ -0,0 +1,108 @@
+import datetime
+import os
+import shutil
+import tempfile
+from unittest import TestCase, skipUnless
+
+import xlrd
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+from openelex.base.spreadsheet import StreamingWorkbook
+
+tests_dir = os.path.dirname(__file__)
+xls_path = os.path.join(tests_dir, 'fixtures', 'streaming_workbook.xls')
+
+
+@skipUnless(openpyxl is not None, "openpyxl is required to read .xlsx files")
+class TestStreamingWorkbook(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'results.xlsx')
+        book = openpyxl.Workbook()
+        sheet = book.active
+        sheet.title = 'Totals'
+        sheet.append(['Precinct', 'Smith', 'Jones'])
+        sheet.append(['Ames 1', 10, None])
+        sheet.append(['Ames 2', 12, 3])
+        other = book.create_sheet('Turnout')
+        other.append(['Precinct', 'Ballots', 'Date'])
+        other.append(['Ames 1', 25, datetime.datetime(2012, 11, 6)])
+        book.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_rows(self):
+        with StreamingWorkbook(self.path) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            rows = list(sheet.rows())
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0], ['Precinct', 'Smith', 'Jones'])
+        # Numbers are floats and empty cells are empty strings, like xlrd
+        self.assertEqual(rows[1], ['Ames 1', 10.0, ''])
+        self.assertIsInstance(rows[1][1], float)
+
+    def test_rows_start(self):
+        with StreamingWorkbook(self.path) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            rows = list(sheet.rows(start=2))
+        self.assertEqual(rows, [['Ames 2', 12.0, 3.0]])
+
+    def test_row_values(self):
+        with StreamingWorkbook(self.path) as workbook:
+            sheet = workbook.sheet_by_name('Totals')
+            self.assertEqual(sheet.row_values(0), ['Precinct', 'Smith', 'Jones'])
+            self.assertRaises(IndexError, sheet.row_values, 10)
+
+    def test_sheets(self):
+        with StreamingWorkbook(self.path) as workbook:
+            self.assertEqual([s.name for s in workbook.sheets()],
+                ['Totals', 'Turnout'])
+            self.assertEqual(workbook.sheet_by_name('Turnout').index, 1)
+            self.assertRaises(xlrd.XLRDError, workbook.sheet_by_name, 'Missing')
+
+    def test_row_values_sequential(self):
+        with StreamingWorkbook(self.path) as workbook:
+            sheet = workbook.sheet_by_name('Totals')
+            rows = [sheet.row_values(rowx) for rowx in range(3)]
+            # Rows read in order share a single openpyxl iterator
+            self.assertEqual(workbook._row_iters[0][0], 3)
+            self.assertEqual(rows[2], ['Ames 2', 12.0, 3.0])
+            # Going back to an earlier row starts a new iterator
+            sheet._row_cache = {}
+            self.assertEqual(sheet.row_values(1), ['Ames 1', 10.0, ''])
+            self.assertEqual(workbook._row_iters[0][0], 2)
+
+    def test_dates(self):
+        with StreamingWorkbook(self.path) as workbook:
+            row = workbook.sheet_by_name('Turnout').row_values(1)
+        # Dates are serial numbers, like xlrd returns for the .xls fixture
+        self.assertEqual(row, ['Ames 1', 25.0, 41219.0])
+
+
+class TestStreamingWorkbookXls(TestCase):
+    def test_rows(self):
+        with StreamingWorkbook(xls_path) as workbook:
+            sheet = workbook.sheet_by_index(0)
+            self.assertEqual(list(sheet.rows(start=1)),
+                [['Ames 1', 10.0, ''], ['Ames 2', 12.0, 3.0]])
+
+    def test_on_demand(self):
+        with StreamingWorkbook(xls_path) as workbook:
+            book = workbook._book
+            # No worksheets are parsed when the workbook is opened
+            self.assertFalse(book.sheet_loaded(0))
+            self.assertFalse(book.sheet_loaded(1))
+
+            sheet = workbook.sheet_by_name('Turnout')
+            self.assertEqual(sheet.row_values(1), ['Ames 1', 25.0, 41219.0])
+            self.assertTrue(book.sheet_loaded(1))
+            self.assertFalse(book.sheet_loaded(0))
+
+            # Reading every row unloads the worksheet again
+            list(sheet.rows())
+            self.assertFalse(book.sheet_loaded(1))
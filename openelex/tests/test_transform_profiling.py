@@ -0,0 +1,108 @@
+import json
+import threading
+from unittest import TestCase
+
+import bson
+
+from openelex.base.transformstats import TransformProfiler, reply_size
+
+
+class FakeEvent(object):
+    def __init__(self, request_id, command_name, command=None, reply=None,
+            duration_micros=0):
+        self.connection_id = ('localhost', 27017)
+        self.request_id = request_id
+        self.command_name = command_name
+        self.command = command
+        self.reply = reply
+        self.duration_micros = duration_micros
+
+
+class TestTransformProfiler(TestCase):
+    def setUp(self):
+        self.profiler = TransformProfiler()
+        self.request_id = 0
+
+    def send(self, command_name, command, reply, duration_micros=1000):
+        self.request_id += 1
+        self.profiler.started(FakeEvent(self.request_id, command_name,
+            command=command))
+        self.profiler.succeeded(FakeEvent(self.request_id, command_name,
+            reply=reply, duration_micros=duration_micros))
+
+    def test_counts(self):
+        with self.profiler.measure('create_unique_contests', 'run'):
+            self.send('find', {'find': 'raw_result'},
+                {'cursor': {'firstBatch': [{'a': 1}, {'a': 2}]}, 'ok': 1})
+            self.send('getMore', {'getMore': 1, 'collection': 'raw_result'},
+                {'cursor': {'nextBatch': [{'a': 3}]}, 'ok': 1},
+                duration_micros=5000)
+            self.send('insert', {'insert': 'contest'}, {'n': 2, 'ok': 1})
+            self.send('update', {'update': 'contest'},
+                {'n': 3, 'nModified': 1, 'upserted': [{'index': 0}], 'ok': 1})
+            self.send('delete', {'delete': 'contest'}, {'n': 4, 'ok': 1})
+        # Commands sent outside of a transform aren't counted
+        self.send('find', {'find': 'raw_result'}, {'ok': 1})
+
+        stats = self.profiler.transforms[0]
+        self.assertEqual(stats.transform, 'create_unique_contests')
+        self.assertEqual(stats.queries, 2)
+        self.assertEqual(stats.documents_returned, 3)
+        self.assertEqual((stats.inserts, stats.documents_inserted), (1, 2))
+        self.assertEqual((stats.updates, stats.documents_updated), (1, 2))
+        self.assertEqual((stats.deletes, stats.documents_deleted), (1, 4))
+        self.assertAlmostEqual(stats.db_seconds, 0.009)
+        self.assertTrue(stats.bytes_returned > 0)
+        self.assertTrue(stats.run_seconds >= 0)
+        self.assertEqual(stats.slowest[0], (0.005, 'getMore', 'raw_result'))
+
+        report = json.loads(self.profiler.to_json())
+        self.assertEqual(report[0]['slowest_commands'][0]['command'],
+            'getMore')
+        self.assertIn('create_unique_contests', self.profiler.table())
+
+    def test_failed(self):
+        with self.profiler.measure('create_unique_contests', 'reverse'):
+            self.profiler.started(FakeEvent(1, 'delete',
+                command={'delete': 'contest'}))
+            self.profiler.failed(FakeEvent(1, 'delete',
+                duration_micros=2000))
+
+        stats = self.profiler.transforms[0]
+        self.assertEqual(stats.failed_commands, 1)
+        self.assertEqual(stats.deletes, 0)
+        self.assertAlmostEqual(stats.db_seconds, 0.002)
+
+    def test_threads(self):
+        # Commands are attributed to the transform measured on the thread
+        # that sent them
+        def run(name, request_id):
+            with self.profiler.measure(name, 'run'):
+                self.profiler.started(FakeEvent(request_id, 'insert',
+                    command={'insert': 'result'}))
+                self.profiler.succeeded(FakeEvent(request_id, 'insert',
+                    reply={'n': request_id, 'ok': 1}))
+
+        threads = [threading.Thread(target=run, args=(name, i))
+                   for i, name in enumerate(['a', 'b'], 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = dict((s.transform, s) for s in self.profiler.transforms)
+        self.assertEqual(stats['a'].documents_inserted, 1)
+        self.assertEqual(stats['b'].documents_inserted, 2)
+
+
+class TestReplySize(TestCase):
+    def test_batch(self):
+        doc = {'state': 'MD', 'votes': 10}
+        reply = {'cursor': {'firstBatch': [doc] * 100, 'id': 0}, 'ok': 1}
+        self.assertEqual(reply_size(reply), 100 * len(bson.BSON.encode(doc)))
+
+    def test_other(self):
+        reply = {'n': 2, 'ok': 1}
+        self.assertEqual(reply_size(reply), len(bson.BSON.encode(reply)))
+        empty = {'cursor': {'firstBatch': [], 'id': 0}, 'ok': 1}
+        self.assertEqual(reply_size(empty), len(bson.BSON.encode(empty)))
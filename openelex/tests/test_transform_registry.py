@@ -1,8 +1,13 @@
+import threading
+import time
 from unittest import TestCase
 
 from mock import Mock
 
-from openelex.base.transform import registry
+from openelex.base.scheduler import TransformScheduler
+from openelex.base.transform import (DistinctRawResultsTransform,
+    RawResultRow, Transform, registry, resources_conflict,
+    transform_dependencies, transform_in_scope)
 
 class TestTransformRegistry(TestCase):
     def test_register_with_validators(self):
@@ -31,3 +36,201 @@ class TestTransformRegistry(TestCase):
         transform = registry.get("XX", "mock_transform", raw=True)
         transform()
         mock_transform.assert_called_once_with()
+
+
+class FakeTransform(object):
+    def __init__(self, name, inputs=None, outputs=None, depends_on=None):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.depends_on = depends_on
+
+
+class TestTransformDependencies(TestCase):
+    def test_resources_conflict(self):
+        self.assertTrue(resources_conflict('Result', 'Result'))
+        self.assertTrue(resources_conflict('Result', 'Result:md-2004'))
+        self.assertTrue(resources_conflict('Result:md-2004', 'Result:md-2004'))
+        self.assertFalse(resources_conflict('Result:md-2004', 'Result:md-2008'))
+        self.assertFalse(resources_conflict('Result', 'Contest'))
+
+    def test_declared(self):
+        transforms = [
+            FakeTransform('contests', ['RawResult'], ['Contest']),
+            FakeTransform('results', ['RawResult', 'Contest'], ['Result']),
+            FakeTransform('fix_2004', ['Result:md-2004'], ['Result:md-2004']),
+            FakeTransform('fix_2008', ['Result:md-2008'], ['Result:md-2008']),
+            FakeTransform('note', [], ['Result']),
+        ]
+        dependencies = transform_dependencies(transforms)
+        self.assertEqual(dependencies['contests'], [])
+        self.assertEqual(dependencies['results'], ['contests'])
+        self.assertEqual(dependencies['fix_2004'], ['results'])
+        self.assertEqual(dependencies['fix_2008'], ['results'])
+        self.assertEqual(dependencies['note'],
+            ['results', 'fix_2004', 'fix_2008'])
+
+    def test_undeclared(self):
+        transforms = [
+            FakeTransform('a', outputs=['Contest']),
+            FakeTransform('b'),
+            FakeTransform('c', outputs=['Result']),
+        ]
+        dependencies = transform_dependencies(transforms)
+        self.assertEqual(dependencies['b'], ['a'])
+        self.assertEqual(dependencies['c'], ['b'])
+
+    def test_depends_on(self):
+        transforms = [
+            FakeTransform('a', outputs=['Contest']),
+            FakeTransform('b', outputs=['Result'], depends_on=['a', 'missing']),
+        ]
+        self.assertEqual(transform_dependencies(transforms)['b'], ['a'])
+
+    def test_cycle(self):
+        transforms = [
+            FakeTransform('a', depends_on=['b']),
+            FakeTransform('b', depends_on=['a']),
+        ]
+        self.assertRaises(ValueError, transform_dependencies, transforms)
+
+
+class TestTransformScope(TestCase):
+    def test_scope_query(self):
+        transform = Transform()
+        self.assertFalse(transform.scoped)
+        self.assertEqual(transform.scope_query(), {})
+        self.assertEqual(transform.scope_query(by_election=True), {})
+
+        transform.set_scope(election_id='md-2012-11-06-general')
+        self.assertTrue(transform.scoped)
+        self.assertEqual(transform.scope_query(),
+            {'election_id': 'md-2012-11-06-general'})
+        self.assertEqual(transform.scope_query(by_election=True),
+            {'election_id': 'md-2012-11-06-general'})
+
+        source = '20121106__md__general__allegany__precinct.csv'
+        transform.set_scope(source=source,
+            election_id='md-2012-11-06-general')
+        self.assertEqual(transform.scope_query(), {
+            'source': source,
+            'election_id': 'md-2012-11-06-general',
+        })
+        self.assertEqual(transform.scope_query(by_election=True),
+            {'election_id': 'md-2012-11-06-general'})
+
+    def test_transform_in_scope(self):
+        election_ids = ['md-2008-02-12-primary']
+        self.assertTrue(transform_in_scope(FakeTransform('a'), election_ids))
+        self.assertTrue(transform_in_scope(
+            FakeTransform('b', outputs=['Result']), election_ids))
+        self.assertTrue(transform_in_scope(
+            FakeTransform('c', outputs=['Result:md-2008-02-12-primary']),
+            election_ids))
+        self.assertFalse(transform_in_scope(
+            FakeTransform('d', outputs=['Contest:md-2004-11-02-general',
+                'Result:md-2004-11-02-general']), election_ids))
+
+
+class FakeContestTransform(DistinctRawResultsTransform):
+    name = 'fake_contests'
+
+    key_fields = ['election_id', 'office', 'district']
+    row_fields = ['election_id', 'source']
+
+    def __init__(self, docs):
+        super(FakeContestTransform, self).__init__()
+        self.docs = docs
+        self.doc_cls = Mock()
+        self.doc_cls.__name__ = 'Contest'
+
+    def match_query(self):
+        return {'state': 'MD'}
+
+    def get_distinct_rows(self):
+        for doc in self.docs:
+            yield RawResultRow(doc, self._slugs)
+
+    def clean_key(self, row):
+        return (row.election_id, row.contest_slug)
+
+    def make_record(self, row):
+        return (row.election_id, row.contest_slug, row.source)
+
+
+class TestDistinctRawResultsTransform(TestCase):
+    def test_distinct_pipeline(self):
+        pipeline = FakeContestTransform([]).distinct_pipeline()
+        self.assertEqual(pipeline, [
+            {'$match': {'state': 'MD'}},
+            {'$group': {
+                '_id': {
+                    'election_id': '$election_id',
+                    'office': '$office',
+                    'district': '$district',
+                },
+                'source': {'$first': '$source'},
+            }},
+        ])
+
+    def test_call(self):
+        transform = FakeContestTransform([
+            {'election_id': 'md-2012', 'office': 'Governor', 'source': 'a'},
+            {'election_id': 'md-2012', 'office': 'Congress', 'district': '01',
+             'source': 'a'},
+            # Same contest once the district is cleaned
+            {'election_id': 'md-2012', 'office': 'Congress', 'district': '1',
+             'source': 'b'},
+        ])
+        transform()
+        transform.doc_cls.objects.insert.assert_called_once_with([
+            ('md-2012', 'governor', 'a'),
+            ('md-2012', 'congress-1', 'a'),
+        ], load_bulk=False)
+
+
+class TestTransformScheduler(TestCase):
+    def test_concurrent(self):
+        transforms = [
+            FakeTransform('create', outputs=['Result']),
+            FakeTransform('fix_2004', outputs=['Result:md-2004']),
+            FakeTransform('fix_2008', outputs=['Result:md-2008']),
+        ]
+        running = []
+        overlapped = []
+        lock = threading.Lock()
+
+        def run_transform(transform):
+            with lock:
+                running.append(transform.name)
+                if len(running) > 1:
+                    overlapped.append(list(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(transform.name)
+
+        scheduler = TransformScheduler(transforms,
+            transform_dependencies(transforms), workers=2)
+        scheduler.run(run_transform)
+
+        self.assertEqual(len(overlapped), 1)
+        self.assertEqual(sorted(overlapped[0]), ['fix_2004', 'fix_2008'])
+        self.assertEqual(scheduler.critical_path()[0], 'create')
+        self.assertEqual(len(scheduler.critical_path()), 2)
+        self.assertIn('Critical path', scheduler.table())
+
+    def test_error(self):
+        transforms = [
+            FakeTransform('a', outputs=['Result']),
+            FakeTransform('b', outputs=['Result']),
+        ]
+        ran = []
+
+        def run_transform(transform):
+            ran.append(transform.name)
+            raise ValueError(transform.name)
+
+        scheduler = TransformScheduler(transforms,
+            transform_dependencies(transforms), workers=2)
+        self.assertRaises(ValueError, scheduler.run, run_transform)
+        self.assertEqual(ran, ['a'])
@@ -0,0 +1,102 @@
+import io
+import os
+from unittest import TestCase
+
+from mock import Mock, PropertyMock, patch
+
+from openelex.us.wa.load import (HeaderColumns, KingCountyHeaderColumns,
+    WALoaderPrecinctsText, normalize_district, normalize_races)
+
+tests_dir = os.path.dirname(__file__)
+king_county_path = os.path.join(tests_dir, 'fixtures',
+    'wa_king_county_precincts.txt')
+
+
+class TestHeaderColumns(TestCase):
+    def test_resolve_columns(self):
+        header = ['Precinct', 'Race', 'Candidate', 'Party', 'Votes']
+        columns = HeaderColumns(header)
+        self.assertEqual(columns.name('contest'), 'Race')
+        self.assertEqual(columns.name('votes'), 'Votes')
+        self.assertEqual(columns.index('candidate'), 2)
+        self.assertEqual(columns.index('party'), 3)
+
+    def test_missing_column(self):
+        columns = HeaderColumns(['Precinct', 'Race', 'Votes'])
+        self.assertRaises(IndexError, columns.name, 'candidate')
+
+    def test_king_county_columns(self):
+        header = ['Precinct', 'Race', 'LEG', 'CC', 'CounterType', 'Party',
+            'SumOfCount']
+        self.assertRaises(IndexError, HeaderColumns(header).name, 'votes')
+        columns = KingCountyHeaderColumns(header)
+        self.assertEqual(columns.name('votes'), 'SumOfCount')
+        self.assertEqual(columns.name('candidate'), 'CounterType')
+
+    def test_district_from_office(self):
+        columns = HeaderColumns(['Race', 'Votes'])
+        self.assertEqual(columns.district(
+            'Legislative District 37 - State Senator', {}), '37')
+        self.assertEqual(columns.district('Governor', {}), None)
+        self.assertEqual(normalize_district(['Race', 'Votes'],
+            'Legislative District 37 - State Senator', None), '37')
+
+    def test_district_from_row(self):
+        columns = HeaderColumns(['Race', 'LegislativeDistrict', 'Votes'])
+        self.assertEqual(columns.district('US Representative 1',
+            {'LegislativeDistrict': '4'}), '4')
+        self.assertRaises(KeyError, columns.district, 'US Representative 1',
+            {})
+
+
+class TestNormalizeRaces(TestCase):
+    def test_normalize_races(self):
+        self.assertEqual(normalize_races('US Representative District 7'),
+            'U.S. Representative')
+        self.assertEqual(normalize_races('Legislative District 1 State Senator'),
+            'State Senator')
+        self.assertEqual(normalize_races('Lieutenant Governor'),
+            'Lt. Governor')
+        self.assertEqual(normalize_races('City of Seattle Council'), 'N/A')
+
+
+class ResultList(list):
+    """Stands in for the loader's insert buffer"""
+
+    def flush(self):
+        pass
+
+    def count(self):
+        return len(self)
+
+
+class TestWALoaderPrecinctsText(TestCase):
+    def test_load(self):
+        loader = WALoaderPrecinctsText()
+        loader.mapping = {
+            'ocd_id': 'ocd-division/country:us/state:wa/county:king',
+        }
+        context = Mock()
+        context.election_kwargs.return_value = {'state': 'WA'}
+        results = ResultList()
+        with patch.object(WALoaderPrecinctsText, '_file_handle',
+                new_callable=PropertyMock) as file_handle, \
+                patch.object(WALoaderPrecinctsText, 'context',
+                    new_callable=PropertyMock) as loader_context, \
+                patch.object(loader, '_insert_buffer', return_value=results):
+            file_handle.return_value = io.open(king_county_path,
+                encoding='latin-1')
+            loader_context.return_value = context
+            loader.load()
+
+        # The quoted column name with a comma is a single column
+        self.assertEqual(loader.header[1], 'Turnout, %')
+        self.assertEqual(loader.contest_index, 'Race')
+        # The local race is skipped
+        self.assertEqual([(r.office, r.full_name, r.votes) for r in results], [
+            ('Governor', 'Jay Inslee', 231),
+            ('Governor', 'Rob McKenna', 198),
+            ('Legislative District 5 State Senator', 'Mark Mullet', 310),
+        ])
+        self.assertEqual(results[0].jurisdiction, 'ADAIR')
+        self.assertEqual(results[2].district, '5')
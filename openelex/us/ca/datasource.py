@@ -75,7 +75,7 @@ class Datasource(BaseDatasource):
                 # some general runoffs will have smaller numbers of files
                 results = [x for x in self._url_paths() if x['date'] == election['start_date'] and x['special'] == False]
                 for result in results:
-                    county = [c for c in self._jurisdictions() if c['county'] == result['county']][0]
+                    county = self.jurisdiction_index().get('county', result['county'])
                     generated_filename = self._generate_county_filename(election['start_date'], result)
                     meta.append({
                         "generated_filename": generated_filename,
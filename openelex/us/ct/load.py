@@ -113,7 +113,7 @@ class NVPrecinctLoader(NVBaseLoader):
     def load(self):
         # use first row as headers, not pre-canned list
         # need to use OCD_ID from jurisdiction in mapping
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -130,7 +130,7 @@ class NVPrecinctLoader(NVBaseLoader):
                 rr_kwargs = self._common_kwargs.copy()
                 rr_kwargs.update(self._build_contest_kwargs(row))
                 rr_kwargs.update(self._build_candidate_kwargs(row))
-                ocd_id = [c for c in self.datasource._jurisdictions() if c['jurisdiction'] == row['Jurisdiction']][0]['ocd_id']
+                ocd_id = self.datasource.jurisdiction_index().ocd_id('jurisdiction', row['Jurisdiction'])
                 jurisdiction = row['Jurisdiction'].strip()
                 if row['Votes'].strip() == '*':
                     votes = 'N/A'
@@ -155,7 +155,7 @@ class NVCountyLoader(NVBaseLoader):
     def load(self):
         # use first row as headers, not pre-canned list
         # need to use OCD_ID from jurisdiction in mapping
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -213,7 +213,7 @@ class NVXmlLoader(NVBaseLoader):
 
     def load(self):
         # need to pluck OCD_ID from jurisdictions
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -247,7 +247,7 @@ class NVXmlLoader(NVBaseLoader):
         }
 
     def _build_jurisdiction_kwargs(self, candidate, jurisdiction):
-        j_obj = [j for j in self.datasource._jurisdictions() if j['jurisdiction'] == jurisdiction][0]
+        j_obj = self.datasource.jurisdiction_index().get('jurisdiction', jurisdiction)
         key = jurisdiction.replace(' ','')+'Votes'
         return { 'jurisdiction': j_obj['jurisdiction'], 'ocd_id': j_obj['ocd_id'], 'votes': candidate.attrib[key]}
 
@@ -43,7 +43,7 @@ class Datasource(BaseDatasource):
         for election in elections:
             results = [x for x in self._url_paths() if x['date'] == election['start_date']]
             for result in results:
-                county = [c for c in self._jurisdictions() if c['county'] == result['county']][0]
+                county = self.jurisdiction_index().get('county', result['county'])
                 generated_filename = self._generate_county_filename(result, election, '.tsv')
                 meta.append({
                     "generated_filename": generated_filename,
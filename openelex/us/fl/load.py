@@ -89,7 +89,7 @@ class FlLoader(BaseLoader):
         with self._file_handle as csvfile:
             results = []
             seen = set()
-            self._common_kwargs = self._build_common_election_kwargs()
+            self._common_kwargs = self.context.election_kwargs()
             reader = unicodecsv.DictReader(csvfile, delimiter='\t')
             for row in reader:
                 # Skip non-target offices
@@ -203,7 +203,7 @@ class PrecinctLoader(FlLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -250,7 +250,7 @@ class PrecinctLoader(FlLoader):
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
         precinct = str(row['precinct_id']+' '+row['polling_location']).strip()
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county_name'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county_name'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
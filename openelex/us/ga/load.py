@@ -57,7 +57,6 @@ class GABaseLoader(BaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         return kwargs
 
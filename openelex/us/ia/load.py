@@ -6,9 +6,7 @@ from builtins import object
 import logging
 import re
 
-import unicodecsv
-import xlrd
-
+from openelex.base.columnar import clean_votes
 from openelex.base.load import BaseLoader
 from openelex.lib.text import ocd_type_id
 from openelex.models import RawResult
@@ -111,29 +109,27 @@ class PreprocessedResultsLoader(BaseLoader):
     datasource = Datasource()
 
     def load(self):
-        with self._file_handle as csvfile:
-            results = []
-            reader = unicodecsv.DictReader(csvfile)
-            for row in reader:
-                if self._skip_row(row):
-                    continue
+        results = []
+        for row in self._read_rows(vote_fields=('votes',)):
+            if self._skip_row(row):
+                continue
 
-                if self._is_racewide_total(row):
-                    # Regardless of the reporting level of the file, rows with
-                    # a jurisdiction of "Totals" should be interpretted as a
-                    # racewide result
-                    results.append(self._prep_racewide_result(row))
-                elif 'precinct' in self.source:
-                    county = None
-                    if self.mapping['name'] != 'Iowa':
-                        county = self.mapping['name']
-                    results.append(self._prep_precinct_result(row, county=county))
-                elif 'county' in self.source:
-                    results.append(self._prep_county_result(row))
-                else:
-                    raise Exception("Unknown reporting level for result")
+            if self._is_racewide_total(row):
+                # Regardless of the reporting level of the file, rows with
+                # a jurisdiction of "Totals" should be interpretted as a
+                # racewide result
+                results.append(self._prep_racewide_result(row))
+            elif 'precinct' in self.source:
+                county = None
+                if self.mapping['name'] != 'Iowa':
+                    county = self.mapping['name']
+                results.append(self._prep_precinct_result(row, county=county))
+            elif 'county' in self.source:
+                results.append(self._prep_county_result(row))
+            else:
+                raise Exception("Unknown reporting level for result")
 
-            RawResult.objects.insert(results)
+        RawResult.objects.insert(results)
 
     def _skip_row(self, row):
         if (self.mapping['election'] == "ia-2004-11-02-general" and
@@ -198,7 +194,7 @@ class PreprocessedResultsLoader(BaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         # Sanity check that the primary_type field has been set on all records
         # that we're getting from the elections API
         assert (kwargs['election_type'] is not 'primary' or
@@ -282,40 +278,29 @@ class PreprocessedResultsLoader(BaseLoader):
         """
         Returns cleaned version of votes or 0 if it's a non-numeric value.
         """
-        if val.strip() == '':
-            return 0
-
-        try:
-            return int(float(val))
-        except ValueError:
-            # Can't convert value from string
-            return 0
-        pass
+        return clean_votes(val)
 
     def _lookup_county_ocd_id(self, county):
         """Retrieve the ocd_id for a given county"""
-        try:
-            return self._county_ocd_id_cache[county]
-        except AttributeError:
-            self._county_ocd_id_cache = {}
-        except KeyError:
-            pass
-
-        # No cached value, look it up from the jurisdiction mappings
-        for mapping in self.datasource._counties():
-            if mapping['name'].lower() == county.lower():
-                self._county_ocd_id_cache[county] = mapping['ocd_id']
-                return self._county_ocd_id_cache[county]
-
-        raise KeyError("No county matching '{}' found".format(county))
+        return self.datasource.jurisdiction_index().county_ocd_id(self.state,
+            county)
 
 
 class ExcelPrecinctResultLoader(BaseLoader):
     """Base class for parsing precinct-level results in Excel format"""
     datasource = Datasource()
+    _workbook = None
 
     def load(self):
-        RawResult.objects.insert(self._results(self.mapping))
+        # Share one open workbook between the sheets that ``_results()``
+        # reads, and close it once they've been read
+        with self._open_workbook() as workbook:
+            self._workbook = workbook
+            try:
+                results = self._results(self.mapping)
+            finally:
+                self._workbook = None
+        RawResult.objects.insert(results)
 
     def _results(self, mapping):
         return []
@@ -324,15 +309,14 @@ class ExcelPrecinctResultLoader(BaseLoader):
         if sheet is None:
             sheet = self._get_sheet()
 
-        for row_index in range(sheet.nrows):
-            yield [r for r in sheet.row_values(row_index)]
+        return sheet.rows()
 
     def _get_sheet(self, workbook=None, sheet_index=0):
         """Return the sheet of interest from the workbook"""
         if workbook is None:
             workbook = self._get_workbook()
 
-        return workbook.sheets()[sheet_index]
+        return workbook.sheet_by_index(sheet_index)
 
     def _get_sheet_by_name(self, sheet_name, workbook=None):
         if workbook is None:
@@ -341,7 +325,9 @@ class ExcelPrecinctResultLoader(BaseLoader):
         return workbook.sheet_by_name(sheet_name)
 
     def _get_workbook(self):
-        return xlrd.open_workbook(self._xls_file_path)
+        if self._workbook is not None:
+            return self._workbook
+        return self._open_workbook()
 
     @classmethod
     def _empty_row(cls, row):
@@ -395,7 +381,7 @@ class ExcelPrecinctPre2010ResultLoader(ExcelPrecinctResultLoader):
         office = None
         district = None
         candidates_next = False
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
 
         for row in self._rows():
             # We'll inspect the first two cells to figure out
@@ -581,7 +567,7 @@ class ExcelPrecinct2010PrimaryResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
 
         for row in self._rows():
             cell0 = row[0].strip()
@@ -704,7 +690,7 @@ class ExcelPrecinct2010GeneralResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         # Some sheets have annoying leading hidden columns.
         # Detect the start column
         sheet = self._get_sheet()
@@ -900,7 +886,7 @@ class ExcelPrecinct2010GeneralAudubonResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         # Audubon County's results have a number of sheets in the workbook.
         # We're going to use the one named "Totals -Absentee" because it's the
         # default sheet that opens when I open the workbook in LibreOffice.
@@ -1077,7 +1063,7 @@ class ExcelPrecinct2010GeneralClintonResultLoader(ExcelPrecinctResultLoader):
     def _results(self, mapping):
         results = []
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         # Unlike other results files for Iowa, all rows represent
         # a precinct result
         base_kwargs['reporting_level'] = 'precinct'
@@ -1204,7 +1190,7 @@ class ExcelPrecinct2010GeneralGrundyResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         office = None
         district = None
 
@@ -1321,7 +1307,7 @@ class ExcelPrecinct2010GeneralHenryResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         office = None
         district = None
         jurisdictions = None
@@ -1504,7 +1490,7 @@ class ExcelPrecinct2010GeneralLouisaResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         base_jurisdiction = None
 
         for i, row in enumerate(self._rows()):
@@ -1675,7 +1661,7 @@ class ExcelPrecinct2010GeneralPoweshiekResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         base_kwargs['votes_type'] = None
 
         for i, row in enumerate(self._rows()):
@@ -1850,7 +1836,7 @@ class ExcelPrecinct2012ResultLoader(ExcelPrecinctResultLoader):
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
         in_contest_results = False
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         sheet = self._get_sheet()
 
         for row in self._rows(sheet):
@@ -2087,7 +2073,7 @@ class ExcelPrecinct2013ResultLoader(ExcelPrecinctResultLoader):
 
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         base_kwargs['office'] = None
         sheet = self._get_sheet()
         candidates = None
@@ -2227,7 +2213,7 @@ class ExcelPrecinct2014ResultLoader(ExcelPrecinctResultLoader):
         results = []
         county = mapping['name']
         county_ocd_id = mapping['ocd_id']
-        base_kwargs = self._build_common_election_kwargs()
+        base_kwargs = self.context.election_kwargs()
         if county == "Van Buren" and 'primary' in mapping['election']:
             # Van Buren County has an empty initial sheet
             sheet_index = 1
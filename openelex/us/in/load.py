@@ -42,7 +42,7 @@ class INPrecinctLoader(BaseLoader):
     datasource = Datasource()
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
 
         # Store result instances for bulk loading
@@ -109,9 +109,10 @@ class INPrecinctLoader(BaseLoader):
         }
 
     def _get_county_ocd_id(self, county):
-        for j in self.datasource.jurisdiction_mappings():
-            if j['county'].upper() == county.upper():
-                return  j['ocd_id']
+        try:
+            return self.datasource.jurisdiction_index().ocd_id('county', county)
+        except KeyError:
+            pass
         counties = [j['county']
                     for j in self.datasource.jurisdiction_mappings()]
         raise RuntimeError('Did not find county ocd id for {} in {}'.format(
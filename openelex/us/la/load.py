@@ -81,7 +81,7 @@ class LAPrecinctLoader(LABaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -95,7 +95,7 @@ class LAPrecinctLoader(LABaseLoader):
                 rr_kwargs['primary_party'] = row['party'].strip()
                 rr_kwargs.update(self._build_contest_kwargs(row))
                 rr_kwargs.update(self._build_candidate_kwargs(row))
-                county_ocd_id = [c for c in self.datasource._jurisdictions() if c['name'].upper().replace(' ','') == row['parish'].upper().replace(' ','')][0]['ocd_id']
+                county_ocd_id = self.datasource.jurisdiction_index().ocd_id('name', row['parish'])
                 if row['precinct'].strip() == 'Early Voting' or row['precinct'].strip() == 'Provisional Votes':
                     jurisdiction = None
                     ocd_id = "{}/parish:{}".format(self.mapping['ocd_id'], ocd_type_id(row['parish'].strip()))
@@ -144,7 +144,7 @@ class LAParishLoader(LABaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'parish'
         # Store result instances for bulk loading
         results = []
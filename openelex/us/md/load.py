@@ -7,6 +7,7 @@ import unicodecsv
 
 from bs4 import BeautifulSoup
 
+from openelex.base.columnar import clean_votes
 from openelex.base.load import BaseLoader
 from openelex.models import RawResult
 from openelex.lib.text import ocd_type_id, slugify
@@ -93,25 +94,26 @@ class MDLoader(MDBaseLoader):
 
     """
     def load(self):
-        with self._file_handle as csvfile:
-            results = []
-            reader = unicodecsv.DictReader(csvfile)
-            for row in reader:
-                # Skip non-target offices
-                if self._skip_row(row):
-                    continue
-                elif 'state_legislative' in self.source:
-                    results.extend(self._prep_state_leg_results(row))
-                elif 'precinct' in self.source:
-                    results.append(self._prep_precinct_result(row))
-                else:
-                    results.append(self._prep_county_result(row))
-            RawResult.objects.insert(results)
+        results = []
+        # Non-target offices are skipped as the file is read
+        rows = self._read_rows(office_field='Office Name',
+            keep_office=self._is_target_office, vote_fields=('Total Votes',))
+        for row in rows:
+            if 'state_legislative' in self.source:
+                results.extend(self._prep_state_leg_results(row))
+            elif 'precinct' in self.source:
+                results.append(self._prep_precinct_result(row))
+            else:
+                results.append(self._prep_county_result(row))
+        RawResult.objects.insert(results)
+
+    def _is_target_office(self, office):
+        if office == None:
+            return False
+        return office.strip() in self.target_offices
 
     def _skip_row(self, row):
-        if row['Office Name'] == None:
-            return True
-        return row['Office Name'].strip() not in self.target_offices
+        return not self._is_target_office(row['Office Name'])
 
     def _build_contest_kwargs(self, row, primary_type):
         kwargs = {
@@ -140,8 +142,7 @@ class MDLoader(MDBaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(row, kwargs['primary_type'])
         candidate_kwargs = self._build_candidate_kwargs(row)
         kwargs.update(contest_kwargs)
@@ -158,14 +159,7 @@ class MDLoader(MDBaseLoader):
         IDs for lower jurisdictions.
 
         """
-        bits = []
-        state_bit = "state:"+ self.state
-        for bit in self.mapping['ocd_id'].split('/'):
-            bits.append(bit)
-            if bit == state_bit:
-                break
-
-        return '/'.join(bits)
+        return self.context.state_ocd_id
 
     def _prep_state_leg_results(self, row):
         kwargs = self._base_kwargs(row)
@@ -249,14 +243,7 @@ class MDLoader(MDBaseLoader):
         """
         Returns cleaned version of votes or 0 if it's a non-numeric value.
         """
-        if val.strip() == '':
-            return 0
-
-        try:
-            return int(float(val))
-        except ValueError:
-            # Count'y convert value from string
-            return 0
+        return clean_votes(val)
 
     def _writein(self, row):
         # sometimes write-in field not present
@@ -316,7 +303,7 @@ class MDLoader2002(MDBaseLoader):
             'votes',
             'fill2'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -380,7 +367,7 @@ class MDLoader2000Primary(MDBaseLoader):
         last_office = None
         last_party = None
         last_district = None
-        common_kwargs = self._build_common_election_kwargs()
+        common_kwargs = self.context.election_kwargs()
 
         with self._file_handle as csvfile:
             reader = csv.reader(csvfile)
@@ -597,7 +584,7 @@ class MDLoader2008Special(CountyOCDMixin, BaseLoader):
 
     def _parse_results(self, rows, candidate_attrs):
         # These raw result attributes will be the same for every result.
-        common_kwargs = self._build_common_election_kwargs()
+        common_kwargs = self.context.election_kwargs()
         common_kwargs.update({
             'office': "Representative in Congress",
             'district': '4',
@@ -2,12 +2,14 @@ from __future__ import print_function
 from datetime import datetime
 import logging
 
-from nameparser import HumanName
-
-from openelex.base.transform import Transform, registry
-from openelex.models import Candidate, Contest, Office, Party, RawResult, Result
+from openelex.base.namecache import parse_name
+from openelex.base.transform import (DistinctRawResultsTransform,
+    RawResultRow, ReferenceResolver, Transform, registry)
+from openelex.models import (Candidate, Contest, Office, Party, RawResult,
+    Result, assign_ids)
 from openelex.lib.text import ocd_type_id
-from openelex.lib.insertbuffer import BulkInsertBuffer
+from openelex.lib.insertbuffer import (BulkInsertBuffer, BulkUpsertBuffer,
+    BulkWriteBuffer)
 from ..validate import (validate_precinct_names_normalized,
     validate_no_baltimore_city_comptroller,
     validate_uncommitted_primary_state_legislative_results)
@@ -66,10 +68,19 @@ class BaseTransform(Transform):
         self._office_cache = {}
         self._party_cache = {}
         self._contest_cache = {}
+        self._resolver = None
+
+    @property
+    def resolver(self):
+        """``ReferenceResolver`` for looking up related records"""
+        if self._resolver is None:
+            self._resolver = ReferenceResolver('MD')
+        return self._resolver
 
     def get_rawresults(self):
         # Use a non-caching queryset because otherwise we run out of memory
-        return RawResult.objects.filter(state='MD').no_cache()
+        return RawResult.objects.filter(state='MD',
+            __raw__=self.scope_query()).no_cache()
 
     def get_contest_fields(self, raw_result):
         # Resolve Office and Party related objects
@@ -108,7 +119,7 @@ class BaseTransform(Transform):
             return self._office_cache[key]
         except KeyError:
             try:
-                office = Office.objects.get(**office_query)
+                office = self.resolver.office(**office_query)
                 # TODO: Remove this once I'm sure this always works. It should.
                 assert key == office.key
                 self._office_cache[key] = office
@@ -149,7 +160,7 @@ class BaseTransform(Transform):
             return self._party_cache[clean_abbrev]
         except KeyError:
             try:
-                party = Party.objects.get(abbrev=clean_abbrev)
+                party = self.resolver.party(clean_abbrev)
                 self._party_cache[clean_abbrev] = party
                 return party
             except Party.DoesNotExist:
@@ -171,7 +182,7 @@ class BaseTransform(Transform):
         if fields['full_name'] == "Other Write-Ins":
             return fields
 
-        name = HumanName(raw_result.full_name)
+        name = parse_name(raw_result.full_name)
         fields['given_name'] = name.first
         fields['family_name'] = name.last
         fields['additional_name'] = name.middle
@@ -198,6 +209,27 @@ class BaseTransform(Transform):
 
         return fields
 
+    def make_contest(self, raw_result):
+        """Returns a new, unsaved Contest for a RawResult"""
+        fields = self.get_contest_fields(raw_result)
+        fields['updated'] = fields['created'] = datetime.now()
+        return Contest(**fields)
+
+    def make_candidate(self, raw_result, contest):
+        """Returns a new, unsaved Candidate for a RawResult"""
+        fields = self.get_candidate_fields(raw_result)
+        fields['contest'] = contest
+        if "other" in fields['full_name'].lower():
+            if fields['full_name'] == "Other Write-Ins":
+                fields['flags'] = ['aggregate',]
+            else:
+                # As far as I can tell the value should always be
+                # "Other Write-Ins", but output a warning to let us
+                # know about some cases we may be missing.
+                logging.warn("'other' found in candidate name field"
+                        "value: '%s'" % raw_result.full_name)
+        return Candidate(**fields)
+
     def get_contest(self, raw_result):
         """
         Returns the Contest model instance for a given RawResult.
@@ -212,7 +244,7 @@ class BaseTransform(Transform):
             fields = self.get_contest_fields(raw_result)
             fields.pop('source')
             try:
-                contest = Contest.objects.get(**fields)
+                contest = self.resolver.contest(fields)
             except Exception:
                 print(fields)
                 raise
@@ -220,24 +252,24 @@ class BaseTransform(Transform):
             return contest
 
 
-class CreateContestsTransform(BaseTransform):
+class CreateContestsTransform(BaseTransform, DistinctRawResultsTransform):
     name = 'create_unique_contests'
 
-    def __call__(self):
-        contests = []
-        seen = set()
+    inputs = ['RawResult', 'Office', 'Party']
+    outputs = ['Contest']
 
-        for rr in self.get_rawresults():
-            key = self._contest_key(rr)
-            if key not in seen:
-                fields = self.get_contest_fields(rr)
-                fields['updated'] = fields['created'] = datetime.now()
-                contest = Contest(**fields)
-                contests.append(contest)
-                seen.add(key)
+    doc_cls = Contest
+    key_fields = ['election_id', 'office', 'district', 'primary_party']
+    row_fields = contest_fields
+
+    def match_query(self):
+        return dict(self.scope_query(), state='MD')
+
+    def clean_key(self, row):
+        return self._contest_key(row)
 
-        Contest.objects.insert(contests, load_bulk=False)
-        print("Created %d contests." % len(contests))
+    def make_record(self, row):
+        return self.make_contest(row)
 
     def reverse(self):
         old = Contest.objects.filter(state='MD')
@@ -249,37 +281,25 @@ class CreateContestsTransform(BaseTransform):
         return (raw_result.election_id, slug)
 
 
-class CreateCandidatesTransform(BaseTransform):
+class CreateCandidatesTransform(BaseTransform, DistinctRawResultsTransform):
     name = 'create_unique_candidates'
 
-    def __init__(self):
-        super(CreateCandidatesTransform, self).__init__()
+    inputs = ['RawResult', 'Office', 'Party', 'Contest']
+    outputs = ['Candidate']
 
-    def __call__(self):
-        candidates = []
-        seen = set()
+    doc_cls = Candidate
+    key_fields = ['election_id', 'office', 'district', 'primary_party',
+        'full_name', 'given_name', 'additional_name', 'family_name', 'suffix']
+    row_fields = contest_fields + candidate_fields
 
-        for rr in self.get_rawresults():
-            key = (rr.election_id, rr.contest_slug, rr.candidate_slug)
-            if key not in seen:
-                fields = self.get_candidate_fields(rr)
-                fields['contest'] = self.get_contest(rr)
-                if "other" in fields['full_name'].lower():
-                    if fields['full_name'] == "Other Write-Ins":
-                        fields['flags'] = ['aggregate',]
-                    else:
-                        # As far as I can tell the value should always be
-                        # "Other Write-Ins", but output a warning to let us
-                        # know about some cases we may be missing.
-                        logging.warn("'other' found in candidate name field"
-                                "value: '%s'" % rr.full_name)
-                candidate = Candidate(**fields)
-                candidates.append(candidate)
-                seen.add(key)
+    def match_query(self):
+        return dict(self.scope_query(), state='MD')
 
-        Candidate.objects.insert(candidates, load_bulk=False)
-        print("Created %d candidates." % len(candidates))
+    def clean_key(self, row):
+        return (row.election_id, row.contest_slug, row.candidate_slug)
 
+    def make_record(self, row):
+        return self.make_candidate(row, self.get_contest(row))
 
     def reverse(self):
         old = Candidate.objects.filter(state='MD')
@@ -290,6 +310,9 @@ class CreateCandidatesTransform(BaseTransform):
 class CreateResultsTransform(BaseTransform):
     name = 'create_unique_results'
 
+    inputs = ['RawResult', 'Office', 'Party', 'Contest', 'Candidate']
+    outputs = ['Result']
+
     auto_reverse = True
 
     def __init__(self):
@@ -304,30 +327,43 @@ class CreateResultsTransform(BaseTransform):
 
     def get_results(self):
         election_ids = self.get_rawresults().distinct('election_id')
-        return Result.objects.filter(election_id__in=election_ids)
+        return Result.objects.filter(election_id__in=election_ids,
+            __raw__=self.scope_query())
 
     def __call__(self):
         results = self._create_results_collection()
 
         for rr in self.get_rawresults():
-            fields = self._get_fields(rr, result_fields)
-            fields['contest'] = self.get_contest(rr)
-            fields['candidate'] = self.get_candidate(rr, extra={
-                'contest': fields['contest'],
+            contest = self.get_contest(rr)
+            candidate = self.get_candidate(rr, extra={
+                'contest': contest,
             })
-            fields['contest'] = fields['candidate'].contest
-            fields['raw_result'] = rr
-            party = self.get_party(rr)
-            if party:
-                fields['party'] = party.abbrev
-            fields['winner'] = self._parse_winner(rr)
-            fields['jurisdiction'] = self._strip_leading_zeros(rr.jurisdiction)
-            fields = self._alter_result_fields(fields, rr)
-            result = Result(**fields)
-            results.append(result)
+            results.append(self.make_result(rr, candidate))
 
         self._create_results(results)
 
+    def make_result(self, raw_result, candidate, raw_result_ref=None):
+        """
+        Returns a new, unsaved Result for a RawResult.
+
+        ``raw_result_ref`` is what the Result's ``raw_result`` field is set
+        to.  Default is ``raw_result``.
+        """
+        fields = self._get_fields(raw_result, result_fields)
+        fields['candidate'] = candidate
+        fields['contest'] = candidate.contest
+        if raw_result_ref is None:
+            raw_result_ref = raw_result
+        fields['raw_result'] = raw_result_ref
+        party = self.get_party(raw_result)
+        if party:
+            fields['party'] = party.abbrev
+        fields['winner'] = self._parse_winner(raw_result)
+        fields['jurisdiction'] = self._strip_leading_zeros(
+            raw_result.jurisdiction)
+        fields = self._alter_result_fields(fields, raw_result)
+        return Result(**fields)
+
     def _alter_result_fields(self, fields, raw_result):
         """
         Hook to do set additional or alter additional field values
@@ -375,7 +411,7 @@ class CreateResultsTransform(BaseTransform):
             fields.update(extra)
             del fields['source']
             try:
-                candidate = Candidate.objects.get(**fields)
+                candidate = self.resolver.candidate(fields)
             except Candidate.DoesNotExist:
                 print(fields)
                 raise
@@ -447,6 +483,200 @@ class CreateResultsTransform(BaseTransform):
             return None
 
 
+class CreateContestsCandidatesResultsTransform(CreateResultsTransform):
+    """
+    Create contests, candidates and results in a single pass over the raw
+    results.
+
+    This does the work of ``CreateContestsTransform``,
+    ``CreateCandidatesTransform`` and ``CreateResultsTransform``, but reads
+    the raw results once, as dictionaries with only the fields that are
+    needed, instead of three times as MongoEngine documents.  Contests and
+    candidates are kept in memory, keyed by their slugs, so they don't have
+    to be looked up again.
+
+    Rather than deleting the previously created records and inserting new
+    ones, contests, candidates and results are upserted in batches by their
+    natural keys (``Contest.key``, ``Candidate.key`` and
+    ``Result.make_slug()``), so records that haven't changed aren't
+    rewritten when the transform is run again.  Records that are no longer
+    created, because the raw results they came from were changed or
+    removed, are deleted.  So are results in the same elections that other
+    transforms create, as before.  Those transforms recreate them.
+
+    The transform can be limited to one data file or election with
+    ``set_scope()``.  Contests and candidates are shared by the files of an
+    election, so when it's limited to a file, contests and candidates that
+    are no longer needed aren't deleted.
+    """
+    name = 'create_contests_candidates_results'
+
+    inputs = ['RawResult', 'Office', 'Party']
+    outputs = ['Contest', 'Candidate', 'Result']
+
+    supports_scope = True
+
+    # Records are upserted, so there's no need to delete them first.
+    # ``CreateResultsTransform`` reverses automatically.
+    auto_reverse = False
+
+    raw_result_fields = sorted(set(contest_fields + candidate_fields +
+        result_fields + ['end_date', 'office', 'district', 'primary_party',
+        'suffix', 'party', 'winner', 'write_in', 'ocd_id']))
+
+    contest_key_fields = ['election_id', 'slug']
+    candidate_key_fields = ['election_id', 'contest_slug', 'slug']
+    result_key_fields = ['slug']
+
+    def __init__(self):
+        super(CreateContestsCandidatesResultsTransform, self).__init__()
+        self._slugs = {}
+
+    def get_raw_rows(self):
+        # Read in a stable order, so results that share a natural key get
+        # the same suffix each time
+        rows = RawResult.objects.filter(state='MD', __raw__=self.scope_query())\
+            .only(*self.raw_result_fields).order_by('_id').as_pymongo()\
+            .no_cache()
+        for doc in rows:
+            yield RawResultRow(doc, self._slugs)
+
+    def get_existing_ids(self, queryset, key_fields):
+        """
+        Returns a dictionary of the IDs of previously created records, keyed
+        by natural key, and a list of the IDs of records that don't have a
+        natural key or that duplicate another record's.
+        """
+        ids = {}
+        unkeyed = []
+        for doc in queryset.only(*key_fields).as_pymongo().no_cache():
+            key = tuple(doc.get(f) for f in key_fields)
+            if None in key or key in ids:
+                unkeyed.append(doc['_id'])
+            else:
+                ids[key] = doc['_id']
+        return ids, unkeyed
+
+    def make_result_slug(self, result, seen):
+        """
+        Returns the natural key for a Result.
+
+        Some raw results share a key, for instance the per-county
+        "Uncommitted" rows that ``CombineUncommittedPresStateLegislativeResults``
+        combines.  They get a numeric suffix, in the order of the raw
+        results' IDs.
+        """
+        slug = Result.make_slug(election_id=result.election_id,
+            contest_slug=result.contest_slug,
+            candidate_slug=result.candidate_slug,
+            reporting_level=result.reporting_level,
+            jurisdiction=result.jurisdiction)
+        n = seen[slug] = seen.get(slug, 0) + 1
+        if n > 1:
+            # Slugs never have two hyphens in a row, so this can't clash
+            # with another result's slug
+            slug = "%s--%d" % (slug, n)
+        return slug
+
+    def __call__(self):
+        contest_ids, stale_contest_ids = self.get_existing_ids(
+            self.get_contests(), self.contest_key_fields)
+        candidate_ids, stale_candidate_ids = self.get_existing_ids(
+            self.get_candidates(), self.candidate_key_fields)
+        result_ids, stale_result_ids = self.get_existing_ids(
+            self.get_results(), self.result_key_fields)
+
+        # Contests and candidates keep the source of the file they were
+        # first created from, so transforming another file doesn't
+        # rewrite them
+        insert_only_fields = BulkUpsertBuffer.insert_only_fields + ('source',)
+        # The natural key indexes only cover MD records, so the state has
+        # to be part of the upsert filter for them to be used
+        contests = BulkUpsertBuffer(Contest,
+            ['state'] + self.contest_key_fields,
+            insert_only_fields=insert_only_fields)
+        candidates = BulkUpsertBuffer(Candidate,
+            ['state'] + self.candidate_key_fields,
+            insert_only_fields=insert_only_fields)
+        results = BulkUpsertBuffer(Result, self.result_key_fields)
+        contest_by_key = {}
+        candidate_by_key = {}
+        result_slugs = {}
+
+        for rr in self.get_raw_rows():
+            contest_key = (rr.election_id, rr.contest_slug)
+            try:
+                contest = contest_by_key[contest_key]
+            except KeyError:
+                contest = contest_by_key[contest_key] = self.make_contest(rr)
+                # Candidates and results need the contest's ID before it's
+                # upserted.  Keep the ID of an existing contest.
+                contest.id = contest_ids.pop(contest.key, None)
+                if contest.id is None:
+                    assign_ids([contest])
+                contests.append(contest)
+
+            candidate_key = contest_key + (rr.candidate_slug,)
+            try:
+                candidate = candidate_by_key[candidate_key]
+            except KeyError:
+                candidate = candidate_by_key[candidate_key] = \
+                    self.make_candidate(rr, contest)
+                candidate.id = candidate_ids.pop(candidate.key, None)
+                if candidate.id is None:
+                    assign_ids([candidate])
+                candidates.append(candidate)
+
+            # Results reported by congressional districts split by county
+            # are aggregated by other transforms
+            if rr.reporting_level != 'congressional_district_by_county':
+                result = self.make_result(rr, candidate, raw_result_ref=rr.id)
+                result.slug = self.make_result_slug(result, result_slugs)
+                result_ids.pop((result.slug,), None)
+                results.append(result)
+
+        for label, buf in (('contests', contests), ('candidates', candidates),
+                ('results', results)):
+            buf.flush()
+            print("Upserted %d %s: %d new, %d changed." % (buf.count(), label,
+                buf.upserted, buf.modified))
+
+        self._delete_stale(Result, 'results',
+            stale_result_ids + list(result_ids.values()))
+        if self.source is None:
+            self._delete_stale(Candidate, 'candidates',
+                stale_candidate_ids + list(candidate_ids.values()))
+            self._delete_stale(Contest, 'contests',
+                stale_contest_ids + list(contest_ids.values()))
+
+    def get_contests(self):
+        return Contest.objects.filter(state='MD',
+            __raw__=self.scope_query(by_election=True))
+
+    def get_candidates(self):
+        return Candidate.objects.filter(state='MD',
+            __raw__=self.scope_query(by_election=True))
+
+    def _delete_stale(self, doc_cls, label, ids, batch_size=1000):
+        deletes = BulkWriteBuffer(doc_cls)
+        for i in range(0, len(ids), batch_size):
+            deletes.delete_many({'_id': {'$in': ids[i:i + batch_size]}})
+        deletes.flush()
+        print("Deleted %d stale %s." % (len(ids), label))
+
+    def reverse(self):
+        super(CreateContestsCandidatesResultsTransform, self).reverse()
+        if self.source is not None:
+            # Other files' results may need them
+            return
+        old = self.get_candidates()
+        print("\tDeleting %d previously created candidates" % old.count())
+        old.delete()
+        old = self.get_contests()
+        print("\tDeleting %d previously created contests" % old.count())
+        old.delete()
+
+
 class CreateDistrictResultsTransform(CreateResultsTransform):
     """
     Aggregate results that were reported by congressional districts split
@@ -457,46 +687,83 @@ class CreateDistrictResultsTransform(CreateResultsTransform):
 
     auto_reverse = True
 
+    group_fields = ['election_id', 'office', 'district', 'primary_party',
+        'full_name', 'given_name', 'additional_name', 'family_name', 'suffix',
+        'reporting_district']
+    """
+    RawResult fields that identify a candidate's results in a district.
+    The contest and candidate slugs are built from these.
+    """
+
+    first_fields = ['source', 'state', 'end_date', 'party']
+    """
+    Other RawResult fields used to build the results.  They're taken from the
+    first raw result in each group.
+    """
+
     def __init__(self):
         super(CreateDistrictResultsTransform, self).__init__()
         self._results_cache = {}
+        self._slugs = {}
+
+    def get_district_rows(self):
+        """
+        Sum the votes of the raw results for each candidate and district.
+
+        The raw results are aggregated by the database, so only one row per
+        candidate and district is returned.
+        """
+        group = {
+            '_id': dict((f, '$' + f) for f in self.group_fields),
+            'votes': {'$sum': '$votes'},
+        }
+        for field in self.first_fields:
+            group[field] = {'$first': '$' + field}
+        pipeline = [
+            {'$match': {
+                'state': 'MD',
+                'reporting_level': 'congressional_district_by_county',
+            }},
+            {'$group': group},
+        ]
+        for doc in RawResult.objects.aggregate(*pipeline):
+            # Fields that are missing from the raw results are missing from
+            # the group key
+            doc.update(doc.pop('_id'))
+            yield RawResultRow(doc, self._slugs)
 
     def __call__(self):
         results = []
 
-        for rr in self.get_rawresults():
+        for row in self.get_district_rows():
             # We only grab the meta fields here because we're aggregating results.
             #
-            # We'll grab the votes explicitely later.
-            #
             # Don't parse winner because it looks like it's reported as the
             # contest winner and not the jurisdiction winner.
             #
             # Don't parse write-in because this case is only for primaries and
             # I'm pretty sure there aren't any write-in candidates in those
             # contests.
-            fields = self._get_fields(rr, meta_fields)
-            fields['candidate'] = self.get_candidate(rr)
+            fields = self._get_fields(row, meta_fields)
+            fields['candidate'] = self.get_candidate(row)
             fields['contest'] = fields['candidate'].contest
-            party = self.get_party(rr)
+            party = self.get_party(row)
             if party:
                 fields['party'] = party.abbrev
             fields['reporting_level'] = 'congressional_district'
-            fields['jurisdiction'] = self._strip_leading_zeros(rr.reporting_district)
+            fields['jurisdiction'] = self._strip_leading_zeros(row.reporting_district)
             fields['ocd_id'] = "ocd-division/country:us/state:md/cd:%s" % (
                 ocd_type_id(fields['jurisdiction']))
 
-            # Instantiate a new result for this candidate, contest and jurisdiction,
-            # but only do it once.
+            # Instantiate a new result for this candidate, contest and
+            # jurisdiction, but only do it once.  Groups that differ only in,
+            # say, leading zeros in the district, end up in the same result.
             result, instantiated = self._get_or_instantiate_result(fields)
             if instantiated:
                 results.append(result)
 
-            # Contribute votes from this particular raw result
-            votes = result.votes if result.votes else 0
-            rr_votes = rr.votes if rr.votes else 0
-            votes += rr_votes
-            result.votes = votes
+            # Contribute the votes from this group of raw results
+            result.votes = (result.votes or 0) + row.votes
 
         Result.objects.insert(results, load_bulk=False)
 
@@ -600,6 +867,8 @@ class Create2000PrimaryCongressCountyResultsTransform(CreateResultsTransform):
 class NormalizePrecinctTransform(BaseTransform):
     name = 'normalize_precinct_names'
 
+    inputs = outputs = ['Result:md-2006-11-07-general']
+
     def get_results(self):
         return Result.objects.filter(state='MD',
             reporting_level='precinct', election_id='md-2006-11-07-general',
@@ -611,23 +880,24 @@ class NormalizePrecinctTransform(BaseTransform):
         ocd_id_bits.append(ocd_type_id("precinct:%s" % jurisdiction))
         return '/'.join(ocd_id_bits)
 
+    def update_precincts(self, normalize_precinct):
+        updates = BulkWriteBuffer(Result)
+        results = self.get_results().only('jurisdiction', 'ocd_id')
+        for result in results.as_pymongo().no_cache():
+            district, precinct = result['jurisdiction'].split('-')
+            jurisdiction = "%s-%s" % (district, normalize_precinct(precinct))
+            updates.update_one({'_id': result['_id']}, {'$set': {
+                'jurisdiction': jurisdiction,
+                'ocd_id': self.update_ocd_id(result['ocd_id'], jurisdiction),
+                'updated': datetime.now(),
+            }})
+        updates.flush()
+
     def __call__(self):
-        for result in self.get_results():
-            district, precinct = result.jurisdiction.split('-')
-            result.jurisdiction = "%s-%s" % (district,
-                    precinct.zfill(3))
-            result.ocd_id = self.update_ocd_id(result.ocd_id,
-                result.jurisdiction)
-            result.save()
+        self.update_precincts(lambda precinct: precinct.zfill(3))
 
     def reverse(self):
-        for result in self.get_results():
-            district, precinct = result.jurisdiction.split('-')
-            result.jurisdiction = "%s-%s" % (district,
-                    precinct.lstrip('0'))
-            result.ocd_id = self.update_ocd_id(result.ocd_id,
-                result.jurisdiction)
-            result.save()
+        self.update_precincts(lambda precinct: precinct.lstrip('0'))
 
 
 class RemoveBaltimoreCityComptroller(BaseTransform):
@@ -641,6 +911,10 @@ class RemoveBaltimoreCityComptroller(BaseTransform):
     """
     name = 'remove_baltimore_city_comptroller'
 
+    inputs = ['Office']
+    outputs = ['Contest:md-2004-11-02-general',
+        'Candidate:md-2004-11-02-general', 'Result:md-2004-11-02-general']
+
     def __call__(self):
         election_id = 'md-2004-11-02-general'
         office = Office.objects.get(state='MD', name='Comptroller')
@@ -665,25 +939,31 @@ class CombineUncommittedPresStateLegislativeResults(BaseTransform):
     """
     name = 'combine_uncommitted_pres_state_leg_results'
 
+    inputs = outputs = ['Result:md-2008-02-12-primary']
+
     def __call__(self):
         results = Result.objects.filter(election_id='md-2008-02-12-primary',
             reporting_level='state_legislative',
             contest_slug='president-d',
             candidate_slug='uncommitted-to-any-presidential-candidate')
-        districts = results.distinct('jurisdiction')
-        assert len(districts) == 65
-        for district in districts:
-            district_results = results.filter(jurisdiction=district)
-            assert district_results.count() == 24
-            total_votes = 0
-            # Save the first result.  We'll use this for the combined results
-            first_result = district_results[0]
-            for result in district_results:
-                total_votes += result.votes
+        district_results = {}
+        for result in results.only('votes', 'jurisdiction').as_pymongo():
+            district_results.setdefault(result['jurisdiction'], []).append(
+                result)
+        assert len(district_results) == 65
+
+        writes = BulkWriteBuffer(Result)
+        for district, combined in district_results.items():
+            assert len(combined) == 24
+            total_votes = sum(result['votes'] for result in combined)
             assert total_votes != 0
-            first_result.votes = total_votes
-            first_result.save()
-            district_results.filter(id__ne=first_result.id).delete()
+            # Keep the first result.  We'll use this for the combined results
+            first_result = combined[0]
+            writes.update_one({'_id': first_result['_id']},
+                {'$set': {'votes': total_votes, 'updated': datetime.now()}})
+            writes.delete_many({'_id': {
+                '$in': [result['_id'] for result in combined[1:]]}})
+        writes.flush()
 
 
 def add_precinct_result_note():
@@ -703,9 +983,7 @@ def add_precinct_result_note():
 #def clean_vote_counts():
     #pass
 
-registry.register('md', CreateContestsTransform)
-registry.register('md', CreateCandidatesTransform)
-registry.register('md', CreateResultsTransform)
+registry.register('md', CreateContestsCandidatesResultsTransform)
 registry.register('md', CreateDistrictResultsTransform)
 registry.register('md', Create2000PrimaryCongressCountyResultsTransform)
 registry.register('md', NormalizePrecinctTransform,
@@ -714,6 +992,7 @@ registry.register('md', RemoveBaltimoreCityComptroller,
     [validate_no_baltimore_city_comptroller])
 registry.register('md', CombineUncommittedPresStateLegislativeResults,
     [validate_uncommitted_primary_state_legislative_results])
-registry.register('md', add_precinct_result_note)
+registry.register('md', add_precinct_result_note, inputs=[],
+    outputs=['Result'])
 #registry.register('md', standardize_office_and_district)
 #registry.register('md', clean_vote_counts)
@@ -81,7 +81,7 @@ class MOPrecinctLoader(MOBaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -100,7 +100,7 @@ class MOPrecinctLoader(MOBaseLoader):
                     rr_kwargs.update(self._build_candidate_kwargs(row))
                     jurisdiction = row['precinct'].strip()
                     print(row['county'])
-                    county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+                    county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                     rr_kwargs.update({
                         'party': row['party'].strip(),
                         'jurisdiction': jurisdiction,
@@ -152,7 +152,7 @@ class MOCountyLoader(MOBaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -212,7 +212,7 @@ class MOSpecialLoader(MOBaseLoader):
             'candidate',
             'votes',
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'state'
         # Store result instances for bulk loading
         results = []
@@ -86,7 +86,7 @@ class MSPrecinctLoader(MSBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -105,7 +105,7 @@ class MSPrecinctLoader(MSBaseLoader):
                     rr_kwargs.update(self._build_contest_kwargs(row))
                     rr_kwargs.update(self._build_candidate_kwargs(row))
                     jurisdiction = row['precinct'].strip()
-                    county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+                    county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                     rr_kwargs.update({
                         'party': row['party'].strip(),
                         'jurisdiction': jurisdiction,
@@ -152,7 +152,7 @@ class MSCountyLoader(MSBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -216,7 +216,7 @@ class MSSpecialLoader(MSBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
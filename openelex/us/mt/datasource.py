@@ -58,7 +58,7 @@ class Datasource(BaseDatasource):
             results = [x for x in self._url_paths() if x['date'] == election['start_date']]
             for result in results:
                 if result['county']:
-                    ocd_id = [o['ocd_id'] for o in self._jurisdictions() if result['county'] == o['county']][0]
+                    ocd_id = self.jurisdiction_index().ocd_id('county', result['county'])
                     name = result['county']
                 else:
                     ocd_id = 'ocd-division/country:us/state:mt'
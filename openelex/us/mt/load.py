@@ -79,7 +79,7 @@ class MTPrecinctLoader(MTBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -98,7 +98,7 @@ class MTPrecinctLoader(MTBaseLoader):
                     rr_kwargs.update(self._build_contest_kwargs(row))
                     rr_kwargs.update(self._build_candidate_kwargs(row))
                     jurisdiction = row['precinct'].strip()
-                    county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+                    county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                     rr_kwargs.update({
                         'party': row['party'].strip(),
                         'jurisdiction': jurisdiction,
@@ -144,7 +144,7 @@ class MTCountyLoader(MTBaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -168,7 +168,7 @@ class MTCountyLoader(MTBaseLoader):
                         votes = int(row['votes'].strip())
                     jurisdiction = row['county'].strip()
                     print(row['county'])
-                    ocd_id = [o['ocd_id'] for o in self.datasource._jurisdictions() if row['county'].strip() == o['county']][0]
+                    ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                 rr_kwargs.update({
                     'party': row['party'].strip(),
                     'jurisdiction': jurisdiction,
@@ -1,11 +1,9 @@
 from __future__ import print_function
 from builtins import str
 from builtins import zip
-from builtins import range
 from builtins import object
 import re
 import csv
-import xlrd
 
 from openelex.base.load import BaseLoader
 from openelex.models import RawResult
@@ -45,6 +43,24 @@ class LoadResults(object):
         loader.run(mapping)
 
 
+def office_regex(offices, patterns=(), exact=False):
+    """
+    Compile a regular expression that finds any of the office names in
+    ``offices``, or any of the regular expressions in ``patterns``.
+
+    Checking every row's contest against one precompiled expression is much
+    cheaper than a separate test for each office.  If ``exact`` is True,
+    the expression only matches whole contest names when used with
+    ``match()``.
+
+    """
+    pattern = '|'.join([re.escape(o) for o in sorted(offices)] +
+        list(patterns))
+    if exact:
+        pattern = r'(?:{})\Z'.format(pattern)
+    return re.compile(pattern)
+
+
 class NCBaseLoader(BaseLoader):
     datasource = Datasource()
 
@@ -54,19 +70,6 @@ class NCBaseLoader(BaseLoader):
         'US PRESIDENT',
         'STRAIGHT PARTY',
         'US HOUSE OF REPRESENTATIVES',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 1',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 2',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 3',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 4',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 5',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 6',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 7',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 8',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 9',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 10',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 11',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 12',
-        'US HOUSE OF REPRESENTATIVES DISTRICT 13',
         'US HOUSE OF REP.',
         'US CONGRESS',
         'US CONGRESS DISTRICT',
@@ -96,6 +99,17 @@ class NCBaseLoader(BaseLoader):
         'HOUSE',
     ])
 
+    target_office_patterns = [
+        # Numbered districts, instead of listing each one in target_offices
+        r'US HOUSE OF REPRESENTATIVES DISTRICT \d+',
+    ]
+
+    # Find a target office anywhere in a contest name
+    target_office_re = office_regex(target_offices, target_office_patterns)
+    # Match contest names that are exactly a target office
+    target_office_exact_re = office_regex(target_offices,
+        target_office_patterns, exact=True)
+
     district_offices = set([
         'US HOUSE OF REPRESENTATIVES',
         'US CONGRESS',
@@ -129,8 +143,7 @@ class NCBaseLoader(BaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         return kwargs
 
 class NCTsvLoader(NCBaseLoader):
@@ -139,31 +152,34 @@ class NCTsvLoader(NCBaseLoader):
     Absentee, provisional and 'transfer' vote totals are also included, but as "precincts" so need to be handled.
     """
 
+    vote_fields = ('Total Votes', 'Election Day', 'Absentee by Mail',
+        'One Stop', 'Provisional')
+
+    # The statewide files have many more columns than this
+    columns = ('County', 'Precinct', 'Contest Name', 'Choice',
+        'Choice Party') + vote_fields
+
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
-        with self._file_handle as tsvfile:
-            tsv = [x.replace('\0', '') for x in tsvfile] # remove NULL bytes
-            reader = csv.DictReader(tsv, delimiter='\t')
-            for row in reader:
-                if self._skip_row(row):
-                    continue
-                if row['Contest Name'] == 'CAMDEN COUNTY BOARD OF COMMISSIONERS COURTHOUSE DISTRICT':
-                    continue
-#                if row['Precinct'] in ('CURBSIDE', 'PROVISIONAL', 'ABSENTEE BY MAIL', 'ONESTOP', 'TRANSFER'):
-#                    results.append(self._prep_county_result(row))
-                else:
-                    print(row)
-                    results.append(self._prep_precinct_result(row))
+        rows = self._read_rows(delimiter='\t', office_field='Contest Name',
+            keep_office=self._is_target_office, vote_fields=self.vote_fields,
+            columns=self.columns, strip_nulls=True)
+        for row in rows:
+#            if row['Precinct'] in ('CURBSIDE', 'PROVISIONAL', 'ABSENTEE BY MAIL', 'ONESTOP', 'TRANSFER'):
+#                results.append(self._prep_county_result(row))
+            results.append(self._prep_precinct_result(row))
         RawResult.objects.insert(results)
 
-    def _skip_row(self, row):
-        if any(o in row['Contest Name'] for o in self.target_offices):
+    def _is_target_office(self, office):
+        if office == 'CAMDEN COUNTY BOARD OF COMMISSIONERS COURTHOUSE DISTRICT':
             return False
-        else:
-            return True
+        return self.target_office_re.search(office) is not None
+
+    def _skip_row(self, row):
+        return not self._is_target_office(row['Contest Name'])
 
     def _build_contest_kwargs(self, row):
         if 'DISTRICT' in row['Contest Name']:
@@ -194,7 +210,7 @@ class NCTsvLoader(NCBaseLoader):
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
         precinct = str(row['Precinct']).strip()
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['County'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['County'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -210,7 +226,7 @@ class NCTsvLoader(NCBaseLoader):
         kwargs = self._base_kwargs(row)
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['County'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['County'])
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': row['County'],
@@ -228,22 +244,26 @@ class NCCsvLoader(NCBaseLoader):
     """
     Parse North Carolina election results in CSV format.
     """
+    vote_fields = ('total votes', 'Election Day', 'One Stop',
+        'Absentee by Mail', 'Absentee / One Stop', 'Provisional')
+
+    columns = ('county', 'precinct', 'contest', 'choice', 'party') + vote_fields
+
     def load(self):
-        with self._file_handle as csvfile:
-            results = []
-            reader = unicodecsv.DictReader(csvfile)
-            for row in reader:
-                # Skip non-target offices
-                if self._skip_row(row):
-                    continue
-                results.append(self._prep_precinct_result(row))
-            RawResult.objects.insert(results)
+        results = []
+        # Non-target offices are skipped as the file is read
+        rows = self._read_rows(office_field='contest',
+            keep_office=self._is_target_office, vote_fields=self.vote_fields,
+            columns=self.columns)
+        for row in rows:
+            results.append(self._prep_precinct_result(row))
+        RawResult.objects.insert(results)
+
+    def _is_target_office(self, office):
+        return self.target_office_exact_re.match(office) is not None
 
     def _skip_row(self, row):
-        if row['contest'] in self.target_offices:
-            return False
-        else:
-            return True
+        return not self._is_target_office(row['contest'])
 
     def _build_contest_kwargs(self, row):
         if 'DISTRICT' in row['contest']:
@@ -280,7 +300,7 @@ class NCCsvLoader(NCBaseLoader):
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
         precinct = str(row['precinct'])
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -294,7 +314,7 @@ class NCCsvLoader(NCBaseLoader):
 
     def _prep_county_result(self, row):
         kwargs = self._base_kwargs(row)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'] == row['CountyName']][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['CountyName'])
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': row['CountyName'],
@@ -338,7 +358,7 @@ class NCTsv2008Loader(NCBaseLoader):
             'provisional',
             'total_votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -386,7 +406,7 @@ class NCTsv2008Loader(NCBaseLoader):
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
         precinct = str(row['precinct'])
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -408,7 +428,7 @@ class NCTextLoader(NCBaseLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -427,10 +447,7 @@ class NCTextLoader(NCBaseLoader):
         RawResult.objects.insert(results)
 
     def _skip_row(self, row):
-        if any(o in row['contest_name'] for o in self.target_offices):
-            return False
-        else:
-            return True
+        return self.target_office_re.search(row['contest_name']) is None
 
     def _build_contest_kwargs(self, row):
         if 'DISTRICT' in row['contest_name']:
@@ -461,7 +478,7 @@ class NCTextLoader(NCBaseLoader):
         kwargs.update(self._build_contest_kwargs(row))
         kwargs.update(self._build_candidate_kwargs(row))
         precinct = str(row['precinct']).strip()
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -474,7 +491,7 @@ class NCTextLoader(NCBaseLoader):
 
     def _prep_county_result(self, row):
         kwargs = self._base_kwargs(row)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': row['county'],
@@ -502,7 +519,7 @@ class NCTsv20022000Loader(NCBaseLoader):
             'total_votes',
             'timestamp'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -557,7 +574,7 @@ class NCTsv20022000Loader(NCBaseLoader):
     def _prep_precinct_result(self, row):
         kwargs = self._base_kwargs(row)
         precinct = str(row['precinct']).strip()
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -570,7 +587,7 @@ class NCTsv20022000Loader(NCBaseLoader):
 
     def _prep_county_result(self, row):
         kwargs = self._base_kwargs(row)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         if row['precinct'] == 'absentee/provisional':
             votes_type = 'absentee_provisional'
         else:
@@ -600,48 +617,47 @@ class NCXlsLoader(NCBaseLoader):
             'party',
             'total_votes',
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
 
-        xlsfile = xlrd.open_workbook(self._xls_file_path)
-        if 'house' in self.source or 'state_senate' in self.source:
-            sheets = xlsfile.sheets()
-        elif 'republican__primary__lieutenant_governor' in self.source:
-            sheets = [xlsfile.sheets()[5]]
-        else:
-            sheets = [xlsfile.sheets()[0]]
-
-        for sheet in sheets:
-            office, district = self._detect_office(sheet)
-            if sheet.name == '83rd NC House':
-                cands = [c for c in sheet.row_values(1)[2:] if c != '']
-                parties = [x.replace('(','').replace(')','') for x in sheet.row_values(2)[2:] if x != '']
-                start_row = 3
-            elif sheet.name == '97th NC House':
-                cands = [c for c in sheet.row_values(2)[2:] if c != '']
-                parties = [x.replace('(','').replace(')','') for x in sheet.row_values(3)[2:] if x != '']
-                start_row = 4
-            elif sheet.row_values(0)[1].upper() == 'PRECINCT' or sheet.row_values(0)[2] == 'John Cosgrove' or sheet.row_values(0)[1].upper() == 'PRECINCTS' or sheet.row_values(0)[2] == 'Paul Luebke' or sheet.row_values(0)[1] == 'Precinct Name':
-                cands = [c for c in sheet.row_values(0)[2:] if c != '']
-                parties = [x.replace('(','').replace(')','') for x in sheet.row_values(1)[2:] if x != '']
-                start_row = 2
+        with self._open_workbook() as xlsfile:
+            if 'house' in self.source or 'state_senate' in self.source:
+                sheets = xlsfile.sheets()
+            elif 'republican__primary__lieutenant_governor' in self.source:
+                sheets = [xlsfile.sheets()[5]]
             else:
-                cands = [c for c in sheet.row_values(2)[2:] if c != '']
-                parties = [x.replace('(','').replace(')','') for x in sheet.row_values(3)[2:] if x != '']
-                start_row = 2
-            candidates = list(zip(cands, parties))
-            for i in range(start_row, sheet.nrows):
-                row = [r for r in sheet.row_values(i)]
-                if self._skip_row(row):
-                    continue
-                for idx, cand in enumerate(candidates):
-                    if row[1] == '':
-                        county = row[0]
-                        results.append(self._prep_county_result(row, office, district, cand, county, row[idx+2]))
-                    else:
-                        results.append(self._prep_precinct_result(row, office, district, cand, county, row[idx+2]))
+                sheets = [xlsfile.sheets()[0]]
+
+            for sheet in sheets:
+                office, district = self._detect_office(sheet)
+                if sheet.name == '83rd NC House':
+                    cands = [c for c in sheet.row_values(1)[2:] if c != '']
+                    parties = [x.replace('(','').replace(')','') for x in sheet.row_values(2)[2:] if x != '']
+                    start_row = 3
+                elif sheet.name == '97th NC House':
+                    cands = [c for c in sheet.row_values(2)[2:] if c != '']
+                    parties = [x.replace('(','').replace(')','') for x in sheet.row_values(3)[2:] if x != '']
+                    start_row = 4
+                elif sheet.row_values(0)[1].upper() == 'PRECINCT' or sheet.row_values(0)[2] == 'John Cosgrove' or sheet.row_values(0)[1].upper() == 'PRECINCTS' or sheet.row_values(0)[2] == 'Paul Luebke' or sheet.row_values(0)[1] == 'Precinct Name':
+                    cands = [c for c in sheet.row_values(0)[2:] if c != '']
+                    parties = [x.replace('(','').replace(')','') for x in sheet.row_values(1)[2:] if x != '']
+                    start_row = 2
+                else:
+                    cands = [c for c in sheet.row_values(2)[2:] if c != '']
+                    parties = [x.replace('(','').replace(')','') for x in sheet.row_values(3)[2:] if x != '']
+                    start_row = 2
+                candidates = list(zip(cands, parties))
+                for row in sheet.rows(start=start_row):
+                    if self._skip_row(row):
+                        continue
+                    for idx, cand in enumerate(candidates):
+                        if row[1] == '':
+                            county = row[0]
+                            results.append(self._prep_county_result(row, office, district, cand, county, row[idx+2]))
+                        else:
+                            results.append(self._prep_precinct_result(row, office, district, cand, county, row[idx+2]))
         RawResult.objects.insert(results)
 
     def _skip_row(self, row):
@@ -706,7 +722,7 @@ class NCXlsLoader(NCBaseLoader):
     def _prep_precinct_result(self, row, office, district, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
         precinct = str(row[1]).strip()
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -719,7 +735,7 @@ class NCXlsLoader(NCBaseLoader):
 
     def _prep_county_result(self, row, office, district, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': county,
@@ -731,8 +747,7 @@ class NCXlsLoader(NCBaseLoader):
 
     def _base_kwargs(self, row, office, district, candidate):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(office, district, candidate[1])
         candidate_kwargs = self._build_candidate_kwargs(candidate)
         kwargs.update(contest_kwargs)
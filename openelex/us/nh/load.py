@@ -1,8 +1,6 @@
 from builtins import str
-from builtins import range
 from builtins import object
 import re
-import xlrd
 from fuzzywuzzy import process
 
 from openelex.base.load import BaseLoader
@@ -51,8 +49,7 @@ class NHBaseLoader(BaseLoader):
 
     def _base_kwargs(self, row, office, district, candidate):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(office, district)
         candidate_kwargs = self._build_candidate_kwargs(candidate)
         kwargs.update(contest_kwargs)
@@ -105,26 +102,25 @@ class NHDistrictLoader(NHBaseLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
-        xlsfile = xlrd.open_workbook(self._xls_file_path)
-        sheet = xlsfile.sheets()[0]
-        # get office, district, primary_party from url_path?
-        for i in range(2, sheet.nrows):
-            row = [r for r in sheet.row_values(i)]
-            if self._skip_row(row):
-                continue
-            if " County" in str(row[0]):
-                county = row[0].split(' County')[0]
-                precincts = [c for c in row[1:] if c.strip() != '']
-            elif office in str(row[1]):
-                continue
-            else:
-                candidate = row[0]
-                for idx, precinct in enumerate(precincts):
-                    results.append(self._prep_precinct_result(row, office, district, primary_party, precinct, candidate, county, row[idx+1]))
+        with self._open_workbook() as workbook:
+            sheet = workbook.sheet_by_index(0)
+            # get office, district, primary_party from url_path?
+            for row in sheet.rows(start=2):
+                if self._skip_row(row):
+                    continue
+                if " County" in str(row[0]):
+                    county = row[0].split(' County')[0]
+                    precincts = [c for c in row[1:] if c.strip() != '']
+                elif office in str(row[1]):
+                    continue
+                else:
+                    candidate = row[0]
+                    for idx, precinct in enumerate(precincts):
+                        results.append(self._prep_precinct_result(row, office, district, primary_party, precinct, candidate, county, row[idx+1]))
         RawResult.objects.insert(results)
 
 class NHSenateCountyLoader(NHBaseLoader):
@@ -134,27 +130,26 @@ class NHSenateCountyLoader(NHBaseLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
-        xlsfile = xlrd.open_workbook(self._xls_file_path)
-        sheet = xlsfile.sheets()[0]
-        office, primary_party = self._get_office_and_primary_party(sheet.row_values(1))
-        district = None
-        for i in range(2, sheet.nrows):
-            row = [r for r in sheet.row_values(i)]
-            if self._skip_row(row):
-                continue
-            if " County" in str(row[0]):
-                county = row[0].split(' County')[0]
-                precincts = [c for c in row[1:] if c.strip() != '']
-            elif office in str(row[1]):
-                continue
-            else:
-                candidate = row[0]
-                for idx, precinct in enumerate(precincts):
-                    results.append(self._prep_precinct_result(row, office, district, primary_party, precinct, candidate, county, row[idx+1]))
+        with self._open_workbook() as workbook:
+            sheet = workbook.sheet_by_index(0)
+            office, primary_party = self._get_office_and_primary_party(sheet.row_values(1))
+            district = None
+            for row in sheet.rows(start=2):
+                if self._skip_row(row):
+                    continue
+                if " County" in str(row[0]):
+                    county = row[0].split(' County')[0]
+                    precincts = [c for c in row[1:] if c.strip() != '']
+                elif office in str(row[1]):
+                    continue
+                else:
+                    candidate = row[0]
+                    for idx, precinct in enumerate(precincts):
+                        results.append(self._prep_precinct_result(row, office, district, primary_party, precinct, candidate, county, row[idx+1]))
         RawResult.objects.insert(results)
 
     def _skip_row(self, row):
@@ -189,7 +184,7 @@ class NHSenateCountyLoader(NHBaseLoader):
 
     def _prep_precinct_result(self, row, office, district, primary_party, precinct, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         if precinct.upper() == 'TOTALS':
             jurisdiction = None
             ocd_id = county_ocd_id
@@ -212,7 +207,7 @@ class NHSenateCountyLoader(NHBaseLoader):
 
     def _prep_county_result(self, row, office, district, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': county,
@@ -230,23 +225,22 @@ class NHXlsCountyLoader(NHBaseLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
-        xlsfile = xlrd.open_workbook(self._xls_file_path)
-        sheet = xlsfile.sheets()[0]
-        office, primary_party = self._get_office_and_primary_party(sheet.row_values(1))
-        district = None
-        county = sheet.row_values(3)[0].split(' County')[0]
-        candidates = sheet.row_values(3)[1:]
-        start_row = 4
-        for i in range(start_row, sheet.nrows):
-            row = [r for r in sheet.row_values(i)]
-            if self._skip_row(row):
-                continue
-            for idx, cand in enumerate(candidates):
-                results.append(self._prep_precinct_result(row, office, district, primary_party, cand, county, row[idx+1]))
+        with self._open_workbook() as workbook:
+            sheet = workbook.sheet_by_index(0)
+            office, primary_party = self._get_office_and_primary_party(sheet.row_values(1))
+            district = None
+            county = sheet.row_values(3)[0].split(' County')[0]
+            candidates = sheet.row_values(3)[1:]
+            start_row = 4
+            for row in sheet.rows(start=start_row):
+                if self._skip_row(row):
+                    continue
+                for idx, cand in enumerate(candidates):
+                    results.append(self._prep_precinct_result(row, office, district, primary_party, cand, county, row[idx+1]))
         RawResult.objects.insert(results)
 
     def _skip_row(self, row):
@@ -278,7 +272,7 @@ class NHXlsCountyLoader(NHBaseLoader):
 
     def _prep_precinct_result(self, row, office, district, primary_party, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         precinct = str(row[0]).strip()
         if precinct.upper() == 'TOTALS':
             jurisdiction = None
@@ -302,7 +296,7 @@ class NHXlsCountyLoader(NHBaseLoader):
 
     def _prep_county_result(self, row, office, district, candidate, county, votes):
         kwargs = self._base_kwargs(row, office, district, candidate)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': county,
@@ -74,7 +74,7 @@ class Datasource(BaseDatasource):
                         generated_filename = self._generate_statewide_filename(result)
                         pre_processed_url = None
                     else:
-                        jurisdiction = [c for c in self._jurisdictions() if c['jurisdiction'] == result['jurisdiction']][0]['ocd_id']
+                        jurisdiction = self.jurisdiction_index().ocd_id('jurisdiction', result['jurisdiction'])
                         generated_filename = result['path']
                         pre_processed_url = build_raw_github_url(self.state, str(year), result['path'])
                     meta.append({
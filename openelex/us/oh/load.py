@@ -1,5 +1,4 @@
 from builtins import zip
-from builtins import range
 from builtins import object
 import re
 import csv
@@ -78,42 +77,41 @@ class OH2014CountyLoader(OHBaseLoader):
     """
 
     def load(self):
-        workbook = xlrd.open_workbook(self._xls_file_path)
-        results = []
-#        workbook = xlrd.open_workbook(xlsfile)
-        worksheet = workbook.sheet_by_name('Master')
-        raw_offices = [c.value.strip() for c in worksheet.row(0)[5:]]
-        last_office_column = self._get_last_office_column(raw_offices)
-        offices = self._get_offices(raw_offices, last_office_column)
-        candidates = [c.value for c in worksheet.row(1)[5:last_office_column+7]]
-        combined = list(zip(offices, candidates))
-        for i in range(4, worksheet.nrows):
-            row = [c.value for c in worksheet.row(i)[:last_office_column+5]]
-            county = row[0]
-            county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == county.upper()][0]['ocd_id']
-            results = row[5:last_office_column+5]
-            for result in zip(combined, results):
-                if result[1] == 0.0:
-                    continue
-                office, candidate = result[0]
-                cand, party = candidate.split(' (')
-                party = party.replace(')','')
-                votes = result[1]
-                kwargs = self._base_kwargs(row)
-                slug = slugify(cand, substitute='-')
-                kwargs.update(
-                    {'office': office,
-                    'district': district,
-                    'full_name': cand,
-                    'slug': slug,
-                    'party': party,
-                    'votes': votes,
-                    'reporting_level': 'county',
-                    'jurisdiction': county,
-                    'ocd_id': county_ocd_id,
-                })
-                results.append(kwargs)
-            RawResult.objects.insert(results)
+        with self._open_workbook() as workbook:
+            results = []
+            worksheet = workbook.sheet_by_name('Master')
+            raw_offices = [c.strip() for c in worksheet.row_values(0)[5:]]
+            last_office_column = self._get_last_office_column(raw_offices)
+            offices = self._get_offices(raw_offices, last_office_column)
+            candidates = worksheet.row_values(1)[5:last_office_column+7]
+            combined = list(zip(offices, candidates))
+            for row in worksheet.rows(start=4):
+                row = row[:last_office_column+5]
+                county = row[0]
+                county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', county)
+                results = row[5:last_office_column+5]
+                for result in zip(combined, results):
+                    if result[1] == 0.0:
+                        continue
+                    office, candidate = result[0]
+                    cand, party = candidate.split(' (')
+                    party = party.replace(')','')
+                    votes = result[1]
+                    kwargs = self._base_kwargs(row)
+                    slug = slugify(cand, substitute='-')
+                    kwargs.update(
+                        {'office': office,
+                        'district': district,
+                        'full_name': cand,
+                        'slug': slug,
+                        'party': party,
+                        'votes': votes,
+                        'reporting_level': 'county',
+                        'jurisdiction': county,
+                        'ocd_id': county_ocd_id,
+                    })
+                    results.append(kwargs)
+                RawResult.objects.insert(results)
 
     def _get_offices(self, raw_offices, last_office_column):
         new_offices = []
@@ -133,8 +131,7 @@ class OH2014CountyLoader(OHBaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         return kwargs
 
 
@@ -217,8 +214,7 @@ class OH2010PrecinctLoader(OHBaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(row, kwargs['primary_type'])
         candidate_kwargs = self._build_candidate_kwargs(row)
         kwargs.update(contest_kwargs)
@@ -228,9 +224,9 @@ class OH2010PrecinctLoader(OHBaseLoader):
     def _get_state_ocd_id(self):
         # It looks like the OCD ID in this years mappings is
         # ocd-division/country:us/state:oh/precinct:all
-        # We need to get rid of the "precinct:all" part to
+        # Use the state's OCD ID, without the "precinct:all" part, to
         # build valid OCD IDs for the individual jurisdictions.
-        return '/'.join(self.mapping['ocd_id'].split('/')[:-1])
+        return self.context.state_ocd_id
 
     def _prep_state_leg_results(self, row):
         kwargs = self._base_kwargs(row)
@@ -70,7 +70,7 @@ class ORPrecinctLoader(ORBaseLoader):
     """
 
     def load(self):
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -88,7 +88,7 @@ class ORPrecinctLoader(ORBaseLoader):
                 rr_kwargs.update(self._build_contest_kwargs(row))
                 rr_kwargs.update(self._build_candidate_kwargs(row))
                 jurisdiction = row['precinct'].strip()
-                county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].strip().upper() == row['county'].strip().upper()][0]['ocd_id']
+                county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                 rr_kwargs.update({
                     'party': row['party'].strip(),
                     'jurisdiction': jurisdiction,
@@ -133,7 +133,7 @@ class ORLoader(ORBaseLoader):
             'candidate',
             'votes'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -4,7 +4,6 @@ import unicodecsv
 
 from openelex.base.load import BaseLoader
 from openelex.models import RawResult
-from openelex.lib.insertbuffer import BulkInsertBuffer
 from openelex.lib.text import ocd_type_id
 from .datasource import Datasource
 
@@ -84,16 +83,16 @@ class CSVSpecialLoader(PABaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         # We use a BulkInsertBuffer because the load process was running out of
         # memory on prod-1
-        results = BulkInsertBuffer(RawResult)
+        results = self._insert_buffer()
 
         with self._file_handle as csvfile:
             reader = unicodecsv.DictReader(csvfile, fieldnames = headers)
-            for row in reader:
+            for row in self._resume_rows(reader):
                 if self._skip_row(row):
                     continue
                 if row['county'].strip() == '':
@@ -194,17 +193,17 @@ class CSVLoader(PABaseLoader):
             'previous_state_house_district'
         ]
 
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
-        results = BulkInsertBuffer(RawResult)
+        results = self._insert_buffer()
 
         with self._file_handle as csvfile:
             if '2014' in self.election_id:
                 reader = unicodecsv.DictReader((line.replace('\0','') for line in csvfile), fieldnames=headers)
             else:
                 reader = unicodecsv.DictReader(csvfile, fieldnames=headers)
-            for row in reader:
+            for row in self._resume_rows(reader):
                 if self._skip_row(row):
                     continue
                 rr_kwargs = self._common_kwargs.copy()
@@ -212,8 +211,8 @@ class CSVLoader(PABaseLoader):
                     rr_kwargs['primary_party'] = row['cand_party_code'].strip()
                 rr_kwargs.update(self._build_contest_kwargs(row))
                 rr_kwargs.update(self._build_candidate_kwargs(row))
-                county = [c for c in self.datasource._jurisdictions() if c['state_id'] == str(row['county_code'])][0]['name']
-                county_ocd_id = [c for c in self.datasource._jurisdictions() if c['state_id'] == str(row['county_code'])][0]['ocd_id']
+                county = self.datasource.jurisdiction_index().get('state_id', str(row['county_code']))['name']
+                county_ocd_id = self.datasource.jurisdiction_index().ocd_id('state_id', str(row['county_code']))
                 rr_kwargs.update({
                     'party': row['cand_party_code'].strip(),
                     'jurisdiction': str(row['precinct_code']),
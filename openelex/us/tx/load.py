@@ -94,7 +94,7 @@ class TXPrecinctLoader(TXBaseLoader):
             'votes',
             'pct'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -109,7 +109,7 @@ class TXPrecinctLoader(TXBaseLoader):
                 rr_kwargs.update(self._build_contest_kwargs(row))
                 rr_kwargs.update(self._build_candidate_kwargs(row))
                 jurisdiction = row['precinct'].strip()
-                county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].upper()][0]['ocd_id']
+                county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
                 rr_kwargs.update({
                     'jurisdiction': jurisdiction,
                     'parent_jurisdiction': row['county'],
@@ -150,7 +150,7 @@ class TXCountyLoader(TXBaseLoader):
             'votes',
             'pct'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -205,7 +205,7 @@ class TXLoader(TXBaseLoader):
             'votes',
             'pct'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
@@ -126,7 +126,7 @@ class CSVLoader(VABaseLoader):
             'ElectionName'
         ]
 
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = BulkInsertBuffer(RawResult)
@@ -143,7 +143,7 @@ class CSVLoader(VABaseLoader):
                 rr_kwargs.update(self._build_candidate_kwargs(row))
                 rr_kwargs.update(self._build_write_in_kwargs(row))
                 rr_kwargs.update(self._build_total_votes(row))
-                parent_jurisdiction = [c for c in self.datasource._jurisdictions() if int(c['fips']) == int(row['LocalityCode'])][0]
+                parent_jurisdiction = self.datasource.jurisdiction_index().by_fips(row['LocalityCode'])
                 if row['PrecinctUid'].strip() == '':
                     ocd_id = parent_jurisdiction['ocd_id']
                 else:
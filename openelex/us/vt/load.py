@@ -36,7 +36,7 @@ class VTBaseLoader(BaseLoader):
     def load(self):
         print((str(datetime.now()), "load begin"))
         results = []
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
 
         self._common_kwargs['reporting_level'] = 'precinct' if self.mapping['isPrecinct'] else ''
         with self._file_handle as csvfile:
@@ -47,7 +47,7 @@ class VTBaseLoader(BaseLoader):
                 print(("Error: Header not valid: ", candListRow))
                 return []
             partyAffil = readerData[1]
-            kwargs = self._build_common_election_kwargs()
+            kwargs = self.context.election_kwargs()
             contest_kwargs = self._build_contest_kwargs(kwargs['primary_type'])
             for row in readerData[2:]:
                 if self._skip_row(row):
@@ -4,9 +4,9 @@ from datetime import datetime
 import logging
 import time
 
-from nameparser import HumanName
-
-from openelex.base.transform import Transform
+from openelex.base.namecache import parse_name
+from openelex.base.transform import (DistinctRawResultsTransform,
+    ReferenceResolver, Transform)
 from openelex.models import Candidate, Contest, Office, Party, RawResult, Result
 from openelex.lib.text import ocd_type_id
 from openelex.lib.insertbuffer import BulkInsertBuffer
@@ -34,7 +34,14 @@ class BaseTransform(Transform):
     """
     Base class that encapsulates shared functionality for other Vermont
     transforms.
+
+    Transforms can be limited to a data file or election with
+    ``set_scope()``.  Contests and candidates are recreated, so a data file
+    scope is widened to the elections the file has results for.
     """
+
+    supports_scope = True
+
     district_offices = [
         "State Senate",
         "House of Representatives",
@@ -79,10 +86,25 @@ class BaseTransform(Transform):
         self._office_cache = {}
         self._party_cache = {}
         self._contest_cache = {}
+        self._resolver = None
+
+    @property
+    def resolver(self):
+        """``ReferenceResolver`` for looking up related records"""
+        if self._resolver is None:
+            self._resolver = ReferenceResolver('VT')
+        return self._resolver
+
+    def match_query(self):
+        """Returns the ``$match`` query for the raw results in scope"""
+        query = self.scope_query(by_election=True)
+        query['state'] = 'VT'
+        return query
 
     def get_rawresults(self):
         # Use a non-caching queryset because otherwise we run out of memory
-        return RawResult.objects.filter(state='VT').no_cache()
+        return RawResult.objects.filter(state='VT',
+            __raw__=self.scope_query(by_election=True)).no_cache()
 
     def get_contest_fields(self, raw_resultDict):
         # Resolve Office and Party related objects
@@ -129,7 +151,7 @@ class BaseTransform(Transform):
             fields = self.get_contest_fields(raw_resultDict)
             fields.pop('source')
             try:
-                contest = Contest.objects.get(**fields)
+                contest = self.resolver.contest(fields)
             except Exception:
                 print(fields)
                 raise
@@ -156,7 +178,7 @@ class BaseTransform(Transform):
         except KeyError:
             try:
                 print (office_query)
-                office = Office.objects.get(**office_query)
+                office = self.resolver.office(**office_query)
                 # TODO: Remove this once I'm sure this always works. It should.
                 assert key == office.key
                 self._office_cache[key] = office
@@ -223,7 +245,7 @@ class BaseTransform(Transform):
         except KeyError:
             try:
                 print(('getting party for ', party, clean_abbrev))
-                party = Party.objects.get(abbrev=clean_abbrev)
+                party = self.resolver.party(clean_abbrev)
                 self._party_cache[clean_abbrev] = party
                 return party
             except Party.DoesNotExist:
@@ -249,107 +271,69 @@ class BaseTransform(Transform):
         if fields['full_name'] == "Write-Ins":
             return fields
 
-        name = HumanName(raw_resultDict['full_name'])
+        name = parse_name(raw_resultDict['full_name'])
         fields['given_name'] = name.first
         fields['family_name'] = name.last
         fields['additional_name'] = name.middle
         fields['suffix'] = name.suffix
         return fields
 
-    def _generateAggregateDict(self, keyFields):
-        return {"$concat" : [{ "$ifNull": [ "$"+k, "" ] } for k in keyFields]},
-
 
 def logResult(_prefix, _d):
     logging.info("%s: %s", _prefix, str(_d))
 
 
-class CreateContestsTransform(BaseTransform):
+class CreateContestsTransform(BaseTransform, DistinctRawResultsTransform):
     name = 'create_unique_contests'
     auto_reverse = True
 
-    def __call__(self):
-        print((str(datetime.now()), "CreateContestsTransform begin"))
-        contests = []
-
-        contestElem = {c: 1 for c in contest_fields}
-        contestElem.update({
-            "contestKey":
-                self._generateAggregateDict(contestKeyFields),
-            "rr" : "$$ROOT"
-        })
-        contestElemGroups = {c: {"$first": "$"+c} for c in contest_fields}
-        contestElemGroups['_id'] = "$contestKey"
-        contestElemGroups['rr'] = {"$first" : "$rr"}
-        pipeline = [
-            {"$match": {"state":'VT'} },
-            {"$project": contestElem },
-            {"$group"  : contestElemGroups }
-            ]
+    doc_cls = Contest
+    key_fields = contestKeyFields
+    # full_name is needed to clean the "Vermont Localist" party
+    row_fields = contest_fields + ['full_name']
 
-        aggregatedResults = RawResult.objects.aggregate(*pipeline)
-        for rr in aggregatedResults:
-            logResult("creating contest: ", rr)
-            fields = self.get_contest_fields(rr['rr'])
-            fields['updated'] = fields['created'] = datetime.now()
-            contest = Contest(**fields)
-            contests.append(contest)
+    def clean_key(self, row):
+        # Missing and empty values are the same
+        return tuple(row.get(k) or "" for k in self.key_fields)
 
-        if len(contests) > 0:
-            Contest.objects.insert(contests, load_bulk=False)
-        print((str(datetime.now()), "Created %d contests." % len(contests)))
+    def make_record(self, row):
+        logResult("creating contest: ", row)
+        fields = self.get_contest_fields(row)
+        fields['updated'] = fields['created'] = datetime.now()
+        return Contest(**fields)
 
     def reverse(self):
-        old = Contest.objects.filter(state='VT')
+        old = Contest.objects.filter(state='VT',
+            __raw__=self.scope_query(by_election=True))
         print("\tDeleting %d previously created contests" % old.count())
         old.delete()
 
 
 
 
-class CreateCandidates(BaseTransform):
+class CreateCandidates(BaseTransform, DistinctRawResultsTransform):
     name = 'create_candidates'
     auto_reverse = True
 
-    def __call__(self):
-        print((str(datetime.now()), "CreateCandidates begin"))
-        candidates = []
-
-        candidateElem = {c: 1 for c in candidate_fields}
-        candidateElem.update({
-            "candidateKey":
-                self._generateAggregateDict(candidateKeyFields),
-            "rr" : "$$ROOT"
-        })
-        candidateElemGroups = {c: {"$first": "$"+c} for c in candidate_fields}
-        candidateElemGroups['_id'] = "$candidateKey"
-        candidateElemGroups['rr'] = {"$first" : "$rr"}
-        pipeline = [
-            {"$match": {"state":'VT'} },
-            {"$project": candidateElem },
-            {"$group"  : candidateElemGroups }
-            ]
-
-        print(("pipeline", pipeline))
-        aggregatedResults = RawResult.objects.aggregate(*pipeline)
-
-        for rr in aggregatedResults:
-            logResult("creating candidate: ", rr)
-            fields = self.get_candidate_fields(rr['rr'])
-            fields['contest'] = self.get_contest(rr['rr'])
-            if fields['full_name'] == 'Write-Ins':
-                fields['flags'] = ['aggregate',]
-
-            candidate = Candidate(**fields)
-            candidates.append(candidate)
+    doc_cls = Candidate
+    key_fields = candidateKeyFields
+    row_fields = contest_fields + candidate_fields
 
-        if len(candidates) > 0:
-            Candidate.objects.insert(candidates, load_bulk=False)
-        print((str(datetime.now()), "Created %d candidates." % len(candidates)))
+    def clean_key(self, row):
+        # Missing and empty values are the same
+        return tuple(row.get(k) or "" for k in self.key_fields)
 
+    def make_record(self, row):
+        logResult("creating candidate: ", row)
+        fields = self.get_candidate_fields(row)
+        fields['contest'] = self.get_contest(row)
+        if fields['full_name'] == 'Write-Ins':
+            fields['flags'] = ['aggregate',]
+        return Candidate(**fields)
 
     def reverse(self):
-        old = Candidate.objects.filter(state='VT')
+        old = Candidate.objects.filter(state='VT',
+            __raw__=self.scope_query(by_election=True))
         print("\tDeleting %d previously created candidates" % old.count())
         old.delete()
 
@@ -370,7 +354,7 @@ class CreateResultsTransform(BaseTransform):
         print((str(datetime.now()), "CreateResultsTransform begin"))
         results = self._create_results_collection()
 
-        pipeline = [{"$match": {"state":'VT'} }]
+        pipeline = [{"$match": self.match_query()}]
 
         aggregatedResults = RawResult.objects.aggregate(*pipeline)
 
@@ -464,7 +448,7 @@ class CreateResultsTransform(BaseTransform):
             del fields['source']
             try:
                 print(fields)
-                candidate = Candidate.objects.get(**fields)
+                candidate = self.resolver.candidate(fields)
             except Candidate.DoesNotExist:
                 print(fields)
                 raise
@@ -2,12 +2,19 @@ from builtins import map
 from builtins import str
 from builtins import range
 from builtins import object
+import csv
 import logging
 import os
 import re
 import unicodecsv
 import xlrd
 
+try:
+    from functools import lru_cache
+except ImportError:
+    # Python 2
+    from backports.functools_lru_cache import lru_cache
+
 from pymongo import errors
 
 """
@@ -142,15 +149,13 @@ class LoadResults(object):
         elif os.path.splitext(generated_filename)[-1].lower() == '.txt':
 
             """
-            We run into issues where King County provides > 1 million line
-            .txt files that break my machine's memory. We definitely need to
-            refactor, but for the moment we'll pass over said files.
+            King County provides > 1 million line .txt files that are too
+            big to hold in memory, so they get a loader that streams the
+            file and inserts results in batches.
 
             """
 
-            logger.info(
-                'Cannot do anything with {0}'.format(generated_filename))
-            loader = SkipLoader()
+            loader = WALoaderPrecinctsText()
 
         elif 'precinct' in generated_filename:
             loader = WALoaderPrecincts()
@@ -280,199 +285,266 @@ class WABaseLoader(BaseLoader):
 """
 New methods to normalize headers should follow this structure:
 
-    def *_(header):
+    # Some sort of examples of what words the regex tests for
+    # Example 1
+    # Example 2
+    # etc
+    FIELD_REGEX = re.compile(regex, flags)
 
+    def normalize_*(header):
+        return first_match(FIELD_REGEX, header)
 
-        # Some sort of examples of what words the regex tests for
-        # Example 1
-        # Example 2
-        # etc
+The patterns are compiled once, when this module is imported, rather than
+every time a normalize_* function is called. If the new field is needed
+for every row, add it to `HeaderColumns.fields` too, so that it's resolved
+once per file.
 
-        regex = re.compile(regex, flags)
+The `header` arg will be (or at least currently is) a list of all the
+matches from testing the .csv file's header field.
 
-        return [
-            m.group(0) for l in header for m in [
-                regex.search(l)] if m][0]
+"""
 
-        # OR
+# party = true
+# party_code = true
+# party code = true
+PARTY_REGEX = re.compile(
+    r'.*(\bparty\b|party.*code|candidate(_|\s+)party(_|\s)id).*',
+    re.IGNORECASE)
+
+# candidate = true
+# candidate_name = true
+# candidate_id = false
+# candidate_full_name = true
+CANDIDATE_REGEX = re.compile(
+    r'.*(ballot\sname|candidate.*(name|title)|candidate\b).*',
+    re.IGNORECASE)
+
+# contest = true
+# race = true
+# contest_name = true
+# contest_id = false
+CONTEST_REGEX = re.compile(
+    r'.*(officeposition|\bcontest\b|race\b|race(_|\s)(title|name)|(contest.*(title|name))).*',
+    re.IGNORECASE)
+
+# precinct = true
+# precinct_name = true
+# precinct name = true
+PRECINCT_REGEX = re.compile(r'.*(precinct|precinct.*name).*', re.IGNORECASE)
+
+# number of votes for = true
+# votes = true
+# count = true
+# total number of votes = false
+VOTES_REGEX = re.compile(
+    r'.*(.*vote.*for|\bvote|\bcount\b|total_votes|total.*votes).*',
+    re.IGNORECASE)
+
+# Legislative or congressional district columns
+DISTRICT_REGEX = re.compile(r'((leg|con).*dis.*)', re.IGNORECASE)
+LEGISLATIVE_DISTRICT_REGEX = re.compile(r'leg.*dis.*', re.IGNORECASE)
+CONGRESSIONAL_DISTRICT_REGEX = re.compile(r'con.*dis.*', re.IGNORECASE)
+
+
+def first_match(regex, header):
+    """
+    Return the first column name in `header` that matches `regex`.
 
-        return filter(lambda x: regex.search(x), header)[0]
+    Raises IndexError if no column matches.
 
-The filter(lambda...) is equivalent to the list comprehension, but is
-more readable. I've chosen to go with the lambda function because of
-readability, even though the list comprehension is much quicker.
+    """
 
-See: https://gist.github.com/EricLagerg/152e402e45088266e189
+    return [x for x in header if regex.search(x)][0]
 
-    * For 1 iteration:
 
-      lambda: 0.000517129898071
-      list  : 0.000169992446899 <
+def normalize_party(header):
+    return first_match(PARTY_REGEX, header)
 
-    * For 10:
 
-      lambda: 0.00197100639343
-      list  : 0.00181102752686 <
+def normalize_candidate(header):
+    return first_match(CANDIDATE_REGEX, header)
 
-    * For 100:
 
-      lambda: 0.0169317722321
-      list  : 0.0162620544434 <
+def normalize_contest(header):
+    return first_match(CONTEST_REGEX, header)
 
-    * For 1,000:
 
-      lambda: 0.15958404541 <
-      list  : 0.161957025528
+def normalize_precinct(header):
+    return first_match(PRECINCT_REGEX, header)
 
-The `header` arg will be (or at least currently is) a list of all the
-matches from testing the .csv file's header field.
 
-"""
+def normalize_votes(header):
+    return first_match(VOTES_REGEX, header)
 
 
-def normalize_party(header):
+def normalize_index(header, method):
     """
-    Regex examples:
-
-    party = true
-    party_code = true
-    party code = true
+    Equivalent to:
 
+    self.votes_index = self.header.index(
+        ''.join(votes(self.header)))
     """
 
-    regex = re.compile(
-        r'.*(\bparty\b|party.*code|candidate(_|\s+)party(_|\s)id).*',
-        re.IGNORECASE)
+    return header.index(''.join(method(header)))
 
-    """
-    `return filter(lambda x: regex.search(x), header)[0]`
-    does the same as the below list comprehension
 
+def normalize_district(header, office, row):
     """
+    Example of what we had before:
 
-    return [x for x in header if regex.search(x)][0]
-
+    'district': '{0} {1}'.format(
+        self.district_offices[normalize_races(sh_val)],
+        "".join(map(str, [int(s) for s in sh_val.strip() if s.isdigit()][:2])
+        ))})
 
-def normalize_candidate(header):
-    """
-    Regex examples:
+    normalize_district now provides a more standardized and clean API than
+    was the case with the mess before.
 
-    candidate = true
-    candidate_name = true
-    candidate_id = false
-    candidate_full_name = true
+    This resolves the district columns of `header` on every call. Loaders
+    should build a `HeaderColumns` once per file and use its `district()`
+    method instead.
 
     """
 
-    regex = re.compile(
-        r'.*(ballot\sname|candidate.*(name|title)|candidate\b).*',
-        re.IGNORECASE)
-
-    return [x for x in header if regex.search(x)][0]
+    return HeaderColumns(header).district(office, row)
 
 
-def normalize_contest(header):
+@lru_cache(maxsize=1024)
+def district_from_office(office):
     """
-    Regex examples:
+    Pull a district number out of an office name, e.g. '37' out of
+    'Legislative District 37 - State Senator'.
 
-    contest = true
-    race = true
-    contest_name = true
-    contest_id = false
+    Returns None if the office name doesn't contain a number.
 
     """
 
-    regex = re.compile(
-        r'.*(officeposition|\bcontest\b|race\b|race(_|\s)(title|name)|(contest.*(title|name))).*',
-        re.IGNORECASE)
+    dist_str = "".join(
+        map(str, [int(s) for s in office.strip() if s.isdigit()][:2]))
 
-    return [x for x in header if regex.search(x)][0]
+    if dist_str == "":
+        return None
+    if int(dist_str) > 49:
+        dist_str = dist_str[:1]
+    return dist_str
 
 
-def normalize_precinct(header):
-    """
-    Regex examples:
-
-    precinct = true
-    precinct_name = true
-    precinct name = true
+class HeaderColumns(object):
 
     """
+    Column names for the fields we need, resolved from a file's header.
 
-    regex = re.compile(r'.*(precinct|precinct.*name).*', re.IGNORECASE)
-
-    return [x for x in header if regex.search(x)][0]
-
+    Each header is only matched against the normalizing regexes once, when
+    the file is opened, so that handling a row is just a matter of looking
+    up values by column name or index.
 
-def normalize_votes(header):
     """
-    Regex examples:
 
-    number of votes for = true
-    votes = true
-    count = true
-    total number of votes = false
+    # Map of field to the regexes that are tried, in order, to find
+    # its column.
+    fields = {
+        'votes': (VOTES_REGEX,),
+        'contest': (CONTEST_REGEX,),
+        'candidate': (CANDIDATE_REGEX,),
+        'precinct': (PRECINCT_REGEX,),
+        'party': (PARTY_REGEX,),
+    }
 
-    """
+    def __init__(self, header):
+        self.header = list(header)
+        self._names = {}
+        for field, regexes in self.fields.items():
+            self._names[field] = self._resolve(regexes)
 
-    regex = re.compile(
-        r'.*(.*vote.*for|\bvote|\bcount\b|total_votes|total.*votes).*',
-        re.IGNORECASE)
+        self.district_column = self._resolve((DISTRICT_REGEX,))
+        self.legislative_district_column = self._resolve(
+            (LEGISLATIVE_DISTRICT_REGEX,))
+        self.congressional_district_column = self._resolve(
+            (CONGRESSIONAL_DISTRICT_REGEX,))
 
-    return [x for x in header if regex.search(x)][0]
+    def _resolve(self, regexes):
+        for regex in regexes:
+            try:
+                return first_match(regex, self.header)
+            except IndexError:
+                continue
 
+        return None
 
-def normalize_index(header, method):
-    """
-    Equivalent to:
+    def name(self, field):
+        """
+        Return the name of the column for `field`.
 
-    self.votes_index = self.header.index(
-        ''.join(votes(self.header)))
-    """
+        Raises IndexError if the header has no column for the field, like
+        the normalize_* functions.
 
-    return header.index(''.join(method(header)))
+        """
 
+        name = self._names[field]
+        if name is None:
+            raise IndexError("No column found for '{}'".format(field))
 
-def normalize_district(header, office, row):
-    """
-    Example of what we had before:
+        return name
 
-    'district': '{0} {1}'.format(
-        self.district_offices[normalize_races(sh_val)],
-        "".join(map(str, [int(s) for s in sh_val.strip() if s.isdigit()][:2])
-        ))})
+    def index(self, field):
+        """Return the position of the column for `field` in the header"""
+        return self.header.index(self.name(field))
 
-    normalize_district now provides a more standardized and clean API than
-    was the case with the mess before.
-    """
+    def district(self, office, row):
+        """
+        Return the district for a row.
 
-    norm_office = normalize_races(office)
-    dist_str = "".join(
-        map(str, [int(s) for s in office.strip() if s.isdigit()][:2]))
+        If the file has district columns, the district comes from the row.
+        Otherwise, it's parsed from the office name.
 
-    bth_regex = re.compile(r'((leg|con).*dis.*)', re.IGNORECASE)
-    leg_regex = re.compile(r'leg.*dis.*', re.IGNORECASE)
-    con_regex = re.compile(r'con.*dis.*', re.IGNORECASE)
+        Raises KeyError if the file has district columns but `row` doesn't
+        have a value for them.
 
-    if not row:
-        row = {}
+        """
 
-    try:
-        row[[x for x in header if bth_regex.search(x)][0]]
-        if norm_office is 'U.S. Representative':
-            dist = row[[x for x in header if leg_regex.search(x)][0]]
-            return dist
-        if norm_office in ('State Representative', 'State Senate'):
-            dist = row[[x for x in header if con_regex.search(x)][0]]
-            return dist
-    except IndexError:
-        if dist_str is "":
-            return None
-        if int(dist_str) > 49:
-            dist_str = dist_str[:1]
-        return dist_str
+        if self.district_column is None:
+            return district_from_office(office)
 
+        if not row:
+            row = {}
 
+        row[self.district_column]
+        norm_office = normalize_races(office)
+        if norm_office == 'U.S. Representative':
+            if self.legislative_district_column is None:
+                return district_from_office(office)
+            return row[self.legislative_district_column]
+        if norm_office in ('State Representative', 'State Senate'):
+            if self.congressional_district_column is None:
+                return district_from_office(office)
+            return row[self.congressional_district_column]
+
+        return None
+
+
+GENERAL_FILTER_REGEX = re.compile(r'(countywide|initiative|county of|city of|port|director|council|school|mayor)', re.IGNORECASE)
+PRESIDENTIAL_REGEX = re.compile('president', re.IGNORECASE)
+SENATE_REGEX = re.compile(r'(senate|senator)', re.IGNORECASE)
+HOUSE_REGEX = re.compile(r'(house|representative)', re.IGNORECASE)
+GOVERNOR_REGEX = re.compile('governor', re.IGNORECASE)
+TREASURER_REGEX = re.compile('treasurer', re.IGNORECASE)
+AUDITOR_REGEX = re.compile('auditor', re.IGNORECASE)
+SOS_REGEX = re.compile('secretary', re.IGNORECASE)
+LT_GOV_REGEX = re.compile(r'(lt|Lieutenant)', re.IGNORECASE)
+OSPI_REGEX = re.compile(
+    'superintendent of public instruction',
+    re.IGNORECASE)
+AG_REGEX = re.compile('attorney general', re.IGNORECASE)
+WCPL_REGEX = re.compile('commissioner of public lands', re.IGNORECASE)
+LOCAL_REGEX = re.compile(
+    r'(^State\b|Washington|Washington\s+State|Local|Legislative District)',
+    re.IGNORECASE)
+NATIONAL_REGEX = re.compile(
+    r'(U\.S\.|\bUS\b|Congressional|National|United\s+States|U\.\s+S\.\s+)',
+    re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
 def normalize_races(string):
     """
     Normalizes races per 'target_offices'
@@ -487,28 +559,10 @@ def normalize_races(string):
     will result in the row being skipped. Since 'N/A' isn't in
     `target_offices`, we're fine.
 
-    """
+    This is called for every row, but a file only has a handful of distinct
+    office names, so results are memoized.
 
-    general_filter_regex = re.compile(r'(countywide|initiative|county of|city of|port|director|council|school|mayor)', re.IGNORECASE)
-    presidential_regex = re.compile('president', re.IGNORECASE)
-    senate_regex = re.compile(r'(senate|senator)', re.IGNORECASE)
-    house_regex = re.compile(r'(house|representative)', re.IGNORECASE)
-    governor_regex = re.compile('governor', re.IGNORECASE)
-    treasurer_regex = re.compile('treasurer', re.IGNORECASE)
-    auditor_regex = re.compile('auditor', re.IGNORECASE)
-    sos_regex = re.compile('secretary', re.IGNORECASE)
-    lt_gov_regex = re.compile(r'(lt|Lieutenant)', re.IGNORECASE)
-    ospi_regex = re.compile(
-        'superintendent of public instruction',
-        re.IGNORECASE)
-    ag_regex = re.compile('attorney general', re.IGNORECASE)
-    wcpl_regex = re.compile('commissioner of public lands', re.IGNORECASE)
-    local_regex = re.compile(
-        r'(^State\b|Washington|Washington\s+State|Local|Legislative District)',
-        re.IGNORECASE)
-    national_regex = re.compile(
-        r'(U\.S\.|\bUS\b|Congressional|National|United\s+States|U\.\s+S\.\s+)',
-        re.IGNORECASE)
+    """
 
     """
     The following chained if statements are ordered by the most frequent
@@ -537,39 +591,39 @@ def normalize_races(string):
 
     """
 
-    if re.search(general_filter_regex, string):
+    if GENERAL_FILTER_REGEX.search(string):
         return 'N/A'
-    elif re.search(house_regex, string):
-        if re.search(national_regex, string):
+    elif HOUSE_REGEX.search(string):
+        if NATIONAL_REGEX.search(string):
             return 'U.S. Representative'
-        elif re.search(local_regex, string):
+        elif LOCAL_REGEX.search(string):
             return 'State Representative'
         else:
             return 'N/A'
-    elif re.search(lt_gov_regex, string):
+    elif LT_GOV_REGEX.search(string):
         return 'Lt. Governor'
-    elif re.search(governor_regex, string):
+    elif GOVERNOR_REGEX.search(string):
         return 'Governor'
-    elif re.search(wcpl_regex, string):
+    elif WCPL_REGEX.search(string):
         return 'Commissioner of Public Lands'
-    elif re.search(senate_regex, string):
-        if re.search(national_regex, string):
+    elif SENATE_REGEX.search(string):
+        if NATIONAL_REGEX.search(string):
             return 'U.S. Senator'
-        elif re.search(local_regex, string):
+        elif LOCAL_REGEX.search(string):
             return 'State Senator'
         else:
             return 'N/A'
-    elif re.search(ospi_regex, string):
+    elif OSPI_REGEX.search(string):
         return 'Superintendent of Public Instruction'
-    elif re.search(sos_regex, string):
+    elif SOS_REGEX.search(string):
         return 'Secretary of State'
-    elif re.search(treasurer_regex, string):
+    elif TREASURER_REGEX.search(string):
         return 'Treasurer'
-    elif re.search(auditor_regex, string):
+    elif AUDITOR_REGEX.search(string):
         return 'Auditor'
-    elif re.search(ag_regex, string):
+    elif AG_REGEX.search(string):
         return 'Attorney General'
-    elif re.search(presidential_regex, string):
+    elif PRESIDENTIAL_REGEX.search(string):
         return 'President'
     else:
         return 'N/A'
@@ -606,6 +660,8 @@ class WALoaderPrecincts(OCDMixin, WABaseLoader):
 
     """
 
+    columns_class = HeaderColumns
+
     header = ''
     votes_index = ''
     party_index = ''
@@ -616,62 +672,27 @@ class WALoaderPrecincts(OCDMixin, WABaseLoader):
 
     def load(self):
 
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         results = []
 
         with self._file_handle as csvfile:
-            party_flag = 0
-            district_flag = 0
+            self._party_flag = 0
+            self._district_flag = 0
             reader = unicodecsv.DictReader(csvfile, delimiter=',')
 
             # Declare column indices before the loop so we aren't making
             # a method call for each line in the file
 
             self.header = [x.replace('"', '') for x in reader.fieldnames]
-            self.votes_index = normalize_votes(self.header)
-            self.contest_index = normalize_contest(self.header)
-            self.candidate_index = normalize_candidate(
-                self.header)
-            self.precinct_index = normalize_precinct(
-                self.header)
-            try:
-                self.party_index = normalize_party(self.header)
-            except IndexError:
-                pass
+            self._resolve_columns()
 
             for row in reader:
                 if self._skip_row(row):
                     continue
                 else:
-                    self.jurisdiction = row[self.precinct_index].strip()
-                    votes = int(row[self.votes_index].strip())
-                    rr_kwargs = self._common_kwargs.copy()
-                    rr_kwargs.update(self._build_contest_kwargs(row))
-                    rr_kwargs.update(self._build_candidate_kwargs(row))
-                    rr_kwargs.update({
-                        'reporting_level': 'precinct',
-                        'votes': votes,
-                        'ocd_id': "{}".format(self._get_ocd_id(
-                            self.jurisdiction,
-                            precinct=row[self.precinct_index]))
-                    })
-                    try:
-                        rr_kwargs.update({
-                            'party': row[self.party_index].strip()
-                        })
-                    except (IndexError, KeyError):
-                        party_flag = 1
-                    try:
-                        rr_kwargs.update(
-                            {'district': normalize_district(self.header, row[self.contest_index], row)})
-                    except KeyError:
-                        district_flag = 1
-                    results.append(RawResult(**rr_kwargs))
-            if 0 is not party_flag:
-                logger.info('Some rows did not contain party info.')
-            if 0 is not district_flag:
-                logger.info('Some rows did not contain district info.')
+                    results.append(self._prep_precinct_result(row))
+            self._log_missing_fields()
 
         """
         Many county files *only* have local races, such as schoolboard or
@@ -686,10 +707,53 @@ class WALoaderPrecincts(OCDMixin, WABaseLoader):
         except errors.InvalidOperation:
             logger.error('\tNo raw results loaded')
 
+    def _resolve_columns(self):
+        self.columns = self.columns_class(self.header)
+        self.votes_index = self.columns.name('votes')
+        self.contest_index = self.columns.name('contest')
+        self.candidate_index = self.columns.name('candidate')
+        self.precinct_index = self.columns.name('precinct')
+        try:
+            self.party_index = self.columns.name('party')
+        except IndexError:
+            pass
+
     def _skip_row(self, row):
         return normalize_races(
             row[self.contest_index]) not in self.target_offices
 
+    def _prep_precinct_result(self, row):
+        self.jurisdiction = row[self.precinct_index].strip()
+        votes = int(row[self.votes_index].strip())
+        rr_kwargs = self._common_kwargs.copy()
+        rr_kwargs.update(self._build_contest_kwargs(row))
+        rr_kwargs.update(self._build_candidate_kwargs(row))
+        rr_kwargs.update({
+            'reporting_level': 'precinct',
+            'votes': votes,
+            'ocd_id': "{}".format(self._get_ocd_id(
+                self.jurisdiction,
+                precinct=row[self.precinct_index]))
+        })
+        try:
+            rr_kwargs.update({
+                'party': row[self.party_index].strip()
+            })
+        except (IndexError, KeyError):
+            self._party_flag = 1
+        try:
+            rr_kwargs.update(
+                {'district': self.columns.district(row[self.contest_index], row)})
+        except KeyError:
+            self._district_flag = 1
+        return RawResult(**rr_kwargs)
+
+    def _log_missing_fields(self):
+        if 0 is not self._party_flag:
+            logger.info('Some rows did not contain party info.')
+        if 0 is not self._district_flag:
+            logger.info('Some rows did not contain district info.')
+
     def _build_contest_kwargs(self, row):
         return {
             'office': row[self.contest_index].strip(),
@@ -703,6 +767,73 @@ class WALoaderPrecincts(OCDMixin, WABaseLoader):
             'full_name': full_name
         }
 
+class KingCountyHeaderColumns(HeaderColumns):
+
+    """
+    King County's ecanvass exports use their own column names for the vote
+    count and the candidate, which the normalize_* regexes don't match.
+
+    """
+
+    fields = dict(HeaderColumns.fields,
+        votes=(VOTES_REGEX, re.compile(r'count$', re.IGNORECASE)),
+        candidate=(CANDIDATE_REGEX, re.compile(r'countertype', re.IGNORECASE)),
+    )
+
+
+class WALoaderPrecinctsText(WALoaderPrecincts):
+
+    """
+    Parse the very large precinct-level .txt files provided by King County.
+
+    Rows are read one at a time and the contest is checked against
+    `target_offices` before anything else is done with the row, so the
+    (many) rows for local races are thrown away cheaply. RawResults are
+    inserted in batches of `chunk_size` rather than all at once at the end,
+    and the position in the file is checkpointed as each batch is inserted
+    so an interrupted load can be resumed.
+
+    """
+
+    chunk_size = 5000
+    columns_class = KingCountyHeaderColumns
+
+    def load(self):
+        self._common_kwargs = self.context.election_kwargs()
+        self._common_kwargs['reporting_level'] = 'precinct'
+        self._party_flag = 0
+        self._district_flag = 0
+        results = self._insert_buffer(maxsize=self.chunk_size)
+
+        with self._file_handle as csvfile:
+            header_line = csvfile.readline()
+            delimiter = '\t' if '\t' in header_line else ','
+            # Parse the header like the rows, since quoted column names can
+            # contain the delimiter
+            self.header = [x.strip() for x in
+                next(csv.reader([header_line], delimiter=delimiter))]
+            self._resolve_columns()
+
+            contest_col = self.header.index(self.contest_index)
+            reader = csv.reader(csvfile, delimiter=delimiter)
+            for values in self._resume_rows(reader):
+                # Check the contest before building a dictionary for the row
+                if (len(values) <= contest_col or
+                        normalize_races(values[contest_col]) not in self.target_offices):
+                    continue
+
+                row = dict(zip(self.header, values))
+                results.append(self._prep_precinct_result(row))
+
+            # Insert any results still in the buffer
+            results.flush()
+            self._log_missing_fields()
+
+        if results.count() == 0:
+            logger.error('\tNo raw results loaded')
+
+
+
 """
 I don't know why this class is set up different from the rest.
 I should fix this.
@@ -728,9 +859,10 @@ class WALoaderPre2007(OCDMixin, WABaseLoader):
             results = []
             reader = unicodecsv.DictReader(csvfile, delimiter=',')
             self.header = [x.replace('"', '') for x in reader.fieldnames]
+            self.columns = HeaderColumns(self.header)
 
             try:
-                self.contest_index = normalize_contest(self.header)
+                self.contest_index = self.columns.name('contest')
             except IndexError:
                 pass
 
@@ -780,7 +912,7 @@ class WALoaderPre2007(OCDMixin, WABaseLoader):
 
         """
 
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(
             row, kwargs['primary_type'])
         candidate_kwargs = self._build_candidate_kwargs(row)
@@ -806,7 +938,7 @@ class WALoaderPre2007(OCDMixin, WABaseLoader):
         })
         try:
             kwargs.update({
-                'district': normalize_district(self.header, row[self.contest_index], row)
+                'district': self.columns.district(row[self.contest_index], row)
             })
         except KeyError:
             pass
@@ -825,7 +957,7 @@ class WALoaderPost2007(OCDMixin, WABaseLoader):
 
     def load(self):
 
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         results = []
 
@@ -833,7 +965,8 @@ class WALoaderPost2007(OCDMixin, WABaseLoader):
             district_flag = 0
             reader = unicodecsv.DictReader(csvfile, delimiter=',')
             self.header = [x.replace('"', '') for x in reader.fieldnames]
-            self.contest_index = normalize_contest(self.header)
+            self.columns = HeaderColumns(self.header)
+            self.contest_index = self.columns.name('contest')
             for row in reader:
                 if self._skip_row(row):
                     continue
@@ -849,7 +982,7 @@ class WALoaderPost2007(OCDMixin, WABaseLoader):
                     })
                     try:
                         rr_kwargs.update(
-                            {'district': normalize_district(self.header, row[self.contest_index], row)})
+                            {'district': self.columns.district(row[self.contest_index], row)})
                     except KeyError:
                         district_flag = 1
                     results.append(RawResult(**rr_kwargs))
@@ -918,7 +1051,7 @@ class WALoaderExcel(OCDMixin, WABaseLoader):
 
     def load(self):
         xlsfile = xlrd.open_workbook(self._xls_file_path)
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
 
         # Set the correct reporting level based on file name
         if 'precinct' in self.mapping['generated_filename']:
@@ -950,25 +1083,14 @@ class WALoaderExcel(OCDMixin, WABaseLoader):
         """
 
         self.header = sheet.row_values(0)
-        self.votes_index = normalize_index(
-            self.header,
-            normalize_votes)
-        self.contest_index = normalize_index(
-            self.header,
-            normalize_contest)
-        self.candidate_index = normalize_index(
-            self.header,
-            normalize_candidate)
-        self.precinct_index = normalize_index(
-            self.header,
-            normalize_precinct)
-        self.jurisdiction_index = normalize_index(
-            self.header,
-            normalize_precinct)
+        self.columns = HeaderColumns(self.header)
+        self.votes_index = self.columns.index('votes')
+        self.contest_index = self.columns.index('contest')
+        self.candidate_index = self.columns.index('candidate')
+        self.precinct_index = self.columns.index('precinct')
+        self.jurisdiction_index = self.columns.index('precinct')
         try:
-            self.party_index = normalize_index(
-                self.header,
-                normalize_precinct)
+            self.party_index = self.columns.index('precinct')
         except IndexError:
             pass
 
@@ -1006,7 +1128,7 @@ class WALoaderExcel(OCDMixin, WABaseLoader):
                         rowx=row,
                         colx=self.contest_index).value
                     rr_kwargs.update(
-                        {'district': '{}'.format(normalize_district(self.header, sh_val, row=False))})
+                        {'district': '{}'.format(self.columns.district(sh_val, row=False))})
                 except KeyError:
                     pass
         RawResult.objects.insert(results)
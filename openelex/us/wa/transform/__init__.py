@@ -3,9 +3,9 @@ from datetime import datetime
 import logging
 import re
 
-from nameparser import HumanName
-
-from openelex.base.transform import Transform, registry
+from openelex.base.namecache import parse_name
+from openelex.base.transform import (DistinctRawResultsTransform,
+    ReferenceResolver, Transform, registry)
 from openelex.models import Candidate, Contest, Office, Party, RawResult, Result
 from openelex.lib.text import ocd_type_id
 from openelex.lib.insertbuffer import BulkInsertBuffer
@@ -37,8 +37,14 @@ class BaseTransform(Transform):
     """
     Base class that encapsulates shared functionality for other Washinton
     transforms.
+
+    Transforms can be limited to a data file or election with
+    ``set_scope()``.  Contests and candidates are recreated, so a data file
+    scope is widened to the elections the file has results for.
     """
 
+    supports_scope = True
+
     PARTY_MAP = {
         # Unaffiliated
         'Nonpartisan': 'UN',
@@ -145,9 +151,21 @@ class BaseTransform(Transform):
         self._office_cache = {}
         self._party_cache = {}
         self._contest_cache = {}
+        self._resolver = None
+
+    @property
+    def resolver(self):
+        """``ReferenceResolver`` for looking up related records"""
+        if self._resolver is None:
+            self._resolver = ReferenceResolver(STATE)
+        return self._resolver
 
     def get_raw_results(self):
-        return RawResult.objects.filter(state=STATE).no_cache()
+        return RawResult.objects.filter(state=STATE,
+            __raw__=self.scope_query(by_election=True)).no_cache()
+
+    def match_query(self):
+        return dict(self.scope_query(by_election=True), state=STATE)
 
     def get_contest_fields(self, raw_result):
         fields = self._get_fields(raw_result, contest_fields)
@@ -182,7 +200,7 @@ class BaseTransform(Transform):
             return self._office_cache[key]
         except KeyError:
             try:
-                office = Office.objects.get(**office_query)
+                office = self.resolver.office(**office_query)
                 assert key == office.key
                 self._office_cache[key] = office
                 return office
@@ -204,7 +222,7 @@ class BaseTransform(Transform):
             return self._party_cache[clean_abbrev]
         except KeyError:
             try:
-                party = Party.objects.get(abbrev=clean_abbrev)
+                party = self.resolver.party(clean_abbrev)
                 self._party_cache[clean_abbrev] = party
                 return party
             except Party.DoesNotExist:
@@ -285,9 +303,9 @@ class BaseTransform(Transform):
         fields = self._get_fields(raw_result, candidate_fields)
 
         try:
-            name = HumanName(raw_result.full_name)
+            name = parse_name(raw_result.full_name)
         except TypeError:
-            name = HumanName("{} {}".format(raw_result.given_name, raw_result.family_name))
+            name = parse_name("{} {}".format(raw_result.given_name, raw_result.family_name))
 
         fields['given_name'] = name.first
         fields['family_name'] = name.last
@@ -320,11 +338,7 @@ class BaseTransform(Transform):
             #quit(fields['source'])
             fields.pop('source')
             try:
-                #contest = Contest.objects.get(**fields)
-                try:
-                    contest = Contest.objects.filter(**fields)[0]
-                except IndexError:
-                    contest = Contest.objects.get(**fields)
+                contest = self.resolver.contest(fields)
                 #print contest
                 #quit("uuuuuuuuuuuu")
             except Exception:
@@ -334,28 +348,24 @@ class BaseTransform(Transform):
             self._contest_cache[key] = contest
             return contest
 
-class CreateContestsTransform(BaseTransform):
+class CreateContestsTransform(BaseTransform, DistinctRawResultsTransform):
     name = 'create_unique_contests'
 
-    def __call__(self):
-        contests = []
-        seen = set()
-
-        for result in self.get_raw_results():
-            key = self._contest_key(result)
-            if key not in seen:
-                fields = self.get_contest_fields(result)
-                fields['updated'] = fields['created'] = datetime.now()
-                contest = Contest(**fields)
-                contests.append(contest)
-                seen.add(key)
-
-        print(seen)
-        Contest.objects.insert(contests, load_bulk=False)
-        logger.info("Created {} contests.".format(len(contests)))
+    doc_cls = Contest
+    key_fields = ['election_id', 'office', 'district', 'primary_party']
+    row_fields = contest_fields
+
+    def clean_key(self, row):
+        return self._contest_key(row)
+
+    def make_record(self, row):
+        fields = self.get_contest_fields(row)
+        fields['updated'] = fields['created'] = datetime.now()
+        return Contest(**fields)
 
     def reverse(self):
-        old = Contest.objects.filter(state=STATE)
+        old = Contest.objects.filter(state=STATE,
+            __raw__=self.scope_query(by_election=True))
         logger.info('\tDeleting {} previously created contests'.format(old.count()))
         old.delete()
 
@@ -364,34 +374,27 @@ class CreateContestsTransform(BaseTransform):
         return (raw_result.election_id, slug)
 
 
-class CreateCandidatesTransform(BaseTransform):
+class CreateCandidatesTransform(BaseTransform, DistinctRawResultsTransform):
     name = 'create_unique_candidates'
 
-    def __init__(self):
-        super(CreateCandidatesTransform, self).__init__()
+    doc_cls = Candidate
+    key_fields = ['election_id', 'office', 'district', 'primary_party',
+        'full_name', 'given_name', 'additional_name', 'family_name', 'suffix']
+    row_fields = contest_fields + candidate_fields
 
-    def __call__(self):
-        candidates = []
-        seen = set()
-
-        for rr in self.get_raw_results():
-            key = (rr.election_id, rr.contest_slug, rr.candidate_slug)
-            if key not in seen:
-                fields = self.get_candidate_fields(rr)
-                if not fields['full_name']:
-                    quit(fields)
-                fields['contest'] = self.get_contest(rr)
-                #print fields
-                candidate = Candidate(**fields)
-                candidates.append(candidate)
-                seen.add(key)
-
-        Candidate.objects.insert(candidates, load_bulk=False)
-        logger.info("Created {} candidates.".format(len(candidates)))
+    def clean_key(self, row):
+        return (row.election_id, row.contest_slug, row.candidate_slug)
 
+    def make_record(self, row):
+        fields = self.get_candidate_fields(row)
+        if not fields['full_name']:
+            quit(fields)
+        fields['contest'] = self.get_contest(row)
+        return Candidate(**fields)
 
     def reverse(self):
-        old = Candidate.objects.filter(state=STATE)
+        old = Candidate.objects.filter(state=STATE,
+            __raw__=self.scope_query(by_election=True))
         print("\tDeleting %d previously created candidates" % old.count())
         old.delete()
 
@@ -405,7 +408,8 @@ class CreateResultsTransform(BaseTransform):
         self._candidate_cache = {}
 
     def get_raw_results(self):
-        return RawResult.objects.filter(state=STATE).no_cache()
+        return RawResult.objects.filter(state=STATE,
+            __raw__=self.scope_query(by_election=True)).no_cache()
 
 
     def get_results(self):
@@ -481,7 +485,7 @@ class CreateResultsTransform(BaseTransform):
             fields.update(extra)
             del fields['source']
             try:
-                candidate = Candidate.objects.get(**fields)
+                candidate = self.resolver.candidate(fields)
             except Candidate.DoesNotExist:
                 print(fields) 
                 raise
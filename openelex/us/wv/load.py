@@ -131,8 +131,7 @@ class WVLoader(WVBaseLoader):
 
     def _base_kwargs(self, row):
         "Build base set of kwargs for RawResult"
-        # TODO: Can this just be called once?
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(row)
         candidate_kwargs = self._build_candidate_kwargs(row)
         kwargs.update(contest_kwargs)
@@ -142,7 +141,7 @@ class WVLoader(WVBaseLoader):
     def _prep_precinct_result(self, row):
         kwargs = self._base_kwargs(row)
         precinct = str(row['Precinct'])
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['CountyName'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['CountyName'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -157,7 +156,7 @@ class WVLoader(WVBaseLoader):
     def _prep_github_precinct_result(self, row):
         kwargs = self._base_kwargs(row)
         precinct = str(row['precinct'])
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['county'].strip().upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['county'])
         kwargs.update({
             'reporting_level': 'precinct',
             'jurisdiction': precinct,
@@ -171,7 +170,7 @@ class WVLoader(WVBaseLoader):
 
     def _prep_county_result(self, row):
         kwargs = self._base_kwargs(row)
-        county_ocd_id = [c for c in self.datasource._jurisdictions() if c['county'].upper() == row['CountyName'].upper()][0]['ocd_id']
+        county_ocd_id = self.datasource.jurisdiction_index().ocd_id('county', row['CountyName'])
         kwargs.update({
             'reporting_level': 'county',
             'jurisdiction': row['CountyName'],
@@ -227,7 +226,7 @@ class WVLoaderPre2008(WVBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
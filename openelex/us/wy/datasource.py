@@ -57,7 +57,7 @@ class Datasource(BaseDatasource):
             for election in elections:
                 results = [x for x in self._url_paths() if x['date'] == election['start_date']]
                 for result in results:
-                    county = [c for c in self._jurisdictions() if c['county'] == result['county']][0]
+                    county = self.jurisdiction_index().get('county', result['county'])
                     if year_int > 2010:
                         generated_filename = self._generate_county_filename(result, election, '.xlsx')
                     else:
@@ -74,7 +74,7 @@ class Datasource(BaseDatasource):
             for election in elections:
                 results = [x for x in self._url_paths() if x['date'] == election['start_date']]
                 for result in results:
-                    county = [c for c in self._jurisdictions() if c['county'] == result['county']][0]
+                    county = self.jurisdiction_index().get('county', result['county'])
                     generated_filename = self._generate_county_filename(result, election, '.csv')
                     meta.append({
                         "generated_filename": generated_filename,
@@ -88,7 +88,7 @@ class Datasource(BaseDatasource):
             for election in elections:
                 results = [x for x in self._url_paths() if x['date'] == election['start_date']]
                 for result in results:
-                    county = [c for c in self._jurisdictions() if c['county'] == result['county']][0]
+                    county = self.jurisdiction_index().get('county', result['county'])
                     if result['special'] and result['raw_extracted_filename']:
                         generated_filename = '20021126__wy__special__general__natrona__state_house__36__precinct.xls'
                         raw_url = build_raw_github_url(self.state, election['start_date'].replace('-',''), result['raw_extracted_filename'])
@@ -1,10 +1,8 @@
 from __future__ import print_function
 from builtins import str
 from builtins import zip
-from builtins import range
 from builtins import object
 import re
-import xlrd
 import operator
 import unicodecsv
 
@@ -109,7 +107,6 @@ class WYLoader(WYBaseLoader):
     """
     def load(self):
         year = int(re.search(r'\d{4}', self.election_id).group())
-        xlsfile = xlrd.open_workbook(self._xls_file_path)
         if 'primary' in self._xls_file_path:
             primary = True
             if year == 2004:
@@ -121,54 +118,55 @@ class WYLoader(WYBaseLoader):
             party = None
         results = []
 
-        sheets = self._get_sheets(xlsfile)
-        for sheet in sheets:
-            if year == 2004:
-                if primary:
-                    party = sheet.name.split()[1]
-                candidates = self._build_candidates_2004(sheet, party)
-            elif self.source == "20021126__wy__special__general__natrona__state_house__36__precinct.xls":
-                candidates = self._build_candidates_2002_special(sheet)
-            elif year < 2004:
-                if primary:
-                    if year == 2000:
-                        party = self.source.split('__')[2].title()
-                    else:
+        with self._open_workbook() as xlsfile:
+            sheets = self._get_sheets(xlsfile)
+            for sheet in sheets:
+                if year == 2004:
+                    if primary:
                         party = sheet.name.split()[1]
-                if year == 2002:
-                    candidates = self._build_candidates_2002(sheet, party)
-                elif year == 2000:
-                    candidates = self._build_candidates_2000(sheet, party, primary)
-            else:
-                candidates = self._build_candidates(sheet, party)
-
-            for i in range(sheet.nrows):
-                row = [r for r in sheet.row_values(i) if not r == '']
-                # remove empty cells
-                # Skip non-target offices
-                if self._skip_row(row):
-                    continue
+                    candidates = self._build_candidates_2004(sheet, party)
+                elif self.source == "20021126__wy__special__general__natrona__state_house__36__precinct.xls":
+                    candidates = self._build_candidates_2002_special(sheet)
+                elif year < 2004:
+                    if primary:
+                        if year == 2000:
+                            party = self.source.split('__')[2].title()
+                        else:
+                            party = sheet.name.split()[1]
+                    if year == 2002:
+                        candidates = self._build_candidates_2002(sheet, party)
+                    elif year == 2000:
+                        candidates = self._build_candidates_2000(sheet, party, primary)
                 else:
-                    precinct = str(row[0])
-                    if self.source == '20021126__wy__special__general__natrona__state_house__36__precinct.xls':
-                        votes = [v for v in row[1:] if not v == '']
-                    elif len(candidates) == 1:
-                        votes = [v for v in row[1:] if not v == '']
-                    elif year == 2000 and primary is False:
-                        precinct = row[0]
-                        votes = [v for v in row[2:len(candidates)] if not v == precinct ]
-                    elif year < 2006:
-                        votes = [v for v in row[2:len(candidates)] if not v == '']
+                    candidates = self._build_candidates(sheet, party)
+
+                for row in sheet.rows():
+                    row = [r for r in row if not r == '']
+                    # remove empty cells
+                    # Skip non-target offices
+                    if self._skip_row(row):
+                        continue
                     else:
-                        votes = [v for v in row[1:len(candidates)] if not v == '']
-                        grouped_results = list(zip(candidates, votes))
-                    for (candidate, office, candidate_party), votes in grouped_results:
-                        if not votes == '-':
-                            results.append(self._prep_precinct_result(precinct, self.mapping['name'], candidate, office, candidate_party, votes))
-            try:
-                RawResult.objects.insert(results)
-            except:
-                raise
+                        precinct = str(row[0])
+                        if self.source == '20021126__wy__special__general__natrona__state_house__36__precinct.xls':
+                            votes = [v for v in row[1:] if not v == '']
+                        elif len(candidates) == 1:
+                            votes = [v for v in row[1:] if not v == '']
+                        elif year == 2000 and primary is False:
+                            precinct = row[0]
+                            votes = [v for v in row[2:len(candidates)] if not v == precinct ]
+                        elif year < 2006:
+                            votes = [v for v in row[2:len(candidates)] if not v == '']
+                        else:
+                            votes = [v for v in row[1:len(candidates)] if not v == '']
+                            grouped_results = list(zip(candidates, votes))
+                        for (candidate, office, candidate_party), votes in grouped_results:
+                            if not votes == '-':
+                                results.append(self._prep_precinct_result(precinct, self.mapping['name'], candidate, office, candidate_party, votes))
+                try:
+                    RawResult.objects.insert(results)
+                except:
+                    raise
 
     def _get_sheets(self, xlsfile):
         if self.source == '20021126__wy__special__general__natrona__state_house__36__precinct.xls':
@@ -448,7 +446,7 @@ class WYLoader(WYBaseLoader):
 
     def _base_kwargs(self, candidate, office, party):
         "Build base set of kwargs for RawResult"
-        kwargs = self._build_common_election_kwargs()
+        kwargs = self.context.election_kwargs()
         contest_kwargs = self._build_contest_kwargs(office)
         candidate_kwargs = self._build_candidate_kwargs(candidate, party)
         kwargs.update(contest_kwargs)
@@ -511,7 +509,7 @@ class WYLoaderCSV(WYBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'precinct'
         # Store result instances for bulk loading
         results = []
@@ -575,7 +573,7 @@ class WYSpecialLoader2008(WYBaseLoader):
             'votes',
             'winner'
         ]
-        self._common_kwargs = self._build_common_election_kwargs()
+        self._common_kwargs = self.context.election_kwargs()
         self._common_kwargs['reporting_level'] = 'county'
         # Store result instances for bulk loading
         results = []
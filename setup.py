@@ -36,7 +36,13 @@ setup(
         'funcsigs==1.0.2',
         'ipaddress==1.0.18',
         'future==0.16.0',
+        'backports.functools_lru_cache==1.5; python_version < "3.0"',
     ],
+    extras_require={
+        'xlsx': ['openpyxl'],
+        'columnar': ['pandas'],
+        'parquet': ['pyarrow'],
+    },
     tests_require=[
         'mock==1.0.1',
         'nose==1.3.0',